@@ -17,15 +17,36 @@ Versiyon: 2.0.0 (SQLite)
 """
 
 import os
+import math
 import time
+import random
+import string
+import base64
+import hashlib
 import logging
-from flask import Flask, request, jsonify
+import threading
+from flask import Flask, request, jsonify, Response
 from datetime import datetime
-from threading import Timer
 from flask_cors import CORS
 from functools import wraps
 from collections import defaultdict
 from database import db
+from summary_cache import SummaryCache
+from event_stream import EventStreamHub, StreamSlots, StreamMessage, format_sse, format_sse_comment
+from command_router import CommandRouter, CommandContext, ArgumentError
+from rate_limiter import RateLimiter, DEFAULT_LIMITS, parse_limit
+from scheduler import ReminderScheduler
+from messaging import MessageDispatcher, LogTransport
+from json_stream import stream_json
+from compression import JsonCompressor
+from static_assets import StaticAssets, IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL
+from settlement import settle, compute_balances, to_amount
+from qr_service import QrCodeCache, QR_FORMATS, QR_MIN_SIZE, QR_MAX_SIZE, QR_DEFAULT_SIZE
+
+try:
+    import fcntl
+except ImportError:  # Windows; tek süreçte çalışılır
+    fcntl = None
 
 # Logging yapılandırması
 logging.basicConfig(level=logging.INFO)
@@ -37,15 +58,102 @@ CORS(app)
 # Uygulama yapılandırması
 app.config['SECRET_KEY'] = 'your-secret-key-here'
 
-user_last_action = {}
+# Etkinlik özeti önbelleği (BIP_BOT_SUMMARY_CACHE=0 ile kapatılır)
+summary_cache = SummaryCache(
+    max_entries=int(os.environ.get('BIP_BOT_SUMMARY_CACHE_SIZE', 1024)),
+    ttl=float(os.environ.get('BIP_BOT_SUMMARY_CACHE_TTL', 30)),
+    enabled=os.environ.get('BIP_BOT_SUMMARY_CACHE', '1') != '0'
+)
 
-def check_rate_limit(user_id):
-    """Kullanıcı rate limit kontrolü yapar"""
-    now = time.time()
-    if user_id in user_last_action and now - user_last_action[user_id] < 2:
-        return False
-    user_last_action[user_id] = now
-    return True
+def invalidate_summary(event_id, change, **data):
+    """Etkinliği değiştiren her yazmadan sonra özet önbelleğini temizler"""
+    summary_cache.invalidate(event_id)
+
+db.add_write_listener(invalidate_summary)
+
+# Eşik üstü JSON yanıtlar istemci kabul ediyorsa gzip'lenir (BIP_BOT_COMPRESS=0 ile kapatılır)
+json_compressor = JsonCompressor(
+    min_size=int(os.environ.get('BIP_BOT_COMPRESS_MIN_BYTES', 1024)),
+    level=int(os.environ.get('BIP_BOT_COMPRESS_LEVEL', 6)),
+    enabled=os.environ.get('BIP_BOT_COMPRESS', '1') != '0'
+)
+
+@app.after_request
+def compress_json_response(response):
+    """JSON yanıtı Accept-Encoding'e göre sıkıştırır"""
+    return json_compressor(response, request.headers.get('Accept-Encoding'))
+
+# Frontend ve QR kod açılışta belleğe alınır (sıkıştırılmış varyantlarıyla); dosya değişirse
+# en geç CHECK_SECONDS içinde yeniden yüklenir
+static_assets = StaticAssets(
+    os.path.dirname(os.path.abspath(__file__)),
+    check_interval=float(os.environ.get('BIP_BOT_STATIC_CHECK_SECONDS', 2))
+)
+static_assets.preload('frontend.html', 'invite.png')
+
+# Davet ve QR linklerinin kök adresi (qr_olustur.py ile aynı değişken)
+PUBLIC_BASE_URL = os.environ.get('BIP_BOT_URL', 'http://localhost:5000').rstrip('/')
+
+# Etkinlik QR kodları istek anında render edilip LRU önbellekte tutulur; DIR verilirse diske de yazılır
+qr_cache = QrCodeCache(
+    max_entries=int(os.environ.get('BIP_BOT_QR_CACHE_SIZE', 512)),
+    max_bytes=int(os.environ.get('BIP_BOT_QR_CACHE_BYTES', 16 * 1024 * 1024)),
+    disk_dir=os.environ.get('BIP_BOT_QR_CACHE_DIR') or None
+)
+
+# Canlı etkinlik akışı (SSE); özet yoklaması yerine delta mesajları
+stream_hub = EventStreamHub(buffer_size=int(os.environ.get('BIP_BOT_STREAM_BUFFER', 64)))
+STREAM_HEARTBEAT_SECONDS = float(os.environ.get('BIP_BOT_STREAM_HEARTBEAT', 15))
+# Her akış bir istek thread'i tutar; gunicorn.conf.py worker başına sınırı buradan verir (0: sınırsız)
+stream_slots = StreamSlots(int(os.environ.get('BIP_BOT_MAX_STREAMS', 0)))
+# Sınır doluyken tarayıcının yeniden bağlanmadan önce beklediği süre
+STREAM_BUSY_RETRY_MS = int(os.environ.get('BIP_BOT_STREAM_BUSY_RETRY_MS', 30000))
+
+# Değişiklik türüne göre deltaya eklenecek bölümler
+# Bakiyeler gider eklenince ve katılımcı kümesi değişebilen oylarda gönderilir
+STREAM_DELTAS = {
+    'slot_added': {'include_slots': True},
+    'slot_voted': {'include_slots': True, 'include_ledger': True},
+    'slot_closed': {'include_slots': True},
+    'poll_created': {'include_choices': True},
+    'choice_added': {'include_choices': True},
+    'poll_voted': {'include_choices': True, 'include_ledger': True},
+    'expense_added': {'include_ledger': True}
+}
+
+def publish_stream_delta(event_id, change, **data):
+    """Yazma sonrası etkinliği izleyen istemcilere delta yayınlar"""
+    if change not in STREAM_DELTAS:
+        return
+    if not stream_hub.subscriber_count(event_id):
+        # İzleyen yoksa delta hesaplanmaz; geri dönen istemci tam özeti çeker
+        stream_hub.discard(event_id)
+        return
+    delta = db.get_event_delta(event_id, expense_id=data.get('expense_id'), **STREAM_DELTAS[change])
+    if delta is not None:
+        if 'ledger' in delta:
+            delta['balances'] = format_balances(*delta.pop('ledger'))
+        stream_hub.publish(event_id, change, delta)
+
+db.add_write_listener(publish_stream_delta)
+
+# Komut hız sınırı: kullanıcı ve grup başına token bucket (BIP_BOT_RATE_LIMIT=0 ile kapatılır)
+# sqlite backend'i limitleri aynı makinedeki tüm worker'larda ortak uygular
+rate_limiter = RateLimiter(
+    limits={
+        (scope, rate_class): parse_limit(os.environ[f'BIP_BOT_RATE_LIMIT_{scope}_{rate_class}'.upper()])
+        for (scope, rate_class) in DEFAULT_LIMITS
+        if f'BIP_BOT_RATE_LIMIT_{scope}_{rate_class}'.upper() in os.environ
+    },
+    backend=os.environ.get('BIP_BOT_RATE_LIMIT_BACKEND', 'memory'),
+    db_path=os.environ.get('BIP_BOT_RATE_LIMIT_DB', f'{db.db_path}.ratelimit'),
+    max_keys=int(os.environ.get('BIP_BOT_RATE_LIMIT_MAX_KEYS', 100000)),
+    enabled=os.environ.get('BIP_BOT_RATE_LIMIT', '1') != '0'
+)
+
+def check_rate_limit(user_id, group_id=None, rate_class='write'):
+    """Kullanıcı ve grup hız sınırını kontrol eder; Decision(allowed, retry_after) döndürür"""
+    return rate_limiter.check(user_id, group_id, rate_class)
 
 def check_user_permission(user_id, event_id, permission):
     """Kullanıcının belirli bir etkinlik için izin kontrolü"""
@@ -77,25 +185,101 @@ def check_user_permission(user_id, event_id, permission):
     
     return False
 
-# Mesajı API yanıtına eklemek için global değişken
-last_bip_message = ""
+# Giden mesajlar kuyruğa alınır; worker havuzu aynı gruba gidenleri birleştirip gönderir
+message_dispatcher = MessageDispatcher(
+    LogTransport(),
+    workers=int(os.environ.get('BIP_BOT_MESSAGE_WORKERS', 2)),
+    coalesce_window=float(os.environ.get('BIP_BOT_MESSAGE_COALESCE_MS', 200)) / 1000,
+    max_batch=int(os.environ.get('BIP_BOT_MESSAGE_MAX_BATCH', 20)),
+    max_retries=int(os.environ.get('BIP_BOT_MESSAGE_MAX_RETRIES', 3)),
+    max_queue=int(os.environ.get('BIP_BOT_MESSAGE_QUEUE_SIZE', 10000))
+)
 
 def send_bip_message(group_id, message):
-    """BiP mesajı gönderir (mock)"""
-    global last_bip_message
-    last_bip_message = f"[MOCK BiP GRUP {group_id}] {message}"
-    logger.info(f"BiP mesajı gönderildi: {message}")
-    print(last_bip_message)
-
-def remind(event_id, group_id, delay, custom_message=None):
-    """Hatırlatıcı zamanlayıcısı başlatır"""
-    def send_reminder():
-        if custom_message:
-            send_bip_message(group_id, custom_message)
-        else:
-            hours = int(delay / 3600)
-            send_bip_message(group_id, f"Etkinlik {event_id} için {hours} saat kaldi!")
-    Timer(delay, send_reminder).start()
+    """BiP mesajını gönderim kuyruğuna ekler; kuyruk doluysa False döner"""
+    return message_dispatcher.send(group_id, message)
+
+# Hatırlatıcılar reminders tablosunda saklanır; tek dispatcher thread gönderir
+# (BIP_BOT_SCHEDULER=0 ile bu süreçte dispatcher çalıştırılmaz, kayıt yine yapılır)
+reminder_scheduler = ReminderScheduler(
+    db, lambda group_id, message: send_bip_message(group_id, message),
+    horizon=float(os.environ.get('BIP_BOT_SCHEDULER_HORIZON', 300)),
+    max_lateness=float(os.environ.get('BIP_BOT_SCHEDULER_MAX_LATENESS', 6 * 3600))
+)
+if os.environ.get('BIP_BOT_SCHEDULER', '1') != '0':
+    reminder_scheduler.start()
+
+def reinit_after_fork():
+    """Fork sonrası worker'da süreç başına kaynakları yeniler (gunicorn post_fork)"""
+    db.after_fork()
+    rate_limiter.after_fork()
+    stream_hub.after_fork()
+    stream_slots.after_fork()
+    message_dispatcher.after_fork()
+    reminder_scheduler.after_fork()
+    qr_cache.after_fork()
+
+def start_maintenance(scheduler=True):
+    """Tek bakım sahibi worker'da WAL checkpoint ve hatırlatıcı thread'lerini başlatır"""
+    if db.checkpointer:
+        db.checkpointer.start()
+    if scheduler:
+        reminder_scheduler.start()
+
+class MaintenanceOwner:
+    def __init__(self, lock_path, retry_seconds=30.0, log=logger):
+        """Kilit dosyası üzerinden tek bakım sahibi worker seçer (gunicorn ve çok worker'lı ASGI)"""
+        self.lock_path = lock_path
+        self.retry_seconds = retry_seconds
+        self.log = log
+        self._fd = None
+
+    def try_acquire(self):
+        """Kilidi almayı dener; kilit süreç bitince işletim sistemince bırakılır"""
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd  # Worker yaşadıkça açık kalır
+        return True
+
+    def run(self, on_acquired):
+        """Kilit alınırsa on_acquired çağrılır; alınamazsa arka planda tekrar denenir"""
+        if fcntl is None or self.try_acquire():
+            on_acquired()
+            return
+
+        def retry():
+            while not self.try_acquire():
+                time.sleep(self.retry_seconds)
+            self.log.info(f"Bakım sahipliği devralındı (PID: {os.getpid()})")
+            on_acquired()
+
+        threading.Thread(target=retry, name='maintenance-owner', daemon=True).start()
+
+def remind(event_id, group_id, delay, custom_message=None, slot_id=None):
+    """Kalıcı hatırlatıcı kurar; slot_id verilirse slot kapanınca iptal edilir"""
+    if custom_message:
+        message = custom_message
+    else:
+        hours = int(delay / 3600)
+        message = f"Etkinlik {event_id} için {hours} saat kaldi!"
+    return reminder_scheduler.schedule_in(delay, event_id, group_id, message, slot_id=slot_id)
+
+def encode_events_cursor(created_at, event_id):
+    """Etkinlik listesi sayfasının son satırından opak cursor üretir"""
+    return base64.urlsafe_b64encode(f"{created_at}|{event_id}".encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_events_cursor(cursor):
+    """Cursor'ı (created_at, event_id) keyset'ine çevirir; bozuksa ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        created_at, event_id = raw.rsplit('|', 1)
+        return created_at, int(event_id)
+    except ValueError:  # binascii.Error ve UnicodeDecodeError da ValueError'dır
+        raise ValueError(f"Geçersiz cursor: {cursor}")
 
 def validate_input(data, required_fields):
     """Giriş verilerini doğrular"""
@@ -104,396 +288,522 @@ def validate_input(data, required_fields):
             return False, f"Eksik alan: {field}"
     return True, "OK"
 
-@app.route('/webhook/bip', methods=['POST'])
-def bip_webhook():
-    """BiP webhook endpoint'i - komutları işler"""
+def get_cached_summary(event_id, version=None):
+    """Etkinlik özetini önbellekten, yoksa veritabanından getirir"""
+    if version is None:
+        version = db.get_event_version(event_id)
+    return summary_cache.get_or_compute(event_id, lambda: build_event_summary(event_id), version=version)
+
+def is_not_modified(etag):
+    """İstemcinin If-None-Match başlığı etag ile eşleşiyor mu"""
+    return request.if_none_match.contains_weak(etag)
+
+def not_modified_response(etag):
+    """Gövdesiz 304 yanıtı döndürür"""
+    return with_etag(app.response_class(status=304), etag)
+
+def with_etag(response, etag):
+    """Yanıta ETag ekler; istemci her istekte yeniden doğrulamalı"""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def streaming_jsonify(payload, status=200):
+    """jsonify gibi; payload içindeki iterator değerler bellekte toplanmadan akıtılır"""
+    dumps = lambda value: app.json.dumps(value, separators=(',', ':'))
+    return Response(stream_json(payload, dumps=dumps, sort_keys=app.json.sort_keys),
+                    status=status, mimetype=app.json.mimetype)
+
+def build_event_summary(event_id):
+    """Etkinlik özetini API formatında hazırlar; etkinlik yoksa None döner
+    
+    Gider listesi önbelleğe alınmaz; gerektiğinde db.iter_expenses ile okunur.
+    """
+    stats = db.get_event_summary_stats(event_id, include_expenses=False)
+    if not stats:
+        return None
+    
+    # Slot oyları (SQL'de sayılmış)
+    slot_stats = {}
+    for slot in stats['slots']:
+        slot_stats[slot['slot_id']] = {
+            'start_datetime': slot['start_datetime'],
+            'end_datetime': slot['end_datetime'],
+            'yes_votes': slot['yes_votes'],
+            'no_votes': slot['no_votes'],
+            'total_votes': slot['yes_votes'] + slot['no_votes']
+        }
+    
+    # En çok oy alan slot
+    best_slot = max(slot_stats.values(), key=lambda x: x['yes_votes']) if slot_stats else None
+    
+    # Anket oyları
+    poll_stats = {}
+    for choice in stats['poll_choices']:
+        poll_stats[choice['choice_id']] = {
+            'text': choice['text'],
+            'latitude': choice['latitude'],
+            'longitude': choice['longitude'],
+            'votes': choice['votes']
+        }
+    
+    # En çok oy alan seçenek
+    best_choice = max(poll_stats.values(), key=lambda x: x['votes']) if poll_stats else None
+    
+    # Gider analizi
+    total_expense = stats['total_expense']
+    participant_count = len(stats['participants'])
+    average_per_person = total_expense / participant_count if participant_count > 0 else 0
+    
+    # Kullanıcı bakiyeleri: ödenen - ağırlıklı pay (gider girmeyen katılımcılar dahil)
+    balances = format_balances(stats['paid_by_user'], stats['weight_by_user'], stats['participants'])
+    
+    # Eşitlikte moderatör kararı için kontrol
+    tied_choices = []
+    needs_moderator_decision = False
+    if best_choice:
+        max_votes = best_choice['votes']
+        tied_choices = [choice for choice in poll_stats.values() if choice['votes'] == max_votes and max_votes > 0]
+        needs_moderator_decision = len(tied_choices) > 1
+    
+    return {
+        'event': stats['event'],
+        'slots': slot_stats,
+        'best_slot': best_slot,
+        'poll_choices': poll_stats,
+        'best_choice': best_choice,
+        'tied_choices': tied_choices,
+        'needs_moderator_decision': needs_moderator_decision,
+        'expense_count': stats['expense_count'],
+        'total_expense': total_expense,
+        'participant_count': participant_count,
+        'average_per_person': average_per_person,
+        'balances': balances
+    }
+
+def format_balances(paid_by_user, weight_by_user, participants):
+    """Kullanıcı bazlı bakiyeler (TL); özet ve canlı akış deltaları aynı kuruş hesabını kullanır"""
+    _shares, balance_cents = compute_balances(paid_by_user, weight_by_user, participants)
+    return {user_id: to_amount(cents) for user_id, cents in sorted(balance_cents.items())}
+
+def build_settlement(event_id):
+    """Etkinliğin hesaplaşmasını (paylar, bakiyeler, transferler) hazırlar; etkinlik yoksa None"""
+    stats = db.get_event_summary_stats(event_id, include_expenses=False)
+    if not stats:
+        return None
+    return settle(stats['paid_by_user'], stats['weight_by_user'], stats['participants'])
+
+# ==================== BiP Komutları ====================
+
+command_router = CommandRouter()
+
+def _slot_times(year, month, day, start_hour, start_minute, end_hour, end_minute):
+    """'/slot' argümanlarını başlangıç/bitiş datetime çiftine çevirir (strptime'dan hızlı)"""
+    year, month, day = int(year), int(month), int(day)
+    start_dt = datetime(year, month, day, int(start_hour), int(start_minute))
+    end_dt = datetime(year, month, day, int(end_hour), int(end_minute))
+    return {'start_dt': start_dt, 'end_dt': end_dt}
+
+def _slot_vote(slot_id, choice):
+    """'/katil' argümanlarını doğrular"""
+    if choice not in ['yes', 'no']:
+        raise ArgumentError("Choice: yes veya no")
+    if not slot_id.lstrip('-').isdigit():
+        raise ArgumentError("Oy verilirken hata olustu.")
+    return {'slot_id': int(slot_id), 'choice': choice}
+
+def _place(name, latitude, longitude):
+    """'/mekan' argümanlarını dönüştürür; koordinatlar isteğe bağlı"""
+    if latitude is None:
+        return {'name': name, 'latitude': None, 'longitude': None}
+    return {'name': name, 'latitude': float(latitude), 'longitude': float(longitude)}
+
+def _expense(amount, quoted, weight, unterminated, notes):
+    """'/gider' argümanlarını dönüştürür; ağırlık sadece tırnaklı açıklamadan sonra"""
+    if unterminated is not None:
+        raise ArgumentError("Aciklama tirnak icinde olmali.")
+    if quoted is not None:
+        weight = weight.strip()
+        return {'amount': float(amount), 'notes': quoted, 'weight': float(weight) if weight else 1.0}
+    return {'amount': float(amount), 'notes': notes, 'weight': 1.0}
+
+@command_router.command(
+    '/yeni', pattern=r'(?P<title>.+)', min_args=1,
+    usage="Kullanim: /yeni ETKINLIK_ADI",
+    error="Etkinlik olusturulurken hata olustu."
+)
+def handle_new_event(ctx, title):
+    """Etkinlik oluşturur"""
+    event_id = db.create_event(title, ctx.user_id, ctx.group_id)
+    return f"Etkinlik olusturuldu: {title} (ID: {event_id})"
+
+@command_router.command(
+    '/slot_kapat', pattern=r'(?P<slot_id>\S+)(?:\s.*)?', min_args=1,
+    convert=lambda slot_id: {'slot_id': int(slot_id)},
+    usage="Kullanim: /slot_kapat SLOT_ID",
+    invalid="Gecersiz slot ID.",
+    error="Slot kapatilirken hata olustu."
+)
+def handle_close_slot(ctx, slot_id):
+    """Slot'u kapatır (moderatör)"""
+    latest_event = db.get_latest_event(ctx.group_id)
+    if not latest_event:
+        return "Etkinlik yok!"
+    if not db.is_moderator(ctx.user_id, latest_event['event_id']):
+        return "Bu islemi sadece moderatör yapabilir."
+    db.close_slot(latest_event['event_id'], slot_id)
+    return f"Slot {slot_id} kapatildi."
+
+@command_router.command(
+    '/slot',
+    pattern=r'(?P<year>\d{4})-(?P<month>\d{1,2})-(?P<day>\d{1,2})\s+'
+            r'(?P<start_hour>\d{1,2}):(?P<start_minute>\d{1,2})-(?P<end_hour>\d{1,2}):(?P<end_minute>\d{1,2})(?:\s.*)?',
+    min_args=2,
+    convert=_slot_times,
+    usage="Kullanim: /slot YYYY-MM-DD HH:MM-HH:MM",
+    invalid="Tarih/saat formatı yanlış. Örnek: /slot 2025-10-12 18:00-20:00",
+    error="Slot eklenirken hata olustu."
+)
+def handle_add_slot(ctx, start_dt, end_dt):
+    """Slot ekler ve hatırlatıcıları kurar"""
+    if start_dt < datetime.now():
+        return "Gecmis tarih secilemez."
+    if start_dt >= end_dt:
+        return "Baslangic saati bitis saatinden once olmali."
+    latest_event = db.get_latest_event(ctx.group_id)
+    if not latest_event:
+        return "Once etkinlik olusturun."
+    
+    slot_id = db.create_slot(latest_event['event_id'], start_dt.isoformat(), end_dt.isoformat())
+    
+    # Hatırlatıcılar
+    now = datetime.now()
+    delay_24h = (start_dt - now).total_seconds() - 24*3600
+    delay_1h = (start_dt - now).total_seconds() - 1*3600
+    if delay_24h > 0:
+        remind(latest_event['event_id'], ctx.group_id, delay_24h,
+               f"Etkinlik {latest_event['event_id']} için 24 saat kaldi!", slot_id=slot_id)
+    if delay_1h > 0:
+        remind(latest_event['event_id'], ctx.group_id, delay_1h,
+               f"Etkinlik {latest_event['event_id']} için 1 saat kaldi!", slot_id=slot_id)
+    return f"Slot eklendi: {start_dt.strftime('%Y-%m-%d %H:%M')} - {end_dt.strftime('%H:%M')} (ID: {slot_id})"
+
+@command_router.command(
+    '/katil', pattern=r'slot=(?P<slot_id>\S*)\s+(?P<choice>\S+)(?:\s.*)?',
+    convert=_slot_vote,
+    usage="Kullanim: /katil slot=1 yes/no",
+    error="Oy verilirken hata olustu."
+)
+def handle_slot_vote(ctx, slot_id, choice):
+    """Slot için oy verir"""
+    latest_event = db.get_latest_event(ctx.group_id)
+    if not latest_event:
+        return "Etkinlik yok!"
+    db.vote_slot(latest_event['event_id'], slot_id, ctx.user_id, choice)
+    return f"Slot {slot_id} icin oy: {choice}"
+
+@command_router.command(
+    '/mekan', pattern=r'(?P<name>\S+)(?:\s+(?P<latitude>\S+)\s+(?P<longitude>.+)|\s+\S+)?', min_args=1,
+    convert=_place,
+    usage="Kullanim: /mekan MEKAN_ADI [enlem boylam]",
+    invalid="Mekan eklenirken hata olustu.",
+    error="Mekan eklenirken hata olustu."
+)
+def handle_add_place(ctx, name, latitude, longitude):
+    """Mekan anketine seçenek ekler; anket yoksa oluşturur"""
+    latest_event = db.get_latest_event(ctx.group_id)
+    if not latest_event:
+        return "Once etkinlik olusturun."
+    
+    poll = db.get_poll_by_event(latest_event['event_id'])
+    if not poll:
+        poll_id = db.create_poll(latest_event['event_id'], "Mekan secimi")
+    else:
+        poll_id = poll['poll_id']
+    
+    choice_id = db.create_poll_choice(poll_id, name, latitude, longitude)
+    response_msg = f"Mekan eklendi: {name} (ID: {choice_id})"
+    if latitude and longitude:
+        response_msg += f" ({latitude}, {longitude})"
+    return response_msg
+
+@command_router.command(
+    '/oy_mekan', pattern=r'(?P<choice_id>\S+)(?:\s.*)?', min_args=1,
+    convert=lambda choice_id: {'choice_id': int(choice_id)},
+    usage="Kullanim: /oy_mekan CHOICE_ID",
+    invalid="Oy verilirken hata olustu.",
+    error="Oy verilirken hata olustu."
+)
+def handle_place_vote(ctx, choice_id):
+    """Mekan seçeneğine oy verir"""
+    latest_event = db.get_latest_event(ctx.group_id)
+    if not latest_event:
+        return "Etkinlik yok!"
+    poll = db.get_poll_by_event(latest_event['event_id'])
+    if not poll:
+        return "Mekan anketi yok!"
+    db.vote_poll(poll['poll_id'], choice_id, ctx.user_id)
+    return f"Mekan icin oy verildi: {choice_id}"
+
+@command_router.command(
+    '/gider',
+    pattern=r'(?P<amount>\S+)\s+(?:"(?P<quoted>[^"]*)"(?P<weight>.*)|(?P<unterminated>".*)|(?P<notes>.*\S))',
+    min_args=2, convert=_expense,
+    usage="Kullanim: /gider TUTAR \"Aciklama\" [agirlik]",
+    invalid="Gider eklenirken hata olustu.",
+    error="Gider eklenirken hata olustu."
+)
+def handle_add_expense(ctx, amount, notes, weight):
+    """Gider ekler"""
+    latest_event = db.get_latest_event(ctx.group_id)
+    if not latest_event:
+        return "Once etkinlik olusturun."
+    expense_id = db.create_expense(latest_event['event_id'], ctx.user_id, amount, notes, weight)
+    return f"Gider eklendi: {amount} TL, Not: {notes}, Agirlik: {weight} (ID: {expense_id})"
+
+@command_router.command(
+    '/ozet', pattern=r'(?P<detail>.*)', rate_class='read',
+    convert=lambda detail: {'detailed': bool(detail)},
+    error="Ozet olusturulurken hata olustu."
+)
+def handle_summary(ctx, detailed):
+    """Etkinlik özeti; argümanla (/ozet detay) emojili ayrıntılı özet"""
+    latest_event = db.get_latest_event(ctx.group_id)
+    if not latest_event:
+        return "Etkinlik yok!" if detailed else "Henuz etkinlik yok."
+    summary = get_cached_summary(latest_event['event_id'])
+    if detailed:
+        return format_detailed_summary(latest_event, summary)
+    
+    response_msg = f"Etkinlik: {summary['event']['title']}\n"
+    response_msg += f"Olusturan: {summary['event']['created_by']}\n"
+    response_msg += f"Tarih: {summary['event']['created_at']}\n\n"
+    
+    # Slot özeti
+    response_msg += "Slotlar:\n"
+    for slot_id, slot in summary['slots'].items():
+        response_msg += f"Slot {slot_id} ({slot['start_datetime']}-{slot['end_datetime']}): Evet: {slot['yes_votes']}, Hayir: {slot['no_votes']}\n"
+    
+    # Mekan özeti
+    if summary['poll_choices']:
+        response_msg += "\nMekanlar:\n"
+        for choice in summary['poll_choices'].values():
+            coord = f" ({choice['latitude']}, {choice['longitude']})" if choice['latitude'] and choice['longitude'] else ""
+            response_msg += f"{choice['text']}{coord}: {choice['votes']} oy\n"
+    
+    # Gider özeti
+    if summary['expense_count']:
+        response_msg += f"\nToplam gider: {summary['total_expense']} TL\n"
+        for expense in db.iter_expenses(summary['event']['event_id'], limit=summary['expense_count']):
+            response_msg += f"- {expense['amount']} TL: {expense['notes']} (Agirlik: {expense['weight']})\n"
+    return response_msg
+
+def format_detailed_summary(latest_event, summary):
+    """Emojili ayrıntılı özet metnini hazırlar"""
+    response_msg = f"📊 **{latest_event['title']} Özeti**\n\n"
+    
+    # En iyi slot - daha detaylı
+    if summary['best_slot']:
+        best_slot = summary['best_slot']
+        # Slot ID'sini bul
+        best_slot_id = None
+        for slot_id, slot_data in summary['slots'].items():
+            if slot_data['start_datetime'] == best_slot['start_datetime']:
+                best_slot_id = slot_id
+                break
+        
+        response_msg += f"🥇 **EN ÇOK OY ALAN SLOT:**\n"
+        response_msg += f"   📅 **Slot #{best_slot_id}:** {best_slot['start_datetime']} - {best_slot['end_datetime']}\n"
+        response_msg += f"   ✅ **Evet Oyları:** {best_slot['yes_votes']}\n"
+        response_msg += f"   ❌ **Hayır Oyları:** {best_slot['no_votes']}\n"
+        response_msg += f"   📊 **Toplam Oy:** {best_slot['total_votes']}\n\n"
+    else:
+        response_msg += "⏰ **En Çok Oy Alan Slot:** Henüz oy verilmemiş\n\n"
+    
+    # Tüm slotların listesi
+    if summary['slots']:
+        response_msg += "📋 **Tüm Slotlar:**\n"
+        for slot_id, slot_data in summary['slots'].items():
+            response_msg += f"   • **Slot #{slot_id}:** {slot_data['start_datetime']} ({slot_data['yes_votes']} evet, {slot_data['no_votes']} hayır)\n"
+        response_msg += "\n"
+    
+    # En iyi mekan
+    if summary['best_choice']:
+        best_choice = summary['best_choice']
+        response_msg += f"🏆 **EN ÇOK OY ALAN MEKAN:**\n"
+        response_msg += f"   🏢 **{best_choice['text']}** ({best_choice['votes']} oy)\n\n"
+    else:
+        response_msg += "🏢 **En Çok Oy Alan Mekan:** Henüz oy verilmemiş\n\n"
+    
+    # Gider özeti
+    response_msg += f"💰 **MALİ DURUM:**\n"
+    response_msg += f"   💵 **Toplam Gider:** {summary['total_expense']} TL\n"
+    response_msg += f"   👥 **Katılımcı Sayısı:** {summary['participant_count']} kişi\n"
+    response_msg += f"   📝 **Gider Sayısı:** {summary['expense_count']} adet"
+    return response_msg
+
+@command_router.command('/davet', rate_class='read')
+def handle_invite(ctx):
+    """Etkinlik davet linkini döndürür"""
+    latest_event = db.get_latest_event(ctx.group_id)
+    if not latest_event:
+        return "Etkinlik yok!"
+    invite_link = f"{PUBLIC_BASE_URL}/join/{latest_event['event_id']}"
+    return f"🔗 **{latest_event['title']} Davet Linki:**\n{invite_link}\n\nBu linki arkadaşlarınızla paylaşabilirsiniz!"
+
+@command_router.command('/analitik', rate_class='read')
+def handle_analytics(ctx):
+    """Etkinlik analitiklerini döndürür"""
+    latest_event = db.get_latest_event(ctx.group_id)
+    if not latest_event:
+        return "Etkinlik yok!"
+    summary = get_cached_summary(latest_event['event_id'])
+    
+    # Katılım oranı hesapla
+    total_slots = len(summary.get('slots', {}))
+    total_votes = sum(slot.get('yes_votes', 0) + slot.get('no_votes', 0) for slot in summary.get('slots', {}).values())
+    participant_count = summary.get('participant_count', 0)
+    
+    participation_rate = 0
+    if total_slots > 0 and participant_count > 0:
+        participation_rate = (total_votes / (total_slots * participant_count)) * 100
+    
+    response_msg = f"📊 **{latest_event['title']} Analitikleri**\n\n"
+    response_msg += f"👥 **Katılımcı:** {participant_count} kişi\n"
+    response_msg += f"📈 **Katılım Oranı:** %{participation_rate:.1f}\n"
+    response_msg += f"⏰ **Slot Sayısı:** {total_slots}\n"
+    response_msg += f"🗳️ **Toplam Oy:** {total_votes}\n"
+    response_msg += f"💰 **Toplam Gider:** {summary['total_expense']} TL\n"
+    response_msg += f"📝 **Gider Sayısı:** {summary['expense_count']} adet"
+    return response_msg
+
+@command_router.command('/hesap', rate_class='read')
+def handle_settlement(ctx):
+    """Kim kime ne kadar ödemeli: ağırlıklı paylar ve en az transfer"""
+    latest_event = db.get_latest_event(ctx.group_id)
+    if not latest_event:
+        return "Etkinlik yok!"
+    result = build_settlement(latest_event['event_id'])
+    
+    response_msg = f"💸 **{latest_event['title']} Hesaplaşma**\n\n"
+    response_msg += f"💰 **Toplam Gider:** {result['total_expense']:.2f} TL\n"
+    response_msg += f"👥 **Katılımcı:** {result['participant_count']} kişi\n\n"
+    if not result['transfers']:
+        response_msg += "✅ Herkes ödeşmiş, transfer gerekmiyor."
+        return response_msg
+    response_msg += f"🔁 **Transferler ({len(result['transfers'])}):**\n"
+    for transfer in result['transfers']:
+        response_msg += f"   • {transfer['from']} → {transfer['to']}: {transfer['amount']:.2f} TL\n"
+    return response_msg.rstrip('\n')
+
+@command_router.command(
+    '/konum', pattern=r'(?P<choice_id>\S+)(?:\s.*)?', min_args=1, rate_class='read',
+    convert=lambda choice_id: {'choice_id': int(choice_id)},
+    usage="Kullanim: /konum [Mekan ID]",
+    invalid="Geçersiz mekan ID!"
+)
+def handle_location(ctx, choice_id):
+    """Mekanın konum bilgilerini döndürür"""
+    latest_event = db.get_latest_event(ctx.group_id)
+    if not latest_event:
+        return "Etkinlik yok!"
+    
+    # Mock konum verileri
+    mock_locations = {
+        1: {'name': 'Pizza Palace', 'address': 'Beşiktaş, İstanbul', 'distance': '2.5 km'},
+        2: {'name': 'Ek Bina Kafe', 'address': 'Şişli, İstanbul', 'distance': '3.1 km'},
+        3: {'name': 'Kütüphane', 'address': 'Beyoğlu, İstanbul', 'distance': '1.8 km'}
+    }
+    
+    location = mock_locations.get(choice_id, {'name': 'Bilinmeyen Mekan', 'address': 'Adres bilgisi yok', 'distance': 'N/A'})
+    
+    response_msg = f"📍 **{location['name']} Konum Bilgileri**\n\n"
+    response_msg += f"🏠 **Adres:** {location['address']}\n"
+    response_msg += f"📏 **Mesafe:** {location['distance']}\n"
+    response_msg += f"🗺️ **Harita:** https://maps.google.com"
+    return response_msg
+
+@command_router.command('/test', rate_class='read')
+def handle_test(ctx):
+    """Bot durum kontrolü"""
+    return "Bot calisiyor! SQLite veritabani aktif. Test basarili."
+
+# Toplu webhook isteğinde kabul edilen en fazla mesaj sayısı
+WEBHOOK_BATCH_LIMIT = int(os.environ.get('BIP_BOT_WEBHOOK_BATCH_LIMIT', 500))
+
+def process_webhook_message(data):
+    """Tek bir webhook mesajını işler; (yanıt gövdesi, HTTP durum kodu) döndürür"""
     try:
-        data = request.json
         if not data:
-            return jsonify({'status': 'error', 'message': 'Geçersiz JSON verisi'}), 400
+            return {'status': 'error', 'message': 'Geçersiz JSON verisi'}, 400
         
         # Giriş doğrulama
         is_valid, error_msg = validate_input(data, ['message', 'user_id', 'group_id'])
         if not is_valid:
-            return jsonify({'status': 'error', 'message': error_msg}), 400
+            return {'status': 'error', 'message': error_msg}, 400
         
         message = data.get('message', '').strip()
         user_id = data.get('user_id', '').strip()
         group_id = data.get('group_id', '').strip()
         
-        # Rate limiting kontrolü
-        if not check_rate_limit(user_id):
-            return jsonify({
+        # Rate limiting kontrolü (okuma komutları daha gevşek sınırlanır)
+        command, _args = command_router.resolve(message)
+        decision = check_rate_limit(user_id, group_id, command.rate_class if command else 'read')
+        if not decision.allowed:
+            return {
                 'status': 'error', 
-                'bip_message': f"[MOCK BiP GRUP {group_id}] Çok hızlı mesaj gönderiyorsunuz. Lütfen {RATE_LIMIT_SECONDS} saniye bekleyin."
-            }), 429
+                'bip_message': f"[MOCK BiP GRUP {group_id}] Çok hızlı mesaj gönderiyorsunuz. Lütfen {math.ceil(decision.retry_after)} saniye bekleyin."
+            }, 429
         
         logger.info(f"Webhook alındı - Kullanıcı: {user_id}, Grup: {group_id}, Mesaj: {message}")
 
-        # Kullanıcıyı kaydet/güncelle
-        db.create_or_update_user(user_id)
-
-        # Etkinlik oluştur
-        if message.startswith('/yeni'):
-            title = message[5:].strip()
-            if not title:
-                response_msg = "Kullanim: /yeni ETKINLIK_ADI"
-            else:
-                try:
-                    event_id = db.create_event(title, user_id, group_id)
-                    response_msg = f"Etkinlik olusturuldu: {title} (ID: {event_id})"
-                except Exception as e:
-                    logger.error(f"Etkinlik oluşturma hatası: {str(e)}")
-                    response_msg = "Etkinlik olusturulurken hata olustu."
-
-        # Slot kapatma (moderatör) - /slot'dan önce kontrol et
-        elif message.startswith('/slot_kapat'):
-            parts = message.split()
-            if len(parts) < 2:
-                response_msg = "Kullanim: /slot_kapat SLOT_ID"
-            else:
-                try:
-                    slot_id = int(parts[1])  # Sadece ilk parametreyi al, fazla parametreleri görmezden gel
-                    latest_event = db.get_latest_event(group_id)
-                    if not latest_event:
-                        response_msg = "Etkinlik yok!"
-                    elif not db.is_moderator(user_id, latest_event['event_id']):
-                        response_msg = "Bu islemi sadece moderatör yapabilir."
-                    else:
-                        # Slot'u kapat (status = 'closed')
-                        with db.get_connection() as conn:
-                            cursor = conn.cursor()
-                            cursor.execute(
-                                'UPDATE slots SET status = ? WHERE slot_id = ? AND event_id = ?',
-                                ('closed', slot_id, latest_event['event_id'])
-                            )
-                            conn.commit()
-                        response_msg = f"Slot {slot_id} kapatildi."
-                except Exception as e:
-                    logger.error(f"Slot kapatma hatası: {str(e)}")
-                    response_msg = f"Slot kapatilirken hata olustu: {str(e)}"
-
-        # Slot ekle
-        elif message.startswith('/slot'):
-            parts = message.split()
-            if len(parts) < 3:
-                response_msg = "Kullanim: /slot YYYY-MM-DD HH:MM-HH:MM"
-            else:
-                try:
-                    date_part, time_part = parts[1], parts[2]
-                    start_time, end_time = time_part.split('-')
-                    start_dt = datetime.strptime(f"{date_part} {start_time}", "%Y-%m-%d %H:%M")
-                    end_dt = datetime.strptime(f"{date_part} {end_time}", "%Y-%m-%d %H:%M")
-                    
-                    if start_dt < datetime.now():
-                        response_msg = "Gecmis tarih secilemez."
-                    elif start_dt >= end_dt:
-                        response_msg = "Baslangic saati bitis saatinden once olmali."
-                    else:
-                        latest_event = db.get_latest_event(group_id)
-                        if not latest_event:
-                            response_msg = "Once etkinlik olusturun."
-                        else:
-                            slot_id = db.create_slot(
-                                latest_event['event_id'], 
-                                start_dt.isoformat(), 
-                                end_dt.isoformat()
-                            )
-                            response_msg = f"Slot eklendi: {start_dt.strftime('%Y-%m-%d %H:%M')} - {end_dt.strftime('%H:%M')} (ID: {slot_id})"
-                            
-                            # Hatırlatıcılar
-                            now = datetime.now()
-                            delay_24h = (start_dt - now).total_seconds() - 24*3600
-                            delay_1h = (start_dt - now).total_seconds() - 1*3600
-                            
-                            if delay_24h > 0:
-                                remind(latest_event['event_id'], group_id, delay_24h)
-                            if delay_1h > 0:
-                                remind(latest_event['event_id'], group_id, delay_1h)
-                except Exception as e:
-                    logger.error(f"Slot ekleme hatası: {str(e)}")
-                    response_msg = "Tarih/saat formatı yanlış. Örnek: /slot 2025-10-12 18:00-20:00"
-
-        # Slot oyu
-        elif message.startswith('/katil'):
-            parts = message.split()
-            if len(parts) < 3 or not parts[1].startswith('slot='):
-                response_msg = "Kullanim: /katil slot=1 yes/no"
-            else:
-                try:
-                    slot_str = parts[1].split('=')[1]
-                    choice = parts[2]
-                    if choice not in ['yes', 'no']:
-                        response_msg = "Choice: yes veya no"
-                    else:
-                        slot_id = int(slot_str)
-                        latest_event = db.get_latest_event(group_id)
-                        if not latest_event:
-                            response_msg = "Etkinlik yok!"
-                        else:
-                            db.vote_slot(latest_event['event_id'], slot_id, user_id, choice)
-                            response_msg = f"Slot {slot_id} icin oy: {choice}"
-                except Exception as e:
-                    logger.error(f"Slot oy hatası: {str(e)}")
-                    response_msg = "Oy verilirken hata olustu."
-
-        # Mekan ekle
-        elif message.startswith('/mekan'):
-            parts = message.split(maxsplit=3)
-            if len(parts) < 2:
-                response_msg = "Kullanim: /mekan MEKAN_ADI [enlem boylam]"
-            else:
-                try:
-                    mekan_adi = parts[1]
-                    latitude = None
-                    longitude = None
-                    if len(parts) == 4:
-                        latitude = float(parts[2])
-                        longitude = float(parts[3])
-                    
-                    latest_event = db.get_latest_event(group_id)
-                    if not latest_event:
-                        response_msg = "Once etkinlik olusturun."
-                    else:
-                        # Anket varsa al, yoksa oluştur
-                        poll = db.get_poll_by_event(latest_event['event_id'])
-                        if not poll:
-                            poll_id = db.create_poll(latest_event['event_id'], "Mekan secimi")
-                        else:
-                            poll_id = poll['poll_id']
-                        
-                        choice_id = db.create_poll_choice(poll_id, mekan_adi, latitude, longitude)
-                        response_msg = f"Mekan eklendi: {mekan_adi} (ID: {choice_id})"
-                        if latitude and longitude:
-                            response_msg += f" ({latitude}, {longitude})"
-                except Exception as e:
-                    logger.error(f"Mekan ekleme hatası: {str(e)}")
-                    response_msg = "Mekan eklenirken hata olustu."
-
-        # Mekan oyu
-        elif message.startswith('/oy_mekan'):
-            parts = message.split()
-            if len(parts) < 2:
-                response_msg = "Kullanim: /oy_mekan CHOICE_ID"
-            else:
-                try:
-                    choice_id = int(parts[1])
-                    latest_event = db.get_latest_event(group_id)
-                    if not latest_event:
-                        response_msg = "Etkinlik yok!"
-                    else:
-                        poll = db.get_poll_by_event(latest_event['event_id'])
-                        if not poll:
-                            response_msg = "Mekan anketi yok!"
-                        else:
-                            db.vote_poll(poll['poll_id'], choice_id, user_id)
-                            response_msg = f"Mekan icin oy verildi: {choice_id}"
-                except Exception as e:
-                    logger.error(f"Mekan oy hatası: {str(e)}")
-                    response_msg = "Oy verilirken hata olustu."
-
-        # Gider ekle
-        elif message.startswith('/gider'):
-            parts = message.split(maxsplit=2)
-            if len(parts) < 3:
-                response_msg = "Kullanim: /gider TUTAR \"Aciklama\" [agirlik]"
-            else:
-                try:
-                    amount = float(parts[1])
-                    rest = parts[2].strip()
-                    if rest.startswith('"'):
-                        end_quote = rest.find('"', 1)
-                        if end_quote == -1:
-                            response_msg = "Aciklama tirnak icinde olmali."
-                        else:
-                            notes = rest[1:end_quote]
-                            weight_str = rest[end_quote+1:].strip()
-                            weight = float(weight_str) if weight_str else 1.0
-                    else:
-                        notes = rest
-                        weight = 1.0
-                    
-                    latest_event = db.get_latest_event(group_id)
-                    if not latest_event:
-                        response_msg = "Once etkinlik olusturun."
-                    else:
-                        expense_id = db.create_expense(
-                            latest_event['event_id'], user_id, amount, notes, weight
-                        )
-                        response_msg = f"Gider eklendi: {amount} TL, Not: {notes}, Agirlik: {weight} (ID: {expense_id})"
-                except Exception as e:
-                    logger.error(f"Gider ekleme hatası: {str(e)}")
-                    response_msg = "Gider eklenirken hata olustu."
-
-        # Özet
-        elif message == '/ozet':
-            try:
-                latest_event = db.get_latest_event(group_id)
-                if not latest_event:
-                    response_msg = "Henuz etkinlik yok."
-                else:
-                    summary = db.get_event_summary(latest_event['event_id'])
-                    
-                    response_msg = f"Etkinlik: {summary['event']['title']}\n"
-                    response_msg += f"Olusturan: {summary['event']['created_by']}\n"
-                    response_msg += f"Tarih: {summary['event']['created_at']}\n\n"
-                    
-                    # Slot özeti
-                    response_msg += "Slotlar:\n"
-                    for slot in summary['slots']:
-                        if slot['status'] == 'active':
-                            yes_count = len([v for v in summary['slot_votes'] 
-                                           if v['slot_id'] == slot['slot_id'] and v['choice'] == 'yes'])
-                            no_count = len([v for v in summary['slot_votes'] 
-                                          if v['slot_id'] == slot['slot_id'] and v['choice'] == 'no'])
-                            response_msg += f"Slot {slot['slot_id']} ({slot['start_datetime']}-{slot['end_datetime']}): Evet: {yes_count}, Hayir: {no_count}\n"
-                    
-                    # Mekan özeti
-                    if summary['poll']:
-                        response_msg += "\nMekanlar:\n"
-                        for choice in summary['poll_choices']:
-                            vote_count = len([v for v in summary['poll_votes'] 
-                                            if v['choice_id'] == choice['choice_id']])
-                            coord = f" ({choice['latitude']}, {choice['longitude']})" if choice['latitude'] and choice['longitude'] else ""
-                            response_msg += f"{choice['text']}{coord}: {vote_count} oy\n"
-                    
-                    # Gider özeti
-                    if summary['expenses']:
-                        total_expense = sum(exp['amount'] for exp in summary['expenses'])
-                        response_msg += f"\nToplam gider: {total_expense} TL\n"
-                        for expense in summary['expenses']:
-                            response_msg += f"- {expense['amount']} TL: {expense['notes']} (Agirlik: {expense['weight']})\n"
-            except Exception as e:
-                logger.error(f"Özet hatası: {str(e)}")
-                response_msg = "Ozet olusturulurken hata olustu."
-
-        # Özet komutu
-        elif message.startswith('/ozet'):
-            latest_event = db.get_latest_event(group_id)
-            if not latest_event:
-                response_msg = "Etkinlik yok!"
-            else:
-                summary = db.get_event_summary(latest_event['event_id'])
-                
-                response_msg = f"📊 **{latest_event['title']} Özeti**\n\n"
-                
-                # En iyi slot - daha detaylı
-                if summary['best_slot']:
-                    best_slot = summary['best_slot']
-                    # Slot ID'sini bul
-                    best_slot_id = None
-                    for slot_id, slot_data in summary['slots'].items():
-                        if slot_data['start_datetime'] == best_slot['start_datetime']:
-                            best_slot_id = slot_id
-                            break
-                    
-                    response_msg += f"🥇 **EN ÇOK OY ALAN SLOT:**\n"
-                    response_msg += f"   📅 **Slot #{best_slot_id}:** {best_slot['start_datetime']} - {best_slot['end_datetime']}\n"
-                    response_msg += f"   ✅ **Evet Oyları:** {best_slot['yes_votes']}\n"
-                    response_msg += f"   ❌ **Hayır Oyları:** {best_slot['no_votes']}\n"
-                    response_msg += f"   📊 **Toplam Oy:** {best_slot['total_votes']}\n\n"
-                else:
-                    response_msg += "⏰ **En Çok Oy Alan Slot:** Henüz oy verilmemiş\n\n"
-                
-                # Tüm slotların listesi
-                if summary['slots']:
-                    response_msg += "📋 **Tüm Slotlar:**\n"
-                    for slot_id, slot_data in summary['slots'].items():
-                        response_msg += f"   • **Slot #{slot_id}:** {slot_data['start_datetime']} ({slot_data['yes_votes']} evet, {slot_data['no_votes']} hayır)\n"
-                    response_msg += "\n"
-                
-                # En iyi mekan
-                if summary['best_choice']:
-                    best_choice = summary['best_choice']
-                    response_msg += f"🏆 **EN ÇOK OY ALAN MEKAN:**\n"
-                    response_msg += f"   🏢 **{best_choice['text']}** ({best_choice['votes']} oy)\n\n"
-                else:
-                    response_msg += "🏢 **En Çok Oy Alan Mekan:** Henüz oy verilmemiş\n\n"
-                
-                # Gider özeti
-                response_msg += f"💰 **MALİ DURUM:**\n"
-                response_msg += f"   💵 **Toplam Gider:** {summary['total_expense']} TL\n"
-                response_msg += f"   👥 **Katılımcı Sayısı:** {summary['participant_count']} kişi\n"
-                response_msg += f"   📝 **Gider Sayısı:** {len(summary['expenses'])} adet"
-
-        # Davet komutu
-        elif message.startswith('/davet'):
-            latest_event = db.get_latest_event(group_id)
-            if not latest_event:
-                response_msg = "Etkinlik yok!"
-            else:
-                event_id = latest_event['event_id']
-                invite_link = f"http://localhost:5000/join/{event_id}"
-                response_msg = f"🔗 **{latest_event['title']} Davet Linki:**\n{invite_link}\n\nBu linki arkadaşlarınızla paylaşabilirsiniz!"
-
-        # Analitik komutu
-        elif message.startswith('/analitik'):
-            latest_event = db.get_latest_event(group_id)
-            if not latest_event:
-                response_msg = "Etkinlik yok!"
-            else:
-                summary = db.get_event_summary(latest_event['event_id'])
-                
-                # Katılım oranı hesapla
-                total_slots = len(summary.get('slots', {}))
-                total_votes = sum(slot.get('yes_votes', 0) + slot.get('no_votes', 0) for slot in summary.get('slots', {}).values())
-                participant_count = summary.get('participant_count', 0)
-                
-                participation_rate = 0
-                if total_slots > 0 and participant_count > 0:
-                    participation_rate = (total_votes / (total_slots * participant_count)) * 100
-                
-                response_msg = f"📊 **{latest_event['title']} Analitikleri**\n\n"
-                response_msg += f"👥 **Katılımcı:** {participant_count} kişi\n"
-                response_msg += f"📈 **Katılım Oranı:** %{participation_rate:.1f}\n"
-                response_msg += f"⏰ **Slot Sayısı:** {total_slots}\n"
-                response_msg += f"🗳️ **Toplam Oy:** {total_votes}\n"
-                response_msg += f"💰 **Toplam Gider:** {summary['total_expense']} TL\n"
-                response_msg += f"📝 **Gider Sayısı:** {len(summary['expenses'])} adet"
-
-        # Konum komutu
-        elif message.startswith('/konum'):
-            parts = message.split()
-            if len(parts) < 2:
-                response_msg = "Kullanim: /konum [Mekan ID]"
-            else:
-                try:
-                    choice_id = int(parts[1])
-                    latest_event = db.get_latest_event(group_id)
-                    if not latest_event:
-                        response_msg = "Etkinlik yok!"
-                    else:
-                        # Mock konum verileri
-                        mock_locations = {
-                            1: {'name': 'Pizza Palace', 'address': 'Beşiktaş, İstanbul', 'distance': '2.5 km'},
-                            2: {'name': 'Ek Bina Kafe', 'address': 'Şişli, İstanbul', 'distance': '3.1 km'},
-                            3: {'name': 'Kütüphane', 'address': 'Beyoğlu, İstanbul', 'distance': '1.8 km'}
-                        }
-                        
-                        location = mock_locations.get(choice_id, {'name': 'Bilinmeyen Mekan', 'address': 'Adres bilgisi yok', 'distance': 'N/A'})
-                        
-                        response_msg = f"📍 **{location['name']} Konum Bilgileri**\n\n"
-                        response_msg += f"🏠 **Adres:** {location['address']}\n"
-                        response_msg += f"📏 **Mesafe:** {location['distance']}\n"
-                        response_msg += f"🗺️ **Harita:** https://maps.google.com"
-                except ValueError:
-                    response_msg = "Geçersiz mekan ID!"
-
-        # Test komutu
-        elif message.startswith('/test'):
-            response_msg = "Bot calisiyor! SQLite veritabani aktif. Test basarili."
+        # Kullanıcıyı aktif işaretle (bilinen kullanıcı için yazma yok)
+        db.touch_user(user_id)
 
-        else:
-            response_msg = f"Bilinmeyen komut: {message}"
+        response_msg = command_router.dispatch(message, CommandContext(user_id, group_id, message))
 
-        return jsonify({
+        return {
             'status': 'ok', 
             'bip_message': f"[MOCK BiP GRUP {group_id}] {response_msg}"
-        })
+        }, 200
     
     except Exception as e:
         logger.error(f"Webhook genel hatası: {str(e)}")
+        return {'status': 'error', 'message': str(e)}, 500
+
+@app.route('/webhook/bip', methods=['POST'])
+def bip_webhook():
+    """BiP webhook endpoint'i - komutları işler"""
+    body, status = process_webhook_message(request.get_json(silent=True))
+    return jsonify(body), status
+
+@app.route('/webhook/bip/batch', methods=['POST'])
+def bip_webhook_batch():
+    """Toplu BiP webhook endpoint'i - mesaj dizisini sırayla, tek veritabanı işleminde işler"""
+    payloads = request.get_json(silent=True)
+    if not isinstance(payloads, list):
+        return jsonify({'status': 'error', 'message': 'Mesaj dizisi bekleniyor'}), 400
+    if len(payloads) > WEBHOOK_BATCH_LIMIT:
+        return jsonify({
+            'status': 'error',
+            'message': f'En fazla {WEBHOOK_BATCH_LIMIT} mesaj gönderilebilir'
+        }), 413
+    
+    # Mesajlar gönderildiği sırayla işlenir; aynı grubun mesajları sırasını korur
+    results = []
+    try:
+        with db.transaction():
+            for payload in payloads:
+                body, status = process_webhook_message(payload)
+                results.append({'status_code': status, 'body': body})
+    except Exception as e:
+        # İşlem geri alındı; önbellekte commit edilmemiş versiyonlar kalmış olabilir
+        summary_cache.clear()
+        logger.error(f"Toplu webhook hatası: {str(e)}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
+    
+    logger.info(f"Toplu webhook işlendi: {len(results)} mesaj")
+    return jsonify({'status': 'ok', 'count': len(results), 'results': results})
 
 # ==================== RESTful API Endpoints ====================
 
@@ -515,7 +825,7 @@ def create_event_api():
         group_id = data.get('group_id', '').strip()
         
         # Kullanıcıyı kaydet/güncelle
-        db.create_or_update_user(created_by)
+        db.touch_user(created_by)
         
         # Etkinlik oluştur
         event_id = db.create_event(title, created_by, group_id)
@@ -589,9 +899,11 @@ def add_slot_api(event_id):
         delay_1h = (start_dt - now_utc).total_seconds() - 1*3600
         
         if delay_24h > 0:
-            remind(event_id, event['group_id'], delay_24h, "24 saat sonra etkinlik başlıyor! Hazır mısınız? 🎉")
+            remind(event_id, event['group_id'], delay_24h,
+                   "24 saat sonra etkinlik başlıyor! Hazır mısınız? 🎉", slot_id=slot_id)
         if delay_1h > 0:
-            remind(event_id, event['group_id'], delay_1h, "Etkinlik 1 saat sonra başlıyor! Son hazırlıklarınızı yapın! ⏰")
+            remind(event_id, event['group_id'], delay_1h,
+                   "Etkinlik 1 saat sonra başlıyor! Son hazırlıklarınızı yapın! ⏰", slot_id=slot_id)
         
         return jsonify({
             'status': 'success',
@@ -630,31 +942,11 @@ def vote_slot_api(event_id):
         if not event:
             return jsonify({'status': 'error', 'message': 'Etkinlik bulunamadı'}), 404
         
-        # Kullanıcıyı kaydet/güncelle
-        db.create_or_update_user(user_id)
+        # Kullanıcıyı aktif işaretle (bilinen kullanıcı için yazma yok)
+        db.touch_user(user_id)
         
-        # Kullanıcının daha önce slot oyu var mı kontrol et
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT slot_id FROM slot_votes 
-                WHERE event_id = ? AND user_id = ?
-            ''', (event_id, user_id))
-            existing_vote = cursor.fetchone()
-            
-            if existing_vote:
-                # Eski oyu sil
-                cursor.execute('''
-                    DELETE FROM slot_votes 
-                    WHERE event_id = ? AND user_id = ?
-                ''', (event_id, user_id))
-            
-            # Yeni oyu ver (her zaman 'yes' olarak)
-            cursor.execute('''
-                INSERT INTO slot_votes (event_id, slot_id, user_id, choice)
-                VALUES (?, ?, ?, ?)
-            ''', (event_id, slot_id, user_id, 'yes'))
-            conn.commit()
+        # Kullanıcının eski oyunu yeni oyla değiştir (her zaman 'yes' olarak)
+        db.replace_slot_vote(event_id, slot_id, user_id, 'yes')
         
         return jsonify({
             'status': 'success',
@@ -735,8 +1027,8 @@ def vote_poll_api(event_id):
         if not poll:
             return jsonify({'status': 'error', 'message': 'Anket bulunamadı'}), 404
         
-        # Kullanıcıyı kaydet/güncelle
-        db.create_or_update_user(user_id)
+        # Kullanıcıyı aktif işaretle (bilinen kullanıcı için yazma yok)
+        db.touch_user(user_id)
         
         # Anket oyu ver
         db.vote_poll(poll['poll_id'], choice_id, user_id)
@@ -799,8 +1091,8 @@ def add_expense_api(event_id):
         if not slot or slot['event_id'] != event_id:
             return jsonify({'status': 'error', 'message': 'Geçersiz slot ID'}), 400
         
-        # Kullanıcıyı kaydet/güncelle
-        db.create_or_update_user(user_id)
+        # Kullanıcıyı aktif işaretle (bilinen kullanıcı için yazma yok)
+        db.touch_user(user_id)
         
         # Gider oluştur
         expense_id = db.create_expense(event_id, user_id, amount, description, weight)
@@ -827,120 +1119,106 @@ def add_expense_api(event_id):
 def get_event_summary_api(event_id):
     """Etkinlik özetini getirir - GET /events/{id}/summary"""
     try:
-        # Etkinliğin var olup olmadığını kontrol et
-        event = db.get_event_by_id(event_id)
-        if not event:
+        # Versiyon değişmediyse özet hiç hesaplanmaz
+        version = db.get_event_version(event_id)
+        etag = f"summary-{event_id}-v{version}"
+        if version is not None and is_not_modified(etag):
+            return not_modified_response(etag)
+        
+        summary = get_cached_summary(event_id, version)
+        if not summary:
             return jsonify({'status': 'error', 'message': 'Etkinlik bulunamadı'}), 404
         
-        # Özet verilerini al
-        summary = db.get_event_summary(event_id)
-        
-        # Slot oylarını analiz et
-        slot_stats = {}
-        for slot in summary['slots']:
-            if slot['status'] == 'active':
-                yes_count = len([v for v in summary['slot_votes'] 
-                               if v['slot_id'] == slot['slot_id'] and v['choice'] == 'yes'])
-                no_count = len([v for v in summary['slot_votes'] 
-                              if v['slot_id'] == slot['slot_id'] and v['choice'] == 'no'])
-                slot_stats[slot['slot_id']] = {
-                    'start_datetime': slot['start_datetime'],
-                    'end_datetime': slot['end_datetime'],
-                    'yes_votes': yes_count,
-                    'no_votes': no_count,
-                    'total_votes': yes_count + no_count
-                }
-        
-        # Debug: Tüm slot oylarını göster
-        logger.info(f"Event {event_id} - Slot oyları: {summary['slot_votes']}")
-        logger.info(f"Event {event_id} - Slot stats: {slot_stats}")
-        
-        # Katılımcı sayısını hesapla (etkinlik listesi API ile aynı hesaplama)
-        participant_count = len(set(vote['user_id'] for vote in summary['slot_votes']))
-        
-        # En çok oy alan slot
-        best_slot = None
-        if slot_stats:
-            best_slot_id = max(slot_stats.keys(), key=lambda x: slot_stats[x]['yes_votes'])
-            best_slot = slot_stats[best_slot_id]
-        
-        # Anket oylarını analiz et
-        poll_stats = {}
-        if summary['poll']:
-            for choice in summary['poll_choices']:
-                vote_count = len([v for v in summary['poll_votes'] 
-                                if v['choice_id'] == choice['choice_id']])
-                poll_stats[choice['choice_id']] = {
-                    'text': choice['text'],
-                    'latitude': choice['latitude'],
-                    'longitude': choice['longitude'],
-                    'votes': vote_count
-                }
-        
-        # En çok oy alan seçenek
-        best_choice = None
-        if poll_stats:
-            best_choice_id = max(poll_stats.keys(), key=lambda x: poll_stats[x]['votes'])
-            best_choice = poll_stats[best_choice_id]
-        
-        # Gider analizi
-        total_expense = sum(exp['amount'] for exp in summary['expenses'])
-        total_weight = sum(exp['weight'] for exp in summary['expenses'])
-        
-        # Kullanıcı bakiyeleri
-        balances = {}
-        for expense in summary['expenses']:
-            user_id = expense['user_id']
-            if user_id not in balances:
-                balances[user_id] = 0
-            balances[user_id] += expense['amount']
-        
-        # Katılımcı sayısı
-        all_users = set()
-        for vote in summary['slot_votes']:
-            all_users.add(vote['user_id'])
-        for vote in summary['poll_votes']:
-            all_users.add(vote['user_id'])
-        for expense in summary['expenses']:
-            all_users.add(expense['user_id'])
-        
-        participant_count = len(all_users)
-        average_per_person = total_expense / participant_count if participant_count > 0 else 0
-        
-        # Her kullanıcının ödemesi gereken miktarı hesapla
-        for user_id in balances:
-            balances[user_id] -= average_per_person
-        
-        # Eşitlikte moderatör kararı için kontrol
-        tied_choices = []
-        needs_moderator_decision = False
-        if best_choice and poll_stats:
-            max_votes = best_choice['votes']
-            tied_choices = [choice for choice in poll_stats.values() if choice['votes'] == max_votes and max_votes > 0]
-            needs_moderator_decision = len(tied_choices) > 1
-        
-        return jsonify({
+        # Gider listesi veritabanından satır satır akıtılır (özetteki sayıyla sınırlı)
+        data = dict(summary, expenses=db.iter_expenses(event_id, limit=summary['expense_count']))
+        return with_etag(streaming_jsonify({
             'status': 'success',
-            'data': {
-                'event': dict(event),
-                'slots': slot_stats,
-                'best_slot': best_slot,
-                'poll_choices': poll_stats,
-                'best_choice': best_choice,
-                'tied_choices': tied_choices,
-                'needs_moderator_decision': needs_moderator_decision,
-                'expenses': [dict(exp) for exp in summary['expenses']],
-                'total_expense': total_expense,
-                'participant_count': participant_count,
-                'average_per_person': average_per_person,
-                'balances': balances
-            }
-        })
+            'data': data
+        }), etag)
         
     except Exception as e:
         logger.error(f"Özet API hatası: {str(e)}")
         return jsonify({'status': 'error', 'message': 'Özet oluşturulurken hata oluştu'}), 500
 
+@app.route('/events/<int:event_id>/settlement', methods=['GET'])
+def get_event_settlement_api(event_id):
+    """Hesaplaşma: ağırlıklı paylar ve en az transfer - GET /events/{id}/settlement"""
+    try:
+        version = db.get_event_version(event_id)
+        etag = f"settlement-{event_id}-v{version}"
+        if version is not None and is_not_modified(etag):
+            return not_modified_response(etag)
+        
+        settlement = build_settlement(event_id)
+        if settlement is None:
+            return jsonify({'status': 'error', 'message': 'Etkinlik bulunamadı'}), 404
+        
+        return with_etag(jsonify({
+            'status': 'success',
+            'data': dict(settlement, event_id=event_id, transfer_count=len(settlement['transfers']))
+        }), etag)
+        
+    except Exception as e:
+        logger.error(f"Hesaplaşma API hatası: {str(e)}")
+        return jsonify({'status': 'error', 'message': 'Hesaplaşma oluşturulurken hata oluştu'}), 500
+
+@app.route('/events/<int:event_id>/stream', methods=['GET'])
+def event_stream_api(event_id):
+    """Etkinlik değişikliklerini canlı yayınlar - GET /events/{id}/stream (SSE)"""
+    version = db.get_event_version(event_id)
+    if version is None:
+        return jsonify({'status': 'error', 'message': 'Etkinlik bulunamadı'}), 404
+    
+    if not stream_slots.acquire():
+        # Akış thread'leri dolu: bağlantı hemen kapanır, istek thread'leri webhook'lara kalır.
+        # Tarayıcı retry süresi sonunda (aynı Last-Event-ID ile) yeniden bağlanır
+        retry_ms = STREAM_BUSY_RETRY_MS + random.randint(0, STREAM_BUSY_RETRY_MS // 2)
+        body = f'retry: {retry_ms}\n\n' + format_sse(StreamMessage(None, 'busy', {'retry_ms': retry_ms}))
+        return Response(body, mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'Retry-After': str(retry_ms // 1000)
+        })
+    
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        subscription = stream_hub.subscribe(event_id, last_event_id)
+    except Exception:
+        stream_slots.release()
+        raise
+    
+    def generate():
+        seen_version = version
+        try:
+            yield 'retry: 3000\n\n'
+            yield format_sse(StreamMessage(None, 'hello', {'event_id': event_id, 'version': version}))
+            while True:
+                messages = subscription.wait(STREAM_HEARTBEAT_SECONDS)
+                for message in messages:
+                    if message.event == 'resync':
+                        seen_version = db.get_event_version(event_id) or seen_version
+                    else:
+                        seen_version = max(seen_version, message.data['version'])
+                    yield format_sse(message)
+                if messages:
+                    continue
+                # Diğer worker'lardaki yazmalar bu sürecin tamponuna düşmez; versiyondan yakalanır
+                current = db.get_event_version(event_id)
+                if current is not None and current > seen_version:
+                    seen_version = current
+                    yield format_sse(StreamMessage(None, 'resync', {'event_id': event_id, 'version': current}))
+                else:
+                    yield format_sse_comment('ping')
+        finally:
+            subscription.close()
+    
+    response = Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # Jeneratör hiç başlamasa da (istemci erken koparsa) yer bırakılır
+    response.call_on_close(stream_slots.release)
+    return response
+
 @app.route('/events/<int:event_id>/remind', methods=['POST'])
 def send_reminder_api(event_id):
     """Hatırlatıcı gönderir - POST /events/{id}/remind"""
@@ -963,9 +1241,10 @@ def send_reminder_api(event_id):
             return jsonify({'status': 'error', 'message': 'Etkinlik bulunamadı'}), 404
         
         # Hatırlatıcı gönder
+        reminder_id = None
         if delay > 0:
-            # Gecikmeli hatırlatıcı
-            Timer(delay, lambda: send_bip_message(event['group_id'], message)).start()
+            # Gecikmeli hatırlatıcı (kalıcı; yeniden başlatmada kaybolmaz)
+            reminder_id = remind(event_id, event['group_id'], delay, message)
             response_message = f'Hatırlatıcı {delay} saniye sonra gönderilecek'
         else:
             # Anında hatırlatıcı
@@ -979,7 +1258,8 @@ def send_reminder_api(event_id):
                 'event_id': event_id,
                 'group_id': event['group_id'],
                 'message': message,
-                'delay': delay
+                'delay': delay,
+                'reminder_id': reminder_id
             }
         })
         
@@ -997,11 +1277,9 @@ def generate_invite_link(event_id):
         if not event:
             return jsonify({'status': 'error', 'message': 'Etkinlik bulunamadı'}), 404
         
-        # Davet linki oluştur
-        invite_link = f"http://localhost:5000/join/{event_id}"
-        
-        # QR kod için URL (mock)
-        qr_code_url = f"http://localhost:5000/qr/{event_id}"
+        # Davet linki ve linki içeren QR kodun adresi
+        invite_link = f"{PUBLIC_BASE_URL}/join/{event_id}"
+        qr_code_url = f"{PUBLIC_BASE_URL}/qr/{event_id}"
         
         return jsonify({
             'status': 'success',
@@ -1018,6 +1296,32 @@ def generate_invite_link(event_id):
         logger.error(f"Davet linki oluşturma hatası: {str(e)}")
         return jsonify({'status': 'error', 'message': 'Davet linki oluşturulamadı'}), 500
 
+@app.route('/qr/<int:event_id>', methods=['GET'])
+def event_qr_code(event_id):
+    """Etkinliğin katılım linki için QR kod - GET /qr/{id}?format=png|svg&size=10"""
+    fmt = request.args.get('format', 'png').lower()
+    if fmt not in QR_FORMATS:
+        return jsonify({'status': 'error', 'message': f"format {', '.join(QR_FORMATS)} olmalı"}), 400
+    size = request.args.get('size', QR_DEFAULT_SIZE, type=int)
+    if size is None or not QR_MIN_SIZE <= size <= QR_MAX_SIZE:
+        return jsonify({'status': 'error', 'message': f'size {QR_MIN_SIZE}-{QR_MAX_SIZE} arasında olmalı'}), 400
+    try:
+        if db.get_event_version(event_id) is None:
+            return jsonify({'status': 'error', 'message': 'Etkinlik bulunamadı'}), 404
+        
+        body, etag = qr_cache.get(f"{PUBLIC_BASE_URL}/join/{event_id}", fmt, size)
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+        else:
+            response = app.response_class(body, mimetype=QR_FORMATS[fmt])
+        response.set_etag(etag)
+        # Link etkinlik silinmedikçe değişmez
+        response.headers['Cache-Control'] = 'public, max-age=86400'
+        return response
+    except Exception as e:
+        logger.error(f"QR kod oluşturma hatası: {str(e)}")
+        return jsonify({'status': 'error', 'message': 'QR kod oluşturulamadı'}), 500
+
 @app.route('/join/<int:event_id>', methods=['GET'])
 def join_event_page(event_id):
     """Etkinliğe katılma sayfası"""
@@ -1071,6 +1375,13 @@ def join_event_page(event_id):
 def get_event_analytics(event_id):
     """Etkinlik analitik verilerini döndürür"""
     try:
+        # Katılım oranı toplam kullanıcı sayısına da bağlı
+        version = db.get_event_version(event_id)
+        total_users = db.get_user_count()
+        etag = f"analytics-{event_id}-v{version}-u{total_users}"
+        if version is not None and is_not_modified(etag):
+            return not_modified_response(etag)
+        
         event = db.get_event_by_id(event_id)
         if not event:
             return jsonify({'status': 'error', 'message': 'Etkinlik bulunamadı'}), 404
@@ -1079,49 +1390,21 @@ def get_event_analytics(event_id):
         with db.get_connection() as conn:
             cursor = conn.cursor()
             
-            # Katılımcı sayısı
-            cursor.execute('''
-                SELECT COUNT(DISTINCT user_id) as participant_count
-                FROM (
-                    SELECT user_id FROM slot_votes WHERE event_id = ?
-                    UNION
-                    SELECT user_id FROM poll_votes WHERE poll_id IN (
-                        SELECT poll_id FROM polls WHERE event_id = ?
-                    )
-                    UNION
-                    SELECT user_id FROM expenses WHERE event_id = ?
-                )
-            ''', (event_id, event_id, event_id))
-            participant_count = cursor.fetchone()['participant_count']
-            
-            # Slot sayısı
-            cursor.execute('SELECT COUNT(*) as slot_count FROM slots WHERE event_id = ?', (event_id,))
-            total_slots = cursor.fetchone()['slot_count']
-            
-            # Toplam oy sayısı
-            cursor.execute('SELECT COUNT(*) as vote_count FROM slot_votes WHERE event_id = ?', (event_id,))
-            slot_votes = cursor.fetchone()['vote_count']
+            # Sayaçlar (yazma anında güncellenir)
+            cursor.execute('SELECT * FROM event_stats WHERE event_id = ?', (event_id,))
+            stats = cursor.fetchone()
+            participant_count = stats['participant_count'] if stats else 0
+            total_slots = stats['slot_count'] if stats else 0
+            total_votes = (stats['slot_yes_votes'] + stats['slot_no_votes'] + stats['poll_vote_count']) if stats else 0
+            expense_count = stats['expense_count'] if stats else 0
+            total_expense = stats['expense_total'] if stats else 0
             
+            # En aktif kullanıcı (gider sayısına göre; bakiye defterinden, O(katılımcı))
             cursor.execute('''
-                SELECT COUNT(*) as vote_count FROM poll_votes 
-                WHERE poll_id IN (SELECT poll_id FROM polls WHERE event_id = ?)
-            ''', (event_id,))
-            poll_votes = cursor.fetchone()['vote_count']
-            total_votes = slot_votes + poll_votes
-            
-            # Gider analizi
-            cursor.execute('SELECT COUNT(*) as expense_count, SUM(amount) as total_expense FROM expenses WHERE event_id = ?', (event_id,))
-            expense_data = cursor.fetchone()
-            expense_count = expense_data['expense_count'] or 0
-            total_expense = expense_data['total_expense'] or 0
-            
-            # En aktif kullanıcı (gider sayısına göre)
-            cursor.execute('''
-                SELECT user_id, COUNT(*) as expense_count 
-                FROM expenses 
-                WHERE event_id = ? 
-                GROUP BY user_id 
-                ORDER BY expense_count DESC 
+                SELECT user_id, expense_count
+                FROM event_balances
+                WHERE event_id = ?
+                ORDER BY expense_count DESC, user_id
                 LIMIT 1
             ''', (event_id,))
             most_active = cursor.fetchone()
@@ -1129,8 +1412,6 @@ def get_event_analytics(event_id):
             most_active_expenses = most_active['expense_count'] if most_active else 0
             
             # Katılım oranı (tüm potansiyel kullanıcılara göre)
-            cursor.execute('SELECT COUNT(*) as total_users FROM users')
-            total_users = cursor.fetchone()['total_users']
             participation_rate = (participant_count / total_users * 100) if total_users > 0 else 0
             
             avg_expense_per_person = total_expense / participant_count if participant_count > 0 else 0
@@ -1151,11 +1432,11 @@ def get_event_analytics(event_id):
             'best_place_votes': 0  # Bu veri summary'den alınacak
         }
         
-        return jsonify({
+        return with_etag(jsonify({
             'status': 'success',
             'message': 'Analitik veriler alındı',
             'data': analytics
-        })
+        }), etag)
     except Exception as e:
         logger.error(f"Analitik veri hatası: {str(e)}")
         return jsonify({'status': 'error', 'message': f'Analitik veriler alınamadı: {str(e)}'}), 500
@@ -1246,29 +1527,8 @@ def add_poll_choice(event_id):
         if not event:
             return jsonify({'status': 'error', 'message': 'Etkinlik bulunamadı'}), 404
         
-        # Etkinlik için mevcut anketi bul
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT poll_id FROM polls WHERE event_id = ?', (event_id,))
-            poll = cursor.fetchone()
-            
-            if not poll:
-                # Anket yoksa oluştur
-                cursor.execute('''
-                    INSERT INTO polls (event_id, question)
-                    VALUES (?, ?)
-                ''', (event_id, 'Mekan Seçimi'))
-                poll_id = cursor.lastrowid
-            else:
-                poll_id = poll['poll_id']
-            
-            # Seçeneği ekle (konum bilgisi ile)
-            cursor.execute('''
-                INSERT INTO poll_choices (poll_id, text, latitude, longitude)
-                VALUES (?, ?, ?, ?)
-            ''', (poll_id, text, latitude, longitude))
-            choice_id = cursor.lastrowid
-            conn.commit()
+        # Etkinliğin anketine seçeneği ekle (anket yoksa oluşturulur)
+        poll_id, choice_id = db.add_poll_choice(event_id, text, latitude, longitude)
         
         return jsonify({
             'status': 'success',
@@ -1298,7 +1558,11 @@ def api_info():
             'POST /events/{id}/vote': 'Anket için oy ver',
             'POST /events/{id}/expense': 'Gider ekle',
             'GET /events/{id}/summary': 'Etkinlik özeti al',
-            'POST /events/{id}/remind': 'Hatırlatıcı gönder'
+            'GET /events/{id}/settlement': 'Kim kime ne kadar ödemeli',
+            'POST /events/{id}/remind': 'Hatırlatıcı gönder',
+            'GET /api/events': 'Etkinlik listesi (sayfalı)',
+            'GET /api/events/export': 'Tüm etkinlikler (akışlı JSON)',
+            'GET /qr/{id}': 'Etkinlik katılım QR kodu (PNG/SVG)'
         },
         'utility': {
             'GET /health': 'Sağlık kontrolü',
@@ -1316,46 +1580,73 @@ def api_info():
         'documentation': 'API_DOCUMENTATION.md dosyasına bakın'
     })
 
+# Etkinlik listesi sayfa boyutu (varsayılan ve en fazla); 'all' tüm durumlar
+EVENTS_PAGE_SIZE = int(os.environ.get('BIP_BOT_EVENTS_PAGE_SIZE', 50))
+EVENTS_PAGE_MAX = 200
+
 @app.route('/api/events', methods=['GET'])
 def get_all_events():
-    """Tüm etkinlikleri listeler"""
+    """Etkinlikleri sayfa sayfa listeler - GET /api/events?limit=&cursor=&group_id=&status="""
     try:
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT 
-                    e.event_id,
-                    e.title,
-                    e.created_at,
-                    e.status,
-                    COUNT(DISTINCT sv.user_id) as participant_count
-                FROM events e
-                LEFT JOIN slot_votes sv ON e.event_id = sv.event_id
-                WHERE e.status = 'active'
-                GROUP BY e.event_id, e.title, e.created_at, e.status
-                ORDER BY e.created_at DESC
-            ''')
-            
-            events = []
-            for row in cursor.fetchall():
-                events.append({
-                    'event_id': row['event_id'],
-                    'title': row['title'],
-                    'created_at': row['created_at'],
-                    'status': row['status'],
-                    'participant_count': row['participant_count']
-                })
-            
-            return jsonify({
-                'status': 'success',
-                'message': f'{len(events)} etkinlik bulundu',
-                'events': events
-            })
+        limit = request.args.get('limit', EVENTS_PAGE_SIZE, type=int)
+        if limit is None or not 1 <= limit <= EVENTS_PAGE_MAX:
+            return jsonify({'status': 'error', 'message': f'limit 1-{EVENTS_PAGE_MAX} arasında olmalı'}), 400
+        status = request.args.get('status') or 'active'
+        group_id = request.args.get('group_id') or None
+        cursor = request.args.get('cursor') or None
+        try:
+            after = decode_events_cursor(cursor) if cursor else None
+        except ValueError:
+            return jsonify({'status': 'error', 'message': 'Geçersiz cursor'}), 400
+        
+        rows, has_more = db.get_events_page(limit, after=after, group_id=group_id,
+                                            status=None if status == 'all' else status)
+        next_cursor = encode_events_cursor(rows[-1]['created_at'], rows[-1]['event_id']) if has_more else None
+        
+        # Sayfa ETag'i: sayfadaki etkinliklerin versiyonları (katılımcı, durum vb. her değişiklikte artar)
+        signature = ','.join(f"{row['event_id']}:{row['version']}" for row in rows)
+        digest = hashlib.sha1(f"{request.query_string!r}|{signature}|{next_cursor}".encode('utf-8')).hexdigest()
+        etag = f"events-{digest[:20]}"
+        if is_not_modified(etag):
+            return not_modified_response(etag)
+        
+        events = [{
+            'event_id': row['event_id'],
+            'title': row['title'],
+            'group_id': row['group_id'],
+            'created_at': row['created_at'],
+            'status': row['status'],
+            'participant_count': row['participant_count']
+        } for row in rows]
+        
+        return with_etag(jsonify({
+            'status': 'success',
+            'message': f'{len(events)} etkinlik bulundu',
+            'events': events,
+            'has_more': has_more,
+            'next_cursor': next_cursor
+        }), etag)
             
     except Exception as e:
         logger.error(f"Etkinlik listesi API hatası: {str(e)}")
         return jsonify({'status': 'error', 'message': 'Etkinlik listesi alınamadı'}), 500
 
+@app.route('/api/events/export', methods=['GET'])
+def export_events():
+    """Tüm etkinlikleri tek yanıtta akıtır - GET /api/events/export?group_id=&status="""
+    status = request.args.get('status') or 'active'
+    group_id = request.args.get('group_id') or None
+    rows = db.iter_events(group_id=group_id, status=None if status == 'all' else status)
+    events = ({
+        'event_id': row['event_id'],
+        'title': row['title'],
+        'group_id': row['group_id'],
+        'created_at': row['created_at'],
+        'status': row['status'],
+        'participant_count': row['participant_count']
+    } for row in rows)
+    return streaming_jsonify({'status': 'success', 'events': events})
+
 @app.route('/events/<int:event_id>/slots/<int:slot_id>/close', methods=['POST'])
 def close_slot_api(event_id, slot_id):
     """Slot'u kapatır"""
@@ -1384,14 +1675,9 @@ def close_slot_api(event_id, slot_id):
             # Yetki kontrolü: Herkes kapatabilir (geçici olarak gevşetildi)
             # if slot['created_by'] != user_id and event['created_by'] != user_id:
             #     return jsonify({'status': 'error', 'message': 'Bu slot\'u kapatma yetkiniz yok'}), 403
-            
-            # Slot'u kapat
-            cursor.execute('''
-                UPDATE slots 
-                SET status = 'closed' 
-                WHERE slot_id = ? AND event_id = ?
-            ''', (slot_id, event_id))
-            conn.commit()
+        
+        # Slot'u kapat
+        db.close_slot(event_id, slot_id)
         
         return jsonify({
             'status': 'success',
@@ -1410,30 +1696,64 @@ def close_slot_api(event_id, slot_id):
 @app.route('/health', methods=['GET'])
 def health_check():
     """Sağlık kontrolü endpoint'i"""
-    return jsonify({'status': 'healthy', 'timestamp': datetime.now().isoformat()})
+    return jsonify({
+        'status': 'healthy',
+        'timestamp': datetime.now().isoformat(),
+        'database': {
+            'profile': db.profile,
+            'pool': db.get_pool_stats(),
+            'checkpoint': db.get_checkpoint_stats(),
+            'write_behind': db.get_write_behind_stats(),
+            'user_presence': db.get_presence_stats(),
+            'latest_event_cache': db.get_latest_event_cache_stats()
+        },
+        'rate_limiter': rate_limiter.stats(),
+        'scheduler': reminder_scheduler.stats(),
+        'messaging': message_dispatcher.stats(),
+        'summary_cache': summary_cache.stats(),
+        'event_stream': stream_hub.stats(),
+        'stream_slots': stream_slots.stats(),
+        'compression': json_compressor.stats(),
+        'static_assets': static_assets.stats(),
+        'qr_cache': qr_cache.stats()
+    })
+
+def serve_static_asset(name):
+    """Bellekteki statik dosyayı uygun sıkıştırmayla döndürür; dosya yoksa None"""
+    try:
+        asset = static_assets.get(name)
+    except FileNotFoundError:
+        return None
+    encoding, body = asset.select(request.headers.get('Accept-Encoding'))
+    etag = asset.etag(encoding)
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(body, content_type=asset.content_type)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(etag)
+    # Sürümlü URL (?v=hash) içerik değişince değişir; uzun süre önbelleklenebilir
+    versioned = request.args.get('v') == asset.version
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL if versioned else REVALIDATE_CACHE_CONTROL
+    if len(asset.variants) > 1:
+        response.vary.add('Accept-Encoding')
+    return response
 
 @app.route('/', methods=['GET'])
 def frontend_page():
     """Ana frontend sayfası"""
-    try:
-        with open('frontend.html', 'r', encoding='utf-8') as f:
-            return f.read()
-    except FileNotFoundError:
-        return "Frontend dosyası bulunamadı!", 404
+    return serve_static_asset('frontend.html') or ("Frontend dosyası bulunamadı!", 404)
 
 @app.route('/invite.png', methods=['GET'])
 def serve_invite_qr():
     """QR kod resmini serve eder"""
-    try:
-        from flask import send_file
-        return send_file('invite.png', mimetype='image/png')
-    except FileNotFoundError:
-        return "QR kod dosyası bulunamadı!", 404
+    return serve_static_asset('invite.png') or ("QR kod dosyası bulunamadı!", 404)
 
 @app.route('/invite', methods=['GET'])
 def invite_page():
     """Davet sayfası"""
-    return """
+    return string.Template("""
     <html>
     <head>
         <title>BiP Bot - SQLite</title>
@@ -1459,7 +1779,7 @@ def invite_page():
             </div>
             
             <div class="qr-code">
-                <img src="invite.png" alt="QR Code" style="max-width: 200px;">
+                <img src="$qr_url" alt="QR Code" style="max-width: 200px;">
             </div>
             
             <div class="instructions">
@@ -1472,17 +1792,18 @@ def invite_page():
                 <div class="command"><strong>/gider TUTAR "Açıklama" [ağırlık]</strong> - Gider ekle</div>
                 <div class="command"><strong>/slot_kapat SLOT_ID</strong> - Slot kapat (moderatör)</div>
                 <div class="command"><strong>/ozet</strong> - Etkinlik özetini göster</div>
+                <div class="command"><strong>/hesap</strong> - Kim kime ne kadar ödemeli</div>
                 <div class="command"><strong>/test</strong> - Bot testi</div>
             </div>
         </div>
     </body>
     </html>
-    """
+    """).substitute(qr_url=static_assets.url('invite.png'))
 
 if __name__ == '__main__':
     # Production için port ve host ayarları
     port = int(os.environ.get('PORT', 5000))
-    debug = os.environ.get('DEBUG', 'True').lower() == 'true'
+    debug = os.environ.get('DEBUG', 'False').lower() == 'true'
     
     logger.info(f"BiP Bot (SQLite) başlatılıyor - Port: {port}, Debug: {debug}")
     app.run(debug=debug, port=port, host='0.0.0.0')
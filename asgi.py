@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⚡ BiP Bot - ASGI (asyncio) Sunum Modu
+Flask uygulamasını asyncio sunucuları (uvicorn, hypercorn) arkasında çalıştırır
+
+Özellikler:
+- WSGI→ASGI adaptörü: tüm rotalar (/webhook/bip, /events/*, /api/events) aynen çalışır
+- Flask view'ları (ve veritabanı çağrıları) ayrı, boyutu sınırlı bir executor'da çalışır
+- Content-Length'li yanıtlar tek executor turunda, akış yanıtları parça parça gönderilir
+- /events/<id>/stream native asyncio SSE: abone başına thread tutulmaz
+- Lifespan desteği: kapanışta executor'daki işlerin bitmesi beklenir
+- WEB_CONCURRENCY > 1: ortak aktif etkinlik önbelleği, tek worker'da hatırlatıcı dispatcher'ı
+
+Kullanım:
+WEB_CONCURRENCY=4 uvicorn asgi:application
+BIP_BOT_ASGI_EXECUTOR_THREADS=32 uvicorn asgi:application
+
+Yazar: BiP Bot Development Team
+Versiyon: 2.0.0
+"""
+
+import io
+import os
+import re
+import sys
+import asyncio
+import logging
+from urllib.parse import parse_qs
+from concurrent.futures import ThreadPoolExecutor
+
+from event_stream import StreamMessage, format_sse, format_sse_comment
+
+logger = logging.getLogger(__name__)
+
+# Tek executor turunda tamponlanacak en büyük yanıt; daha büyükleri parça parça gönderilir
+MAX_BUFFERED_RESPONSE = 1024 * 1024
+STREAM_PATH = re.compile(r'^/events/(\d+)/stream$')
+
+
+def build_environ(scope, body):
+    """ASGI http scope'undan WSGI environ sözlüğü üretir"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    root_path = scope.get('root_path', '')
+    path = scope['path']
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': root_path,
+        'PATH_INFO': path,
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+        'asgi.scope': scope
+    }
+    for raw_name, raw_value in scope.get('headers', []):
+        name = raw_name.decode('latin-1').upper().replace('-', '_')
+        value = raw_value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name in ('CONTENT_LENGTH', 'TRANSFER_ENCODING'):
+            continue  # Gövde tamamen okundu; uzunluk aşağıda verilir
+        else:
+            key = f'HTTP_{name}'
+            # Tekrarlanan başlıklar WSGI'daki gibi virgülle birleştirilir
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+    environ['CONTENT_LENGTH'] = str(len(body))
+    return environ
+
+
+class _WsgiCall:
+    """Tek bir WSGI çağrısının durumu; metotları executor thread'inde çalışır"""
+
+    def __init__(self, wsgi_app, environ):
+        self.wsgi_app = wsgi_app
+        self.environ = environ
+        self.status = None
+        self.headers = None
+        self.iterator = None
+        self.result = None
+
+    def _start_response(self, status, headers, exc_info=None):
+        if exc_info and self.status is not None:
+            raise exc_info[1].with_traceback(exc_info[2])
+        self.status = int(status.split(' ', 1)[0])
+        self.headers = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+        return lambda data: None  # Eski write() arayüzü kullanılmıyor
+
+    def start(self):
+        """Uygulamayı çağırır; Content-Length'li küçük yanıtlarda gövdenin tamamını döndürür
+
+        Akış yanıtlarında ilk parçayı döndürür; kalanlar next_chunk() ile alınır.
+        """
+        self.result = self.wsgi_app(self.environ, self._start_response)
+        try:
+            self.iterator = iter(self.result)
+            first = next(self.iterator, None)
+            length = dict(self.headers or []).get(b'content-length')
+            if length is not None and int(length) <= MAX_BUFFERED_RESPONSE:
+                chunks = [] if first is None else [first]
+                chunks.extend(self.iterator)
+                self.close()
+                return b''.join(chunks), True
+        except BaseException:
+            self.close()
+            raise
+        if first is None:
+            self.close()
+            return b'', True
+        return first, False
+
+    def next_chunk(self):
+        """Akış yanıtının sonraki parçası; bitince None"""
+        chunk = next(self.iterator, None)
+        if chunk is None:
+            self.close()
+        return chunk
+
+    def close(self):
+        """WSGI iterable'ının close() metodunu çağırır (Flask teardown'ları burada çalışır)"""
+        result, self.result = self.result, None
+        if result is not None and hasattr(result, 'close'):
+            result.close()
+
+
+class WsgiToAsgi:
+    def __init__(self, wsgi_app, executor=None, max_threads=16):
+        """WSGI uygulamasını ASGI 3 uygulamasına çevirir; view'lar executor'da çalışır"""
+        self.wsgi_app = wsgi_app
+        self.executor = executor or ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix='bip-asgi')
+
+    async def _run(self, func, *args):
+        """func'ı executor'da çalıştırır"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            raise RuntimeError(f"Desteklenmeyen ASGI scope tipi: {scope['type']}")
+        body = await read_body(receive)
+        call = _WsgiCall(self.wsgi_app, build_environ(scope, body))
+        chunk, complete = await self._run(call.start)
+        await send({'type': 'http.response.start', 'status': call.status, 'headers': call.headers})
+        try:
+            while not complete:
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                chunk = await self._run(call.next_chunk)
+                complete = chunk is None
+            await send({'type': 'http.response.body', 'body': chunk or b'', 'more_body': False})
+        finally:
+            if not complete:
+                await self._run(call.close)
+
+
+async def read_body(receive):
+    """İstek gövdesinin tamamını okur"""
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body', False):
+            break
+    return b''.join(chunks)
+
+
+class EventStreamEndpoint:
+    def __init__(self, hub, db, executor, heartbeat=15.0, extra_headers=()):
+        """GET /events/<id>/stream'in asyncio sürümü (app.event_stream_api ile aynı protokol)"""
+        self.hub = hub
+        self.db = db
+        self.executor = executor
+        self.heartbeat = heartbeat
+        self.extra_headers = list(extra_headers)
+        self._open = 0
+
+    async def _version(self, event_id):
+        """Etkinlik versiyonunu executor'da okur"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.db.get_event_version, event_id)
+
+    async def __call__(self, scope, receive, send, event_id):
+        """Akışı sunar; etkinlik yoksa hiçbir şey göndermeden False döner"""
+        version = await self._version(event_id)
+        if version is None:
+            return False
+
+        headers = dict((name.decode('latin-1').lower(), value.decode('latin-1')) for name, value in scope['headers'])
+        last_event_id = headers.get('last-event-id')
+        if not last_event_id:
+            query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+            last_event_id = query.get('last_event_id', [None])[0]
+
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+        disconnected = asyncio.Event()
+        subscription = self.hub.subscribe(event_id, last_event_id)
+        subscription.set_waker(lambda: loop.call_soon_threadsafe(ready.set))
+
+        async def watch_disconnect():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+            disconnected.set()
+            ready.set()
+
+        watcher = asyncio.ensure_future(watch_disconnect())
+        self._open += 1
+        try:
+            await send({'type': 'http.response.start', 'status': 200, 'headers': [
+                (b'content-type', b'text/event-stream; charset=utf-8'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no')
+            ] + self.extra_headers})
+
+            async def emit(text):
+                await send({'type': 'http.response.body', 'body': text.encode('utf-8'), 'more_body': True})
+
+            seen_version = version
+            await emit('retry: 3000\n\n')
+            await emit(format_sse(StreamMessage(None, 'hello', {'event_id': event_id, 'version': version})))
+            while not disconnected.is_set():
+                # Hub kilidi sadece bellekteki tamponu okurken kısa süre tutulur
+                messages = subscription.wait(0)
+                if not messages:
+                    ready.clear()
+                    messages = subscription.wait(0)  # clear() ile yayın arasındaki yarış
+                if not messages:
+                    try:
+                        await asyncio.wait_for(ready.wait(), self.heartbeat)
+                        continue
+                    except asyncio.TimeoutError:
+                        pass
+                    # Diğer worker'lardaki yazmalar bu sürecin tamponuna düşmez; versiyondan yakalanır
+                    current = await self._version(event_id)
+                    if current is not None and current > seen_version:
+                        seen_version = current
+                        await emit(format_sse(StreamMessage(None, 'resync', {'event_id': event_id, 'version': current})))
+                    else:
+                        await emit(format_sse_comment('ping'))
+                    continue
+                for message in messages:
+                    if message.event == 'resync':
+                        seen_version = (await self._version(event_id)) or seen_version
+                    else:
+                        seen_version = max(seen_version, message.data['version'])
+                    await emit(format_sse(message))
+        except OSError:
+            pass  # İstemci bağlantıyı kopardı
+        finally:
+            self._open -= 1
+            watcher.cancel()
+            subscription.close()
+        return True
+
+    def stats(self):
+        """Açık akış sayısını döndürür"""
+        return {'open_streams': self._open}
+
+
+class BipAsgiApp:
+    def __init__(self, flask_app, hub, db, max_threads=16, heartbeat=15.0, cors_origin='*'):
+        """Flask uygulamasını ASGI olarak sunar; SSE akışını native asyncio ile karşılar"""
+        self.db = db
+        self.executor = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix='bip-asgi')
+        self.wsgi = WsgiToAsgi(flask_app, self.executor)
+        extra_headers = [(b'access-control-allow-origin', cors_origin.encode('latin-1'))] if cors_origin else []
+        self.stream = EventStreamEndpoint(hub, db, self.executor, heartbeat, extra_headers)
+
+    async def lifespan(self, receive, send):
+        """ASGI lifespan mesajlarını karşılar"""
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                logger.info("ASGI uygulaması başlatıldı")
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=True)
+                logger.info("ASGI uygulaması kapatıldı")
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] == 'http' and scope['method'] == 'GET':
+            match = STREAM_PATH.match(scope['path'])
+            # Etkinlik yoksa 404 yanıtını Flask üretir
+            if match and await self.stream(scope, receive, send, int(match.group(1))):
+                return
+        await self.wsgi(scope, receive, send)
+
+
+def create_application():
+    """app.py'deki Flask uygulamasından ASGI uygulamasını oluşturur
+
+    uvicorn --workers her worker'ı ayrı süreçte başlatır ve bu fonksiyonu her birinde
+    çağırır. WEB_CONCURRENCY > 1 iken aktif etkinlik önbelleği varsayılan olarak shared
+    modundadır ve hatırlatıcı dispatcher'ı sadece bakım kilidini alan worker'da çalışır.
+    """
+    workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+    run_scheduler = os.environ.get('BIP_BOT_SCHEDULER', '1') != '0'
+    if workers > 1:
+        os.environ.setdefault('BIP_BOT_LATEST_EVENT_CACHE', 'shared')
+        # app modülü yüklenirken her worker kendi dispatcher'ını başlatmasın
+        os.environ['BIP_BOT_SCHEDULER'] = '0'
+    from app import app, db, stream_hub, reminder_scheduler, MaintenanceOwner, STREAM_HEARTBEAT_SECONDS
+    if workers > 1 and run_scheduler:
+        MaintenanceOwner(
+            f'{db.db_path}.owner.lock', float(os.environ.get('BIP_BOT_OWNER_RETRY_SECONDS', 30)), logger
+        ).run(reminder_scheduler.start)
+    return BipAsgiApp(
+        app, stream_hub, db,
+        max_threads=int(os.environ.get('BIP_BOT_ASGI_EXECUTOR_THREADS', 16)),
+        heartbeat=STREAM_HEARTBEAT_SECONDS
+    )
+
+
+application = create_application()
+
+
+if __name__ == '__main__':
+    try:
+        import uvicorn
+    except ImportError:
+        logger.error("ASGI modu için uvicorn gerekli: pip install uvicorn")
+        sys.exit(1)
+    uvicorn.run('asgi:application', host='0.0.0.0', port=int(os.environ.get('PORT', 5000)),
+                workers=int(os.environ.get('WEB_CONCURRENCY', 1)))
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ BiP Bot - WSGI / ASGI Sunum Modu Benchmark'ı
+Flask (WSGI, thread başına istek) ile asgi.py (asyncio + executor) arasında saniyedeki
+istek sayısını ve p50/p99 gecikmesini karşılaştırır
+
+Özellikler:
+- Süreç içi mod: ağ olmadan, aynı istek karışımı iki sunum modunda
+- HTTP modu: çalışan bir sunucuya (gunicorn app:app veya uvicorn asgi:application) yük
+- --streams N: yük sırasında N SSE akışı (açık sekme) açık tutulur; webhook'ların aç kalmadığı görülür
+- Geçici veritabanı; gerçek veriye dokunmaz
+
+Kullanım:
+python benchmarks/bench_asgi.py [--requests 5000] [--concurrency 32]
+gunicorn -w 4 --threads 8 app:app &
+python benchmarks/bench_asgi.py --url http://127.0.0.1:8000
+python benchmarks/bench_asgi.py --url http://127.0.0.1:8000 --streams 64
+WEB_CONCURRENCY=4 uvicorn asgi:application &
+python benchmarks/bench_asgi.py --url http://127.0.0.1:8000
+
+Yazar: BiP Bot Development Team
+Versiyon: 2.0.0
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Global örnekler gerçek veritabanına dokunmasın; limitler ölçümü bozmasın
+os.environ.setdefault('BIP_BOT_DB', os.path.join(tempfile.mkdtemp(), 'global.db'))
+os.environ.setdefault('BIP_BOT_RATE_LIMIT', '0')
+os.environ.setdefault('BIP_BOT_SCHEDULER', '0')
+
+
+def request_mix(count, groups=50):
+    """(method, path, gövde) listesi: webhook okuma/yazma ve REST okumaları"""
+    requests = []
+    for n in range(count):
+        group_id = f'bench_group_{n % groups}'
+        kind = n % 4
+        if kind == 0:
+            body = {'message': '/ozet', 'user_id': f'user_{n % 500}', 'group_id': group_id}
+            requests.append(('POST', '/webhook/bip', body))
+        elif kind == 1:
+            body = {'message': '/katil slot=1 yes', 'user_id': f'user_{n % 500}', 'group_id': group_id}
+            requests.append(('POST', '/webhook/bip', body))
+        elif kind == 2:
+            requests.append(('GET', f'/events/{n % groups + 1}/summary', None))
+        else:
+            requests.append(('GET', '/api/events', None))
+    return requests
+
+
+def seed(groups=50):
+    """Her gruba bir etkinlik ve slot ekler"""
+    from database import db
+    with db.transaction():
+        for n in range(groups):
+            event_id = db.create_event(f'Etkinlik {n}', 'moderator', f'bench_group_{n}')
+            db.create_slot(event_id, '2030-01-01T18:00:00', '2030-01-01T20:00:00')
+
+
+def percentiles(latencies):
+    latencies = sorted(latencies)
+    return latencies[len(latencies) // 2], latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+
+
+def report(name, elapsed, latencies):
+    p50, p99 = percentiles(latencies)
+    print(f"{name:<14} {len(latencies) / elapsed:>8.0f} istek/sn   p50: {p50 * 1000:>7.2f} ms   "
+          f"p99: {p99 * 1000:>7.2f} ms")
+
+
+def make_scope(method, path):
+    return {'type': 'http', 'method': method, 'path': path, 'root_path': '', 'query_string': b'',
+            'headers': [(b'host', b'bench'), (b'content-type', b'application/json')],
+            'http_version': '1.1', 'scheme': 'http', 'server': ('bench', 80), 'client': ('127.0.0.1', 1)}
+
+
+def run_wsgi(requests, concurrency):
+    """Her istek bir thread'de Flask'a verilir (gunicorn --threads gibi)"""
+    from app import app
+    from asgi import build_environ
+
+    def handle(item):
+        method, path, body = item
+        payload = json.dumps(body).encode('utf-8') if body is not None else b''
+        started = time.perf_counter()
+        result = app(build_environ(make_scope(method, path), payload), lambda status, headers, exc_info=None: None)
+        b''.join(result)
+        if hasattr(result, 'close'):
+            result.close()
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        started = time.perf_counter()
+        latencies = list(pool.map(handle, requests))
+        return time.perf_counter() - started, latencies
+
+
+def run_asgi(requests, concurrency):
+    """Tek event loop; aynı anda concurrency istek, view'lar asgi executor'ında"""
+    from asgi import application
+
+    async def handle(item):
+        method, path, body = item
+        payload = json.dumps(body).encode('utf-8') if body is not None else b''
+        pending = [{'type': 'http.request', 'body': payload, 'more_body': False}]
+
+        async def receive():
+            return pending.pop() if pending else {'type': 'http.disconnect'}
+
+        async def send(message):
+            pass
+
+        started = time.perf_counter()
+        await application(make_scope(method, path), receive, send)
+        return time.perf_counter() - started
+
+    async def main():
+        queue = list(reversed(requests))
+        latencies = []
+
+        async def client():
+            while queue:
+                latencies.append(await handle(queue.pop()))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        return time.perf_counter() - started, latencies
+
+    return asyncio.run(main())
+
+
+def run_http(url, requests, concurrency):
+    """Çalışan sunucuya concurrency thread ile HTTP yükü uygular"""
+    lock = threading.Lock()
+    errors = {'non_2xx': 0, 'connection': 0}
+
+    def handle(item):
+        method, path, body = item
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        request = urllib.request.Request(url.rstrip('/') + path, data=data, method=method,
+                                         headers={'Content-Type': 'application/json'})
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                response.read()
+        except urllib.error.HTTPError as e:
+            # Boş veritabanında /summary 404 döner; yanıt yine de ölçülür
+            e.read()
+            with lock:
+                errors['non_2xx'] += 1
+        except OSError:
+            with lock:
+                errors['connection'] += 1
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        started = time.perf_counter()
+        latencies = list(pool.map(handle, requests))
+        elapsed = time.perf_counter() - started
+    return elapsed, latencies, errors
+
+
+def open_streams(url, count):
+    """Yeni bir etkinliğe count SSE akışı açar; açık/busy sayılarını döndürür
+
+    Akışlar daemon thread'lerde süreç bitene kadar açık kalır (okuyan thread varken
+    yanıtı kapatmak bir sonraki kalp atışına kadar bloklar)
+    """
+    body = json.dumps({'title': 'Akış yükü', 'created_by': 'bench', 'group_id': 'bench_streams'}).encode('utf-8')
+    request = urllib.request.Request(url.rstrip('/') + '/events', data=body, method='POST',
+                                     headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        event_id = json.loads(response.read())['event_id']
+
+    lock = threading.Lock()
+    counts = {'open': 0, 'busy': 0, 'failed': 0}
+    ready = threading.Semaphore(0)
+
+    def hold():
+        try:
+            response = urllib.request.urlopen(f"{url.rstrip('/')}/events/{event_id}/stream", timeout=300)
+            for line in response:
+                if line.startswith(b'event: '):
+                    state = 'busy' if line.startswith(b'event: busy') else 'open'
+                    with lock:
+                        counts[state] += 1
+                    break
+            ready.release()
+            # Sunucu kapatana (busy) veya süreç bitene kadar okumaya devam
+            for _line in response:
+                pass
+        except OSError:
+            with lock:
+                counts['failed'] += 1
+            ready.release()
+
+    for _ in range(count):
+        threading.Thread(target=hold, daemon=True).start()
+    # Thread'leri dolu bir sunucu akışlara hiç yanıt vermeyebilir; toplamda en fazla 10 sn beklenir
+    deadline = time.monotonic() + 10
+    for _ in range(count):
+        if not ready.acquire(timeout=max(deadline - time.monotonic(), 0)):
+            break
+    with lock:
+        counts['waiting'] = count - counts['open'] - counts['busy'] - counts['failed']
+        return dict(counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='WSGI / ASGI sunum modu benchmark')
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--url', help='Çalışan sunucu adresi (HTTP modu)')
+    parser.add_argument('--streams', type=int, default=0, help='Yük sırasında açık tutulacak SSE akışı (HTTP modu)')
+    args = parser.parse_args()
+
+    requests = request_mix(args.requests)
+    if args.url:
+        if args.streams:
+            counts = open_streams(args.url, args.streams)
+            print(f"SSE akışı: {counts['open']} açık, {counts['busy']} busy, {counts['waiting']} yanıt bekliyor, "
+                  f"{counts['failed']} hata")
+        elapsed, latencies, errors = run_http(args.url, requests, args.concurrency)
+        report('http', elapsed, latencies)
+        print(f"2xx dışı yanıt: {errors['non_2xx']}   bağlantı hatası: {errors['connection']}")
+        return
+
+    seed()
+    # Isınma: önbellekler ve bağlantı havuzu dolsun
+    run_wsgi(requests[:200], args.concurrency)
+    for name, runner in (('wsgi (flask)', run_wsgi), ('asgi', run_asgi)):
+        elapsed, latencies = runner(requests, args.concurrency)
+        report(name, elapsed, latencies)
+
+
+if __name__ == '__main__':
+    main()
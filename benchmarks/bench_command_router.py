@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ BiP Bot - Komut Yönlendirici Mikro Benchmark'ı
+Komut başına yönlendirme ve argüman ayrıştırma maliyetini ölçer
+
+Özellikler:
+- Tablo tabanlı yönlendirme (sözlük araması + derlenmiş kalıp)
+- Eski if/elif startswith zinciri ile karşılaştırma
+- Veritabanına dokunmaz; sadece yönlendirme ve ayrıştırma
+
+Kullanım:
+python benchmarks/bench_command_router.py [--number 100000]
+
+Yazar: BiP Bot Development Team
+Versiyon: 2.0.0
+"""
+
+import os
+import sys
+import argparse
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Uygulama içe aktarılırken gerçek veritabanına dokunulmasın
+os.environ.setdefault('BIP_BOT_DB', os.path.join(tempfile.mkdtemp(), 'bench.db'))
+
+from app import command_router  # noqa: E402
+
+MESSAGES = [
+    '/yeni Parti Gecesi',
+    '/slot 2030-01-01 18:00-20:00',
+    '/slot_kapat 3',
+    '/katil slot=1 yes',
+    '/mekan Kafe 41.0 29.0',
+    '/oy_mekan 2',
+    '/gider 120.5 "pizza ve kola" 2',
+    '/ozet',
+    '/davet',
+    '/analitik',
+    '/konum 1',
+    '/test',
+]
+
+# Eski bip_webhook sırası; her mesaj sırayla bu öneklerle denenirdi
+LEGACY_PREFIXES = [
+    '/yeni', '/slot_kapat', '/slot', '/katil', '/mekan', '/oy_mekan', '/gider',
+    '/ozet', '/ozet', '/davet', '/analitik', '/konum', '/test'
+]
+
+
+def legacy_dispatch(message):
+    """Eski zincirin önek taraması (argüman ayrıştırma hariç)"""
+    for prefix in LEGACY_PREFIXES:
+        if message.startswith(prefix):
+            return prefix
+    return None
+
+
+def routed(message):
+    """Yeni yönlendirme + derlenmiş argüman ayrıştırma"""
+    command, args = command_router.resolve(message)
+    return command.parse(args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Komut yönlendirme benchmark')
+    parser.add_argument('--number', type=int, default=100000, help='Komut başına tekrar sayısı')
+    args = parser.parse_args()
+
+    print(f"{'Komut':<36} {'önek taraması':>14} {'yönlendirme':>12} {'+ ayrıştırma':>13}")
+    for message in MESSAGES:
+        legacy = timeit.timeit(lambda: legacy_dispatch(message), number=args.number)
+        resolve = timeit.timeit(lambda: command_router.resolve(message), number=args.number)
+        parsed = timeit.timeit(lambda: routed(message), number=args.number)
+        print(f"{message:<36} {legacy / args.number * 1e9:>11.0f} ns "
+              f"{resolve / args.number * 1e9:>9.0f} ns {parsed / args.number * 1e9:>10.0f} ns")
+    os._exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ BiP Bot - Akışlı JSON Bellek Benchmark'ı
+Büyük etkinlik listesini jsonify (tüm liste bellekte) ve akışlı yanıtla
+döndürürken süreç bellek tepe değerini (RSS) karşılaştırır
+
+Özellikler:
+- Her mod ayrı süreçte ölçülür (ru_maxrss süreç başına tepe değerdir)
+- Anonim bellek (RssAnon) ayrıca örneklenir; SQLite mmap sayfaları RSS'e dosya belleği olarak girer
+- Akışlı yanıt GET /api/events/export ile parça parça tüketilir
+- Geçici veritabanı; gerçek veriye dokunmaz
+
+Kullanım:
+python benchmarks/bench_json_stream.py [--rows 1000000]
+
+Yazar: BiP Bot Development Team
+Versiyon: 2.0.0
+"""
+
+import os
+import sys
+import time
+import argparse
+import resource
+import threading
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def populate(path, rows):
+    """rows adet etkinlik ekler (sayaç trigger'ları event_stats'ı doldurur)"""
+    os.environ['BIP_BOT_DB'] = path
+    from database import Database
+    db = Database(path, pool_size=1, write_behind=False)
+    with db.transaction(), db.get_connection() as conn:
+        conn.executemany(
+            'INSERT INTO events (title, created_by, group_id, created_at) VALUES (?, ?, ?, ?)',
+            ((f'Etkinlik {n}', 'moderator', f'group_{n % 1000}',
+              f'2030-01-01 {n // 3600 % 24:02d}:{n // 60 % 60:02d}:{n % 60:02d}') for n in range(rows))
+        )
+    db.close()
+
+
+def peak_rss_mb():
+    """Sürecin şimdiye kadarki en yüksek RSS değeri (MB; Linux'ta ru_maxrss KB)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def anon_rss_mb():
+    """Anonim (heap) RSS (MB); /proc yoksa None"""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('RssAnon:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class AnonPeakSampler(threading.Thread):
+    def __init__(self, interval=0.005):
+        """Anonim RSS'in tepe değerini arka planda örnekler"""
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = anon_rss_mb() or 0.0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.peak = max(self.peak, anon_rss_mb() or 0.0)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        return self.peak
+
+
+def child(mode):
+    """Tek modu bu süreçte çalıştırır; 'MB MB MB MB bayt saniye' yazar"""
+    from app import app, db
+    client = app.test_client()
+    client.get('/api/events?limit=1')  # Isınma: bağlantı havuzu ve modüller yüklensin
+    baseline = peak_rss_mb()
+    anon_baseline = anon_rss_mb() or 0.0
+    sampler = AnonPeakSampler()
+    sampler.start()
+    started = time.perf_counter()
+    size = 0
+    if mode == 'jsonify':
+        with app.test_request_context():
+            # Önceki yol: tüm satırlar listeye, sonra tek parça JSON
+            events = [{
+                'event_id': row['event_id'], 'title': row['title'], 'group_id': row['group_id'],
+                'created_at': row['created_at'], 'status': row['status'],
+                'participant_count': row['participant_count']
+            } for row in db.iter_events(status=None, batch_size=100000)]
+            response = app.json.response({'status': 'success', 'events': events})
+            size = len(response.get_data())
+    else:
+        response = client.get('/api/events/export?status=all', buffered=False)
+        for chunk in response.response:
+            size += len(chunk)
+        response.close()
+    elapsed = time.perf_counter() - started
+    anon_peak = sampler.stop()
+    print(f"{baseline:.1f} {peak_rss_mb():.1f} {anon_baseline:.1f} {anon_peak:.1f} {size} {elapsed:.2f}")
+    sys.stdout.flush()
+    os._exit(0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Akışlı JSON bellek benchmark')
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--child', choices=['jsonify', 'stream'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child)
+        return
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    started = time.perf_counter()
+    populate(path, args.rows)
+    print(f"{args.rows} etkinlik {time.perf_counter() - started:.1f} sn'de eklendi")
+
+    env = dict(os.environ, BIP_BOT_DB=path, BIP_BOT_SCHEDULER='0', BIP_BOT_RATE_LIMIT='0')
+    for mode in ('jsonify', 'stream'):
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', mode],
+                                env=env, cwd=ROOT, capture_output=True, text=True, check=True).stdout
+        baseline, peak, anon_baseline, anon_peak, size, elapsed = output.split()[-6:]
+        print(f"{mode:<8} tepe RSS: {float(peak):>7.1f} MB (+{float(peak) - float(baseline):.1f})   "
+              f"heap artışı: {float(anon_peak) - float(anon_baseline):>7.1f} MB   "
+              f"gövde: {int(size) / 1e6:>6.1f} MB   süre: {elapsed} sn")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ BiP Bot - Aktif Etkinlik Sorgusu Benchmark'ı
+get_latest_event(group_id) maliyetini önbelleksiz, local ve shared modlarında karşılaştırır
+
+Özellikler:
+- Geçici veritabanı; gerçek veriye dokunmaz
+- Yapılandırılabilir grup ve sorgu sayısı
+- Önbellek isabet oranı
+
+Kullanım:
+python benchmarks/bench_latest_event.py [--groups 20000] [--lookups 200000]
+
+Yazar: BiP Bot Development Team
+Versiyon: 2.0.0
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# database modülündeki global örnek gerçek veritabanına dokunmasın
+os.environ.setdefault('BIP_BOT_DB', os.path.join(tempfile.mkdtemp(), 'global.db'))
+
+from database import Database  # noqa: E402
+
+
+def populate(path, groups):
+    """Her gruba iki etkinlik ekler"""
+    db = Database(path, pool_size=1, write_behind=False, latest_event_cache={'mode': 'off'})
+    with db.transaction():
+        for n in range(groups):
+            for title in ('Eski', 'Yeni'):
+                db.create_event(title, 'moderator', f'group_{n}')
+    db.close()
+
+
+def run(path, mode, groups, lookups):
+    """Rastgele gruplar için son etkinliği sorgular; (saniye, istatistik) döndürür"""
+    db = Database(path, pool_size=2, write_behind=False,
+                  latest_event_cache={'mode': mode, 'max_entries': groups})
+    rng = random.Random(42)
+    keys = [f'group_{rng.randrange(groups)}' for _ in range(lookups)]
+    started = time.perf_counter()
+    for group_id in keys:
+        db.get_latest_event(group_id)
+    elapsed = time.perf_counter() - started
+    stats = db.get_latest_event_cache_stats()
+    db.close()
+    return elapsed, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Aktif etkinlik sorgusu benchmark')
+    parser.add_argument('--groups', type=int, default=20000)
+    parser.add_argument('--lookups', type=int, default=200000)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    populate(path, args.groups)
+    for mode in ('off', 'local', 'shared'):
+        elapsed, stats = run(path, mode, args.groups, args.lookups)
+        print(f"{mode:<7} {elapsed / args.lookups * 1e6:>7.2f} µs/sorgu   isabet: {stats['hit_rate']:.3f}")
+
+
+if __name__ == '__main__':
+    main()
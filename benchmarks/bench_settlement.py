@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ BiP Bot - Masraf Hesaplaşma Benchmark'ı
+Binlerce gider ve yüzlerce katılımcılı etkinlikte hesaplaşma süresini ölçer
+
+Özellikler:
+- Veritabanı okuma (bakiye defteri) ve hesaplaşma ayrı ayrı ölçülür
+- Defterin giderleri baştan oynatan tutarlılık kontrolü de ölçülür
+- Açgözlü çözüm ile kesin çözüm (küçük gruplar) karşılaştırması
+- Geçici veritabanı; gerçek veriye dokunmaz
+
+Kullanım:
+python benchmarks/bench_settlement.py [--expenses 5000] [--participants 500]
+
+Yazar: BiP Bot Development Team
+Versiyon: 2.0.0
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# database modülündeki global örnek gerçek veritabanına dokunmasın
+os.environ.setdefault('BIP_BOT_DB', os.path.join(tempfile.mkdtemp(), 'global.db'))
+
+from database import Database  # noqa: E402
+from settlement import settle, compute_balances, greedy_transfers, exact_transfers  # noqa: E402
+
+
+def populate(db, expenses, participants, seed=42):
+    """Bir etkinliğe rastgele ödeyen ve ağırlıklarla gider ekler"""
+    rng = random.Random(seed)
+    with db.transaction():
+        event_id = db.create_event('Kampüs Festivali', 'moderator', 'bench_group')
+        with db.get_connection() as conn:
+            conn.executemany(
+                'INSERT INTO expenses (event_id, user_id, amount, notes, weight) VALUES (?, ?, ?, ?, ?)',
+                ((event_id, f'user_{rng.randrange(participants)}', round(rng.uniform(5, 500), 2), 'gider',
+                  rng.choice([0.5, 1.0, 1.0, 1.5, 2.0])) for _ in range(expenses))
+            )
+    return event_id
+
+
+def best_of(repeat, func):
+    """En iyi süre (ms) ve son sonuç"""
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Masraf hesaplaşma benchmark')
+    parser.add_argument('--expenses', type=int, default=5000)
+    parser.add_argument('--participants', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    db = Database(os.path.join(tempfile.mkdtemp(), 'bench.db'), write_behind=False)
+    event_id = populate(db, args.expenses, args.participants)
+
+    read_ms, stats = best_of(args.repeat, lambda: db.get_event_summary_stats(event_id, include_expenses=False))
+    settle_ms, result = best_of(args.repeat, lambda: settle(stats['paid_by_user'], stats['weight_by_user'],
+                                                             stats['participants']))
+    print(f"{args.expenses} gider, {len(stats['participants'])} katılımcı")
+    print(f"veritabanı okuma: {read_ms:>8.2f} ms")
+    print(f"hesaplaşma:       {settle_ms:>8.2f} ms   {len(result['transfers'])} transfer ({result['method']})")
+    print(f"toplam:           {read_ms + settle_ms:>8.2f} ms")
+    # Tutarlılık kontrolü giderleri baştan oynatır (bakiye defteri ile karşılaştırma)
+    check_ms, report = best_of(max(1, args.repeat // 4), lambda: db.rebuild_stats(event_id, fix=False))
+    print(f"defter kontrolü:  {check_ms:>8.2f} ms   {len(report['drift'])} fark")
+
+    # Küçük grup: açgözlü ve kesin çözüm (kesin çözüm 2^n durum)
+    rng = random.Random(7)
+    for size in (8, 10, 12):
+        paid = {f'user_{i}': float(rng.choice([0, 20, 40, 60, 80, 120])) for i in range(size)}
+        _shares, balances = compute_balances(paid, {}, list(paid))
+        greedy_ms, greedy = best_of(args.repeat, lambda: greedy_transfers(balances))
+        exact_ms, exact = best_of(max(1, args.repeat // 4), lambda: exact_transfers(balances))
+        print(f"{size:>2} kişi  açgözlü: {greedy_ms:>6.3f} ms / {len(greedy)} transfer   "
+              f"kesin: {exact_ms:>7.2f} ms / {len(exact)} transfer")
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
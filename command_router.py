@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧭 BiP Bot - Komut Yönlendirici
+Webhook mesajlarını tablo tabanlı kayıt üzerinden komut işleyicilerine dağıtır
+
+Özellikler:
+- Komut adına göre sözlükten O(1) yönlendirme
+- Argüman kalıpları kayıt anında bir kez derlenir
+- Kullanım, geçersiz argüman ve hata mesajları komutla birlikte tanımlanır
+- Bitişik yazılmış komutlar için en uzun önek eşleşmesi (/yeniParti)
+- Komut başına hız sınırı sınıfı (read/write)
+
+Yazar: BiP Bot Development Team
+Versiyon: 2.0.0
+"""
+
+import re
+import logging
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+CommandContext = namedtuple('CommandContext', ['user_id', 'group_id', 'message'])
+
+
+class ArgumentError(ValueError):
+    """Argüman dönüştürülemediğinde kullanıcıya gösterilecek mesajla fırlatılır"""
+
+
+class Command:
+    __slots__ = ('name', 'handler', 'pattern', 'convert', 'usage', 'min_args', 'invalid', 'error',
+                 'rate_class')
+
+    def __init__(self, name, handler, pattern=None, convert=None, usage=None,
+                 min_args=0, invalid=None, error=None, rate_class='write'):
+        """Komut tanımı; pattern tam eşleşme için derlenir"""
+        self.name = name
+        self.handler = handler
+        self.pattern = re.compile(pattern, re.DOTALL) if pattern else None
+        self.convert = convert
+        self.usage = usage
+        self.min_args = min_args
+        self.invalid = invalid or usage
+        self.error = error
+        self.rate_class = rate_class
+
+    def parse(self, args):
+        """Argüman metnini işleyici parametrelerine çevirir; hatalıysa ArgumentError fırlatır"""
+        if self.min_args and len(args.split(None, self.min_args)) < self.min_args:
+            raise ArgumentError(self.usage)
+        if self.pattern is None:
+            return {}
+        match = self.pattern.fullmatch(args)
+        if match is None:
+            raise ArgumentError(self.invalid)
+        groups = match.groupdict()
+        if self.convert is None:
+            return groups
+        try:
+            return self.convert(**groups)
+        except ArgumentError:
+            raise
+        except (ValueError, TypeError):
+            raise ArgumentError(self.invalid)
+
+
+class CommandRouter:
+    def __init__(self, unknown_message="Bilinmeyen komut: {message}"):
+        """Boş komut kaydı oluşturur"""
+        self.unknown_message = unknown_message
+        self._commands = {}
+        self._prefixes = ()
+
+    def register(self, name, handler, **options):
+        """Komutu kaydeder; aynı ad iki kez kaydedilemez"""
+        if name in self._commands:
+            raise ValueError(f"Komut zaten kayıtlı: {name}")
+        command = Command(name, handler, **options)
+        self._commands[name] = command
+        # Önek eşleşmesinde uzun ad önce denenir (/slot_kapat, /slot'tan önce)
+        self._prefixes = tuple(sorted(self._commands, key=len, reverse=True))
+        return command
+
+    def command(self, name, **options):
+        """İşleyici fonksiyonu komut olarak kaydeden dekoratör"""
+        def decorator(handler):
+            self.register(name, handler, **options)
+            return handler
+        return decorator
+
+    def get(self, name):
+        """Kayıtlı komutu döndürür"""
+        return self._commands.get(name)
+
+    @property
+    def names(self):
+        """Kayıtlı komut adları"""
+        return tuple(self._commands)
+
+    def resolve(self, message):
+        """Mesajdan komutu ve argüman metnini bulur; bulunamazsa (None, None)"""
+        parts = message.split(None, 1)
+        if not parts:
+            return None, None
+        head = parts[0]
+        rest = parts[1] if len(parts) > 1 else ''
+        command = self._commands.get(head)
+        if command is not None:
+            return command, rest.strip()
+        # Yavaş yol: komut adı argümana bitişik yazılmış
+        for name in self._prefixes:
+            if head.startswith(name):
+                return self._commands[name], f"{head[len(name):]} {rest}".strip()
+        return None, None
+
+    def dispatch(self, message, context):
+        """Mesajı ilgili işleyiciye yönlendirir ve yanıt metnini döndürür"""
+        command, args = self.resolve(message)
+        if command is None:
+            return self.unknown_message.format(message=message)
+        try:
+            kwargs = command.parse(args)
+        except ArgumentError as e:
+            return str(e)
+        try:
+            return command.handler(context, **kwargs)
+        except Exception as e:
+            if command.error is None:
+                raise
+            logger.error(f"{command.name} komut hatası: {str(e)}")
+            return command.error
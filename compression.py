@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🗜️ BiP Bot - Yanıt Sıkıştırma
+Accept-Encoding pazarlığı ve eşik üstü JSON yanıtların gzip ile sıkıştırılması
+
+Özellikler:
+- Accept-Encoding q değerlerine göre br / gzip / sıkıştırmasız seçimi
+- Eşik altındaki küçük yanıtlar sıkıştırılmaz (CPU'ya değmez)
+- Akışlı (chunked) JSON yanıtlar parça parça sıkıştırılır; bellek sabit kalır
+- Sıkıştırılan yanıtın ETag'i zayıflatılır, If-None-Match eşleşmesi bozulmaz
+- brotli paketi isteğe bağlıdır; yoksa sadece gzip sunulur
+
+Yazar: BiP Bot Development Team
+Versiyon: 2.0.0
+"""
+
+import gzip
+import zlib
+import threading
+
+try:
+    import brotli
+except ImportError:  # İsteğe bağlı; pip install brotli
+    brotli = None
+
+# Sunucunun tercih sırası (eşit q değerinde önce gelen seçilir)
+SUPPORTED_ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def parse_accept_encoding(header):
+    """Accept-Encoding başlığını {kodlama: q} sözlüğüne çevirir"""
+    weights = {}
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name] = q
+    return weights
+
+
+def negotiate_encoding(header, available=SUPPORTED_ENCODINGS):
+    """İstemcinin kabul ettiği en iyi kodlamayı döndürür; yoksa None (sıkıştırmasız)"""
+    weights = parse_accept_encoding(header)
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = weights.get(encoding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(data, encoding, level=6):
+    """Baytları verilen kodlamayla sıkıştırır"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=min(level, 11))
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def gzip_stream(chunks, level=6):
+    """Parça akışını gzip akışına çevirir; her parça sonunda istemciye iletilecek kadar flush edilir"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class JsonCompressor:
+    def __init__(self, min_size=1024, level=6, enabled=True):
+        """min_size bayttan büyük JSON yanıtları gzip'ler (after_request kancası)"""
+        self.min_size = min_size
+        self.level = level
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.compressed = 0
+        self.skipped = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def __call__(self, response, accept_encoding):
+        """Yanıtı uygunsa yerinde sıkıştırır ve döndürür"""
+        if (not self.enabled or response.status_code != 200 or response.mimetype != 'application/json'
+                or 'Content-Encoding' in response.headers):
+            return response
+        response.vary.add('Accept-Encoding')
+        if negotiate_encoding(accept_encoding, ('gzip',)) != 'gzip':
+            return response
+
+        if response.is_streamed:
+            # Boyut bilinmiyor; akış parça parça sıkıştırılır
+            response.response = gzip_stream(response.iter_encoded(), self.level)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                with self._lock:
+                    self.skipped += 1
+                return response
+            compressed = compress(data, 'gzip', self.level)
+            with self._lock:
+                self.bytes_in += len(data)
+                self.bytes_out += len(compressed)
+            response.set_data(compressed)
+        with self._lock:
+            self.compressed += 1
+        response.headers['Content-Encoding'] = 'gzip'
+        # Farklı gösterim: ETag zayıflatılır (If-None-Match zayıf karşılaştırmayla eşleşmeye devam eder)
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    def stats(self):
+        """Sıkıştırma istatistiklerini döndürür (akışlı yanıtların boyutları hariç)"""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'min_size': self.min_size,
+                'level': self.level,
+                'encodings': list(SUPPORTED_ENCODINGS),
+                'compressed': self.compressed,
+                'skipped': self.skipped,
+                'ratio': round(self.bytes_out / self.bytes_in, 3) if self.bytes_in else None
+            }
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+"""
+pytest yapılandırması
+
+test_api.py çalışan bir sunucuya karşı elle çalıştırılan bir betiktir,
+otomatik test koşusuna dahil edilmez.
+"""
+
+import os
+import tempfile
+
+collect_ignore = ['test_api.py']
+
+# database modülündeki global instance depodaki bip_bot.db'ye dokunmasın
+os.environ.setdefault('BIP_BOT_DB', os.path.join(tempfile.mkdtemp(prefix='bip_bot_test_'), 'bip_bot.db'))
+# app modülü içe aktarıldığında hatırlatıcı dispatcher thread'i başlamasın
+os.environ.setdefault('BIP_BOT_SCHEDULER', '0')
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🔌 BiP Bot - SQLite Bağlantı Havuzu
+Uzun ömürlü, thread-safe SQLite bağlantı havuzu
+
+Özellikler:
+- Yapılandırılabilir havuz boyutu
+- Bağlantı başına PRAGMA kurulumu
+- Boşta kalan bağlantılar için sağlık kontrolü
+- Flask worker thread'leri arasında bağlantı paylaşımı
+- Fork sonrası otomatik sıfırlama (gunicorn preload)
+- Havuz istatistikleri (checkout, bekleme, maksimum bekleme süresi)
+
+Yazar: BiP Bot Development Team
+Versiyon: 2.0.0
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import logging
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(sqlite3.OperationalError):
+    """Havuzdan zamanında bağlantı alınamadığında fırlatılır"""
+
+
+class ConnectionPool:
+    def __init__(self, db_path, size=5, timeout=30.0, pragmas=None,
+                 row_factory=None, health_check_interval=30.0):
+        """Havuzu başlatır; bağlantılar ihtiyaç oldukça açılır"""
+        if size < 1:
+            raise ValueError("Havuz boyutu en az 1 olmalı")
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self.pragmas = dict(pragmas or {})
+        self.row_factory = row_factory
+        self.health_check_interval = health_check_interval
+
+        self._cond = threading.Condition(threading.Lock())
+        self._idle = deque()  # (conn, son kullanım zamanı)
+        self._created = 0
+        self._in_use = 0
+        self._closed = False
+        self._pid = os.getpid()
+
+        # İstatistikler
+        self._checkouts = 0
+        self._waits = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._discarded = 0
+        self._connects = 0
+
+    def _connect(self):
+        """Yeni bağlantı açar ve PRAGMA ayarlarını uygular"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        if self.row_factory is not None:
+            conn.row_factory = self.row_factory
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        # Bağlantı kilit dışında açılır; sayaç diğer thread'lerle yarışmasın
+        with self._cond:
+            self._connects += 1
+        return conn
+
+    def _is_healthy(self, conn):
+        """Bağlantının hâlâ kullanılabilir olup olmadığını kontrol eder"""
+        try:
+            conn.execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn):
+        """Bağlantıyı havuzdan tamamen çıkarır; çağıran self._cond'u tutmalıdır"""
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        self._discarded += 1
+
+    def after_fork(self):
+        """Fork sonrası çocuk süreçte çağrılır (gunicorn post_fork); kilidi de yeniler"""
+        if self._pid == os.getpid():
+            return
+        # Fork anında ebeveynde tutulan kilit çocukta hiç bırakılmaz; yenisi kullanılır
+        self._cond = threading.Condition(threading.Lock())
+        self._reset_after_fork()
+
+    def _reset_after_fork(self):
+        """Fork sonrası ebeveyn süreçten kalan bağlantıları bırakır"""
+        # Ebeveynin bağlantıları çocuk süreçte kullanılmamalı; kapatmadan terk edilir
+        self._idle.clear()
+        self._created = 0
+        self._in_use = 0
+        self._pid = os.getpid()
+        logger.info(f"Bağlantı havuzu fork sonrası sıfırlandı (PID: {self._pid})")
+
+    def acquire(self):
+        """Havuzdan bir bağlantı alır, gerekirse boş bağlantı için bekler"""
+        started = time.monotonic()
+        waited = False
+        with self._cond:
+            if self._pid != os.getpid():
+                self._reset_after_fork()
+            while True:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("Bağlantı havuzu kapatıldı")
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._created < self.size:
+                    conn, last_used = None, None
+                    self._created += 1
+                    break
+                remaining = self.timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    raise PoolTimeoutError(
+                        f"{self.timeout} saniye içinde veritabanı bağlantısı alınamadı"
+                    )
+                waited = True
+                self._cond.wait(remaining)
+
+            self._in_use += 1
+            self._checkouts += 1
+            if waited:
+                wait_time = time.monotonic() - started
+                self._waits += 1
+                self._total_wait += wait_time
+                self._max_wait = max(self._max_wait, wait_time)
+
+        # Bağlantı açma ve sağlık kontrolü kilit dışında yapılır
+        try:
+            if conn is not None and self.health_check_interval is not None \
+                    and time.monotonic() - last_used >= self.health_check_interval \
+                    and not self._is_healthy(conn):
+                logger.warning("Sağlıksız veritabanı bağlantısı yenileniyor")
+                with self._cond:
+                    self._discard(conn)
+                conn = None
+            if conn is None:
+                conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        return conn
+
+    def release(self, conn, discard=False):
+        """Bağlantıyı havuza geri verir"""
+        if not discard and conn.in_transaction:
+            # Yarım kalan işlemler bir sonraki kullanıcıya taşınmamalı
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                discard = True
+        with self._cond:
+            if self._pid != os.getpid():
+                # Ebeveyn süreçten gelen bağlantı; havuza geri alınmaz
+                return
+            self._in_use -= 1
+            if discard or self._closed:
+                self._discard(conn)
+                self._created -= 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Havuzdan bağlantı alan context manager"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self):
+        """Havuz istatistiklerini döndürür"""
+        with self._cond:
+            return {
+                'size': self.size,
+                'created': self._created,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'avg_wait_ms': round(self._total_wait / self._waits * 1000, 3) if self._waits else 0.0,
+                'max_wait_ms': round(self._max_wait * 1000, 3),
+                'connects': self._connects,
+                'discarded': self._discarded
+            }
+
+    def close(self):
+        """Boştaki tüm bağlantıları kapatır; kullanımdakiler iade edilince kapanır"""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._discard(conn)
+                self._created -= 1
+            self._cond.notify_all()
@@ -10,6 +10,12 @@ Profesyonel veritabanı işlemleri için modül
 - Foreign key kısıtlamaları
 - Otomatik timestamp'ler
 - Context manager ile güvenli bağlantılar
+- Thread-safe bağlantı havuzu (uzun ömürlü bağlantılar)
+- Seçilebilir PRAGMA profilleri (WAL, synchronous, mmap, cache)
+- Arka planda WAL checkpoint politikası
+- Sıcak sorgular için versiyonlu ikincil index seti
+- Yazma anında trigger'larla güncellenen oy/gider sayaçları
+- Her yazmada artan etkinlik versiyonu (ETag / koşullu GET için)
 - Kapsamlı CRUD işlemleri
 
 Yazar: BiP Bot Development Team
@@ -19,22 +25,496 @@ Versiyon: 2.0.0
 import sqlite3
 import logging
 import os
+import threading
 from datetime import datetime
 from contextlib import contextmanager
+from connection_pool import ConnectionPool
+from write_behind import WriteBehindQueue
+from user_presence import UserPresence
+from latest_event_cache import LatestEventCache
 
 logger = logging.getLogger(__name__)
 
-class Database:
-    def __init__(self, db_path='bip_bot.db'):
-        """Veritabanı bağlantısını başlatır"""
+# Havuz varsayılanları (ortam değişkenleri ile değiştirilebilir)
+DEFAULT_DB_PATH = os.environ.get('BIP_BOT_DB', 'bip_bot.db')
+DEFAULT_POOL_SIZE = int(os.environ.get('BIP_BOT_DB_POOL_SIZE', 8))
+DEFAULT_POOL_TIMEOUT = float(os.environ.get('BIP_BOT_DB_POOL_TIMEOUT', 30))
+DEFAULT_PROFILE = os.environ.get('BIP_BOT_DB_PROFILE', 'balanced')
+
+# Write-behind modu: oy ve kullanıcı yazmaları kuyruktan toplu commit edilir
+DEFAULT_WRITE_BEHIND = os.environ.get('BIP_BOT_WRITE_BEHIND', '0') == '1'
+WRITE_BEHIND_SETTINGS = {
+    'max_size': int(os.environ.get('BIP_BOT_WRITE_BEHIND_QUEUE_SIZE', 10000)),
+    'flush_interval': float(os.environ.get('BIP_BOT_WRITE_BEHIND_FLUSH_MS', 50)) / 1000,
+    'batch_size': int(os.environ.get('BIP_BOT_WRITE_BEHIND_BATCH_SIZE', 256)),
+    'put_timeout': float(os.environ.get('BIP_BOT_WRITE_BEHIND_PUT_TIMEOUT', 1.0))
+}
+
+# Grup başına aktif etkinlik önbelleği: local | shared | off
+# shared: çoklu worker; her okumada (veya CHECK_MS aralığıyla) değişiklik günlüğü okunur
+LATEST_EVENT_CACHE_SETTINGS = {
+    'mode': os.environ.get('BIP_BOT_LATEST_EVENT_CACHE', 'local'),
+    'max_entries': int(os.environ.get('BIP_BOT_LATEST_EVENT_CACHE_SIZE', 200000)),
+    'check_interval': float(os.environ.get('BIP_BOT_LATEST_EVENT_CACHE_CHECK_MS', 0)) / 1000
+}
+
+# Kullanıcı varlık katmanı: last_active dokunuşları bu aralıkla toplu yazılır
+PRESENCE_SETTINGS = {
+    'flush_interval': float(os.environ.get('BIP_BOT_PRESENCE_FLUSH_SECONDS', 30)),
+    'max_pending': int(os.environ.get('BIP_BOT_PRESENCE_MAX_PENDING', 1000))
+}
+# SQLite parametre sınırının altında kalan IN (...) parça boyutu
+TOUCH_CHUNK_SIZE = 500
+
+# Dayanıklılık/performans profilleri
+# journal_mode ve checkpoint ayarları veritabanı geneli, diğerleri bağlantı başınadır
+PRAGMA_PROFILES = {
+    # Eski davranış: rollback journal, tam fsync
+    'legacy': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'busy_timeout': 5000
+    },
+    # WAL + her commit'te fsync; güç kesintisinde bile commit kaybı yok
+    'durable': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'cache_size': -8000,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 10000,
+        'wal_autocheckpoint': 1000,
+        'checkpoint_interval': 30,
+        'checkpoint_truncate_bytes': 64 * 1024 * 1024
+    },
+    # Varsayılan: WAL + synchronous=NORMAL; okuyucular yazıcıları bloklamaz
+    'balanced': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -8000,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+        'wal_autocheckpoint': 1000,
+        'checkpoint_interval': 30,
+        'checkpoint_truncate_bytes': 64 * 1024 * 1024
+    },
+    # Toplu yükleme ve benchmark için; çökme durumunda son commit'ler kaybolabilir
+    'fast': {
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'mmap_size': 1024 * 1024 * 1024,
+        'cache_size': -32000,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+        'wal_autocheckpoint': 4000,
+        'checkpoint_interval': 60,
+        'checkpoint_truncate_bytes': 256 * 1024 * 1024
+    }
+}
+
+# Bağlantı başına değil, veritabanı genelinde uygulanan profil anahtarları
+DATABASE_LEVEL_SETTINGS = ('journal_mode', 'checkpoint_interval', 'checkpoint_truncate_bytes')
+
+# Profilden bağımsız, her bağlantıda zorunlu PRAGMA'lar
+# recursive_triggers: INSERT OR REPLACE'in sildiği satırlar için DELETE trigger'ları çalışsın
+BASE_PRAGMAS = {
+    'recursive_triggers': 'ON'
+}
+
+# Sıcak sorgular için ikincil index seti
+# Set değiştiğinde INDEX_SET_VERSION artırılır; setten çıkan index'ler açılışta silinir
+INDEX_SET_VERSION = 4
+INDEXES = {
+    # get_latest_event(group_id): group_id + status filtresi, created_at sıralaması
+    'idx_events_group_status_created': 'events (group_id, status, created_at)',
+    # get_latest_event() ve etkinlik listesi: status filtresi, created_at sıralaması
+    # (event_id rowid olarak index'in sonunda; (created_at, event_id) keyset'i index'ten okunur)
+    'idx_events_status_created': 'events (status, created_at)',
+    # Durum filtresiz etkinlik listesi (tümü / grubun tümü)
+    'idx_events_created': 'events (created_at)',
+    'idx_events_group_created': 'events (group_id, created_at)',
+    # get_slots_by_event: event_id + status filtresi, start_datetime sıralaması
+    'idx_slots_event_status_start': 'slots (event_id, status, start_datetime)',
+    # Kullanıcının etkinlikteki slot oyu (event_id, user_id) - slot_id ile covering
+    'idx_slot_votes_event_user': 'slot_votes (event_id, user_id, slot_id)',
+    # get_poll_by_event: event_id + status filtresi, created_at sıralaması
+    'idx_polls_event_status_created': 'polls (event_id, status, created_at)',
+    # get_poll_choices: poll_id filtresi (choice_id sırası rowid'den gelir)
+    'idx_poll_choices_poll': 'poll_choices (poll_id)',
+    # Seçenek bazlı oy sayımı
+    'idx_poll_votes_choice': 'poll_votes (choice_id)',
+    # Zamanlayıcı: vadesi gelen bekleyen hatırlatıcılar ve slot kapanınca iptal
+    'idx_reminders_status_due': 'reminders (status, due_at)',
+    'idx_reminders_slot': 'reminders (slot_id)',
+    # get_expenses_by_event: event_id filtresi, created_at sıralaması
+    'idx_expenses_event_created': 'expenses (event_id, created_at)',
+    # Bakiye defteri: kullanıcının etkinlikteki son gideri (expense_id rowid olarak index'in sonunda)
+    'idx_expenses_event_user': 'expenses (event_id, user_id)'
+}
+
+# Sayaç tabloları ve trigger'ları
+# Trigger tanımları değiştiğinde STATS_VERSION artırılır; açılışta yeniden kurulur ve sayaçlar yeniden hesaplanır
+# Not: Dış ifadenin ON CONFLICT politikası trigger içindekileri ezer (INSERT OR REPLACE
+# altında INSERT OR IGNORE da REPLACE olur), bu yüzden satır varlığı NOT EXISTS ile kontrol edilir
+# event_stats.version etkinliği etkileyen her yazmada artar (ETag kaynağı)
+# event_group_changes: aktif etkinliği değişebilecek grupların günlüğü (çoklu worker önbelleği için)
+# event_balances: kişi bazlı ödenen tutar (kuruş) ve ağırlık defteri; özet ve hesaplaşma giderleri taramaz
+STATS_VERSION = 4
+# Değişiklik günlüğünde tutulan son kayıt sayısı; daha eskileri trigger ile budanır
+EVENT_CHANGE_LOG_SIZE = 10000
+
+
+def _participant_delta(event_expr, user_expr, sign):
+    """Katılımcı referans sayısını artıran/azaltan trigger gövdesi"""
+    if sign == '+':
+        return f'''
+            INSERT INTO event_participants (event_id, user_id, refs)
+            SELECT {event_expr}, {user_expr}, 0
+            WHERE NOT EXISTS (
+                SELECT 1 FROM event_participants
+                WHERE event_id = {event_expr} AND user_id = {user_expr}
+            );
+            UPDATE event_participants SET refs = refs + 1
+            WHERE event_id = {event_expr} AND user_id = {user_expr};
+        '''
+    return f'''
+        UPDATE event_participants SET refs = refs - 1
+        WHERE event_id = {event_expr} AND user_id = {user_expr};
+        DELETE FROM event_participants
+        WHERE event_id = {event_expr} AND user_id = {user_expr} AND refs <= 0;
+    '''
+
+
+def _slot_vote_delta(row, sign):
+    """Slot oyu eklendiğinde/silindiğinde sayaçları günceller"""
+    return f'''
+        UPDATE slot_stats
+        SET yes_votes = yes_votes {sign} ({row}.choice = 'yes'),
+            no_votes = no_votes {sign} ({row}.choice = 'no')
+        WHERE slot_id = {row}.slot_id;
+        UPDATE event_stats
+        SET slot_yes_votes = slot_yes_votes {sign} ({row}.choice = 'yes'),
+            slot_no_votes = slot_no_votes {sign} ({row}.choice = 'no'),
+            version = version + 1
+        WHERE event_id = {row}.event_id;
+    ''' + _participant_delta(f'{row}.event_id', f'{row}.user_id', sign)
+
+
+def _poll_vote_delta(row, sign):
+    """Anket oyu eklendiğinde/silindiğinde sayaçları günceller"""
+    event_expr = f'(SELECT event_id FROM polls WHERE poll_id = {row}.poll_id)'
+    return f'''
+        UPDATE choice_stats SET votes = votes {sign} 1
+        WHERE choice_id = {row}.choice_id;
+        UPDATE event_stats SET poll_vote_count = poll_vote_count {sign} 1, version = version + 1
+        WHERE event_id = {event_expr};
+    ''' + _participant_delta(event_expr, f'{row}.user_id', sign)
+
+
+def _balance_delta(row, sign):
+    """Gider eklendiğinde/silindiğinde kişinin bakiye defteri satırını günceller"""
+    match = f'event_id = {row}.event_id AND user_id = {row}.user_id'
+    # Ağırlık kişinin son giderinden okunur (silinen son giderse bir öncekinden)
+    latest_weight = f'''COALESCE((
+        SELECT weight FROM expenses WHERE {match} ORDER BY expense_id DESC LIMIT 1
+    ), 1.0)'''
+    insert = f'''
+        INSERT INTO event_balances (event_id, user_id)
+        SELECT {row}.event_id, {row}.user_id
+        WHERE NOT EXISTS (SELECT 1 FROM event_balances WHERE {match});
+    ''' if sign == '+' else ''
+    delete = f'''
+        DELETE FROM event_balances WHERE {match} AND expense_count <= 0;
+    ''' if sign == '-' else ''
+    return insert + f'''
+        UPDATE event_balances
+        SET paid_cents = paid_cents {sign} CAST(ROUND({row}.amount * 100) AS INTEGER),
+            expense_count = expense_count {sign} 1,
+            weight = {latest_weight}
+        WHERE {match};
+    ''' + delete
+
+
+def _expense_delta(row, sign):
+    """Gider eklendiğinde/silindiğinde sayaçları günceller"""
+    return f'''
+        UPDATE event_stats
+        SET expense_count = expense_count {sign} 1,
+            expense_total = expense_total {sign} {row}.amount,
+            weight_total = weight_total {sign} COALESCE({row}.weight, 0),
+            version = version + 1
+        WHERE event_id = {row}.event_id;
+    ''' + _balance_delta(row, sign) + _participant_delta(f'{row}.event_id', f'{row}.user_id', sign)
+
+
+STATS_TRIGGERS = {
+    'trg_events_insert_stats': '''
+        AFTER INSERT ON events BEGIN
+            INSERT INTO event_stats (event_id)
+            SELECT NEW.event_id
+            WHERE NOT EXISTS (SELECT 1 FROM event_stats WHERE event_id = NEW.event_id);
+        END''',
+    'trg_events_update_version': '''
+        AFTER UPDATE ON events BEGIN
+            UPDATE event_stats SET version = version + 1 WHERE event_id = NEW.event_id;
+        END''',
+    # Grubun aktif etkinliği değişebilir: yeni, silinen veya durumu/grubu değişen etkinlik
+    'trg_events_insert_group_change': '''
+        AFTER INSERT ON events BEGIN
+            INSERT INTO event_group_changes (group_id) VALUES (NEW.group_id);
+        END''',
+    'trg_events_update_group_change': '''
+        AFTER UPDATE OF status, group_id ON events
+        WHEN OLD.status IS NOT NEW.status OR OLD.group_id IS NOT NEW.group_id BEGIN
+            INSERT INTO event_group_changes (group_id) VALUES (OLD.group_id);
+            INSERT INTO event_group_changes (group_id)
+            SELECT NEW.group_id WHERE NEW.group_id IS NOT OLD.group_id;
+        END''',
+    'trg_events_delete_group_change': '''
+        AFTER DELETE ON events BEGIN
+            INSERT INTO event_group_changes (group_id) VALUES (OLD.group_id);
+        END''',
+    'trg_event_group_changes_prune': f'''
+        AFTER INSERT ON event_group_changes BEGIN
+            DELETE FROM event_group_changes WHERE seq <= NEW.seq - {EVENT_CHANGE_LOG_SIZE};
+        END''',
+    'trg_slots_insert_stats': '''
+        AFTER INSERT ON slots BEGIN
+            INSERT INTO slot_stats (slot_id, event_id)
+            SELECT NEW.slot_id, NEW.event_id
+            WHERE NOT EXISTS (SELECT 1 FROM slot_stats WHERE slot_id = NEW.slot_id);
+            UPDATE event_stats
+            SET slot_count = slot_count + 1,
+                active_slot_count = active_slot_count + (NEW.status = 'active'),
+                version = version + 1
+            WHERE event_id = NEW.event_id;
+        END''',
+    'trg_slots_update_stats': '''
+        AFTER UPDATE ON slots BEGIN
+            UPDATE event_stats
+            SET active_slot_count = active_slot_count + (NEW.status = 'active') - (OLD.status = 'active'),
+                version = version + 1
+            WHERE event_id = NEW.event_id;
+        END''',
+    'trg_polls_insert_version': '''
+        AFTER INSERT ON polls BEGIN
+            UPDATE event_stats SET version = version + 1 WHERE event_id = NEW.event_id;
+        END''',
+    'trg_polls_update_version': '''
+        AFTER UPDATE ON polls BEGIN
+            UPDATE event_stats SET version = version + 1 WHERE event_id = NEW.event_id;
+        END''',
+    'trg_slot_votes_insert_stats': f'''
+        AFTER INSERT ON slot_votes BEGIN {_slot_vote_delta('NEW', '+')} END''',
+    'trg_slot_votes_delete_stats': f'''
+        AFTER DELETE ON slot_votes BEGIN {_slot_vote_delta('OLD', '-')} END''',
+    'trg_slot_votes_update_stats': f'''
+        AFTER UPDATE ON slot_votes BEGIN
+            {_slot_vote_delta('OLD', '-')}
+            {_slot_vote_delta('NEW', '+')}
+        END''',
+    'trg_poll_choices_insert_stats': '''
+        AFTER INSERT ON poll_choices BEGIN
+            INSERT INTO choice_stats (choice_id, poll_id)
+            SELECT NEW.choice_id, NEW.poll_id
+            WHERE NOT EXISTS (SELECT 1 FROM choice_stats WHERE choice_id = NEW.choice_id);
+            UPDATE event_stats SET version = version + 1
+            WHERE event_id = (SELECT event_id FROM polls WHERE poll_id = NEW.poll_id);
+        END''',
+    'trg_poll_choices_update_version': '''
+        AFTER UPDATE ON poll_choices BEGIN
+            UPDATE event_stats SET version = version + 1
+            WHERE event_id = (SELECT event_id FROM polls WHERE poll_id = NEW.poll_id);
+        END''',
+    'trg_poll_votes_insert_stats': f'''
+        AFTER INSERT ON poll_votes BEGIN {_poll_vote_delta('NEW', '+')} END''',
+    'trg_poll_votes_delete_stats': f'''
+        AFTER DELETE ON poll_votes BEGIN {_poll_vote_delta('OLD', '-')} END''',
+    'trg_poll_votes_update_stats': f'''
+        AFTER UPDATE ON poll_votes BEGIN
+            {_poll_vote_delta('OLD', '-')}
+            {_poll_vote_delta('NEW', '+')}
+        END''',
+    'trg_expenses_insert_stats': f'''
+        AFTER INSERT ON expenses BEGIN {_expense_delta('NEW', '+')} END''',
+    'trg_expenses_delete_stats': f'''
+        AFTER DELETE ON expenses BEGIN {_expense_delta('OLD', '-')} END''',
+    'trg_expenses_update_stats': f'''
+        AFTER UPDATE ON expenses BEGIN
+            {_expense_delta('OLD', '-')}
+            {_expense_delta('NEW', '+')}
+        END''',
+    'trg_event_participants_insert_stats': '''
+        AFTER INSERT ON event_participants BEGIN
+            UPDATE event_stats SET participant_count = participant_count + 1
+            WHERE event_id = NEW.event_id;
+        END''',
+    'trg_event_participants_delete_stats': '''
+        AFTER DELETE ON event_participants BEGIN
+            UPDATE event_stats SET participant_count = participant_count - 1
+            WHERE event_id = OLD.event_id;
+        END''',
+    # Toplam kullanıcı sayısı (analitik katılım oranı için)
+    'trg_users_insert_count': '''
+        AFTER INSERT ON users BEGIN
+            UPDATE schema_meta SET value = value + 1 WHERE key = 'user_count';
+        END''',
+    'trg_users_delete_count': '''
+        AFTER DELETE ON users BEGIN
+            UPDATE schema_meta SET value = value - 1 WHERE key = 'user_count';
+        END'''
+}
+
+# rebuild_stats'ın karşılaştırdığı event_stats kolonları
+EVENT_STATS_FIELDS = (
+    'slot_count', 'active_slot_count', 'slot_yes_votes', 'slot_no_votes',
+    'poll_vote_count', 'expense_count', 'expense_total', 'weight_total', 'participant_count'
+)
+# rebuild_stats'ın karşılaştırdığı event_balances kolonları
+BALANCE_FIELDS = ('paid_cents', 'weight', 'expense_count')
+
+
+class WalCheckpointer:
+    def __init__(self, db_path, interval, truncate_bytes):
+        """WAL dosyasını sınırlı tutan arka plan checkpoint thread'i"""
         self.db_path = db_path
+        self.interval = interval
+        self.truncate_bytes = truncate_bytes
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {
+            'runs': 0,
+            'truncations': 0,
+            'busy': 0,
+            'last_wal_bytes': 0,
+            'last_checkpointed_frames': 0
+        }
+
+    def start(self):
+        """Checkpoint thread'ini başlatır"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='wal-checkpointer', daemon=True)
+        self._thread.start()
+
+    def after_fork(self):
+        """Fork sonrası çocuk süreçte çağrılır; ebeveynin thread'i çocukta yoktur"""
+        self._stop = threading.Event()
+        self._thread = None
+
+    def stop(self):
+        """Checkpoint thread'ini durdurur"""
+        self._stop.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def wal_size(self):
+        """WAL dosyasının byte cinsinden boyutunu döndürür"""
+        try:
+            return os.path.getsize(f"{self.db_path}-wal")
+        except OSError:
+            return 0
+
+    def checkpoint(self, conn):
+        """Tek bir checkpoint turu çalıştırır"""
+        wal_bytes = self.wal_size()
+        # WAL eşik değerini aştıysa dosyayı sıfırla, yoksa okuyucuları bekletmeden kopyala
+        mode = 'TRUNCATE' if wal_bytes >= self.truncate_bytes else 'PASSIVE'
+        busy, _log_frames, checkpointed = conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+        self._stats['runs'] += 1
+        self._stats['last_wal_bytes'] = wal_bytes
+        self._stats['last_checkpointed_frames'] = checkpointed
+        if busy:
+            self._stats['busy'] += 1
+        elif mode == 'TRUNCATE':
+            self._stats['truncations'] += 1
+            logger.info(f"WAL dosyası sıfırlandı ({wal_bytes} bytes)")
+
+    def _run(self):
+        """Checkpoint döngüsü; kendi bağlantısını kullanır"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        try:
+            while not self._stop.wait(self.interval):
+                try:
+                    self.checkpoint(conn)
+                except sqlite3.Error as e:
+                    logger.warning(f"WAL checkpoint hatası: {str(e)}")
+        finally:
+            conn.close()
+
+    def stats(self):
+        """Checkpoint istatistiklerini döndürür"""
+        return dict(self._stats, wal_bytes=self.wal_size(), interval=self.interval)
+
+
+class _TransactionConnection:
+    """transaction() içindeki bağlantı; commit dış işleme, rollback kaydetme noktasına uygulanır"""
+    
+    def __init__(self, conn, savepoint):
+        self._conn = conn
+        self._savepoint = savepoint
+    
+    def commit(self):
+        """Dış işlem commit edilene kadar bir şey yapmaz"""
+    
+    def rollback(self):
+        """Sadece bu bloğun değişikliklerini geri alır"""
+        self._conn.execute(f'ROLLBACK TO {self._savepoint}')
+    
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class Database:
+    def __init__(self, db_path=None, pool_size=None, pool_timeout=None, profile=None,
+                 write_behind=None, presence=None, latest_event_cache=None):
+        """Veritabanı bağlantı havuzunu başlatır"""
+        self.db_path = db_path or DEFAULT_DB_PATH
+        self.profile = profile or DEFAULT_PROFILE
+        if self.profile not in PRAGMA_PROFILES:
+            raise ValueError(f"Bilinmeyen veritabanı profili: {self.profile}")
+        settings = PRAGMA_PROFILES[self.profile]
+        self.pool = ConnectionPool(
+            self.db_path,
+            size=pool_size or DEFAULT_POOL_SIZE,
+            timeout=pool_timeout or DEFAULT_POOL_TIMEOUT,
+            pragmas=dict(
+                {k: v for k, v in settings.items() if k not in DATABASE_LEVEL_SETTINGS},
+                **BASE_PRAGMAS
+            ),
+            row_factory=sqlite3.Row  # Dict-like access
+        )
+        self.checkpointer = None
+        self._write_listeners = []
+        self._local = threading.local()  # Thread başına açık transaction() durumu
+        self.latest_events = LatestEventCache(self, **(latest_event_cache or LATEST_EVENT_CACHE_SETTINGS))
+        self.add_write_listener(self.latest_events.on_write)
         self.init_database()
+        if settings.get('journal_mode') == 'WAL' and settings.get('checkpoint_interval'):
+            self.checkpointer = WalCheckpointer(
+                self.db_path, settings['checkpoint_interval'], settings['checkpoint_truncate_bytes']
+            )
+            self.checkpointer.start()
+        if write_behind is None:
+            write_behind = DEFAULT_WRITE_BEHIND
+        if write_behind is True:
+            write_behind = WRITE_BEHIND_SETTINGS
+        self.write_behind = WriteBehindQueue(self, **write_behind) if write_behind else None
+        self.presence = UserPresence(self, **(presence or PRESENCE_SETTINGS))
     
     def init_database(self):
         """Veritabanı tablolarını oluşturur"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
+            # Journal modu kalıcıdır; işlem dışında bir kez ayarlanır
+            journal_mode = PRAGMA_PROFILES[self.profile]['journal_mode']
+            current_mode = cursor.execute(f"PRAGMA journal_mode = {journal_mode}").fetchone()[0]
+            if current_mode.upper() != journal_mode:
+                logger.warning(f"Journal modu {journal_mode} yapılamadı, aktif mod: {current_mode}")
+            
             # Events tablosu
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS events (
@@ -130,6 +610,22 @@ class Database:
                 )
             ''')
             
+            # Hatırlatıcılar tablosu (due_at: Unix zamanı; status: pending, sent, failed, cancelled, expired)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS reminders (
+                    reminder_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    event_id INTEGER NOT NULL,
+                    slot_id INTEGER,
+                    group_id TEXT NOT NULL,
+                    message TEXT NOT NULL,
+                    due_at REAL NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    sent_at REAL,
+                    FOREIGN KEY (event_id) REFERENCES events (event_id)
+                )
+            ''')
+            
             # Users tablosu
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS users (
@@ -141,14 +637,146 @@ class Database:
                 )
             ''')
             
+            # Şema meta verisi (index seti versiyonu vb.)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS schema_meta (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )
+            ''')
+            
+            self._ensure_indexes(cursor)
+            
+            # Sayaç tabloları (trigger'larla yazma anında güncellenir)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS event_stats (
+                    event_id INTEGER PRIMARY KEY,
+                    slot_count INTEGER NOT NULL DEFAULT 0,
+                    active_slot_count INTEGER NOT NULL DEFAULT 0,
+                    slot_yes_votes INTEGER NOT NULL DEFAULT 0,
+                    slot_no_votes INTEGER NOT NULL DEFAULT 0,
+                    poll_vote_count INTEGER NOT NULL DEFAULT 0,
+                    expense_count INTEGER NOT NULL DEFAULT 0,
+                    expense_total REAL NOT NULL DEFAULT 0,
+                    weight_total REAL NOT NULL DEFAULT 0,
+                    participant_count INTEGER NOT NULL DEFAULT 0,
+                    version INTEGER NOT NULL DEFAULT 1
+                )
+            ''')
+            # Versiyon kolonu olmayan eski şemalar için
+            columns = {row['name'] for row in cursor.execute('PRAGMA table_info(event_stats)')}
+            if 'version' not in columns:
+                cursor.execute('ALTER TABLE event_stats ADD COLUMN version INTEGER NOT NULL DEFAULT 1')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS slot_stats (
+                    slot_id INTEGER PRIMARY KEY,
+                    event_id INTEGER NOT NULL,
+                    yes_votes INTEGER NOT NULL DEFAULT 0,
+                    no_votes INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS choice_stats (
+                    choice_id INTEGER PRIMARY KEY,
+                    poll_id INTEGER NOT NULL,
+                    votes INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+            # Etkinlikteki farklı katılımcılar; refs = kullanıcının oy/gider satırı sayısı
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS event_participants (
+                    event_id INTEGER NOT NULL,
+                    user_id TEXT NOT NULL,
+                    refs INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (event_id, user_id)
+                ) WITHOUT ROWID
+            ''')
+            
+            # Bakiye defteri: gider girmiş her kullanıcı için ödenen tutar (kuruş) ve son giderdeki ağırlık
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS event_balances (
+                    event_id INTEGER NOT NULL,
+                    user_id TEXT NOT NULL,
+                    paid_cents INTEGER NOT NULL DEFAULT 0,
+                    weight REAL NOT NULL DEFAULT 1.0,
+                    expense_count INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (event_id, user_id)
+                ) WITHOUT ROWID
+            ''')
+            
+            # Aktif etkinlik önbelleği için değişiklik günlüğü (AUTOINCREMENT: sıra tekrar kullanılmaz)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS event_group_changes (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    group_id TEXT
+                )
+            ''')
+            
+            self._ensure_stats_triggers(cursor)
+            
             conn.commit()
             logger.info("Veritabanı tabloları oluşturuldu/doğrulandı")
     
+    def _ensure_stats_triggers(self, cursor):
+        """Sayaç trigger'larını kurar; versiyon değiştiyse yeniden kurup sayaçları hesaplar"""
+        row = cursor.execute(
+            "SELECT value FROM schema_meta WHERE key = 'stats_version'"
+        ).fetchone()
+        if row and row['value'] == STATS_VERSION:
+            for name, body in STATS_TRIGGERS.items():
+                cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {body}')
+            return
+        
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg\\_%' ESCAPE '\\'"
+        )
+        for (name,) in cursor.fetchall():
+            cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+        for name, body in STATS_TRIGGERS.items():
+            cursor.execute(f'CREATE TRIGGER {name} {body}')
+        
+        report = self._rebuild_stats(cursor, None, fix=True)
+        cursor.execute('''
+            INSERT OR REPLACE INTO schema_meta (key, value)
+            VALUES ('stats_version', ?)
+        ''', (STATS_VERSION,))
+        logger.info(f"Sayaç trigger'ları kuruldu: v{STATS_VERSION} ({len(report['drift'])} fark düzeltildi)")
+    
+    def _ensure_indexes(self, cursor):
+        """İndex setini idempotent olarak oluşturur ve eski versiyonları temizler"""
+        for name, target in INDEXES.items():
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {target}')
+        
+        row = cursor.execute(
+            "SELECT value FROM schema_meta WHERE key = 'index_set_version'"
+        ).fetchone()
+        if row and row['value'] == INDEX_SET_VERSION:
+            return
+        
+        # Setten çıkarılmış index'leri sil (sadece bizim yönettiğimiz idx_ önekliler)
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx\\_%' ESCAPE '\\'"
+        )
+        for (name,) in cursor.fetchall():
+            if name not in INDEXES:
+                cursor.execute(f'DROP INDEX IF EXISTS {name}')
+                logger.info(f"Eski index silindi: {name}")
+        cursor.execute('''
+            INSERT OR REPLACE INTO schema_meta (key, value)
+            VALUES ('index_set_version', ?)
+        ''', (INDEX_SET_VERSION,))
+        logger.info(f"Index seti güncellendi: v{INDEX_SET_VERSION}")
+    
     @contextmanager
     def get_connection(self):
-        """Veritabanı bağlantısı context manager"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Dict-like access
+        """Havuzdan veritabanı bağlantısı alan context manager"""
+        tx = getattr(self._local, 'tx', None)
+        if tx is not None:
+            # Açık transaction() içinde: aynı bağlantı, blok başına kaydetme noktası
+            with self._savepoint(tx) as conn:
+                yield conn
+            return
+        conn = self.pool.acquire()
         try:
             yield conn
         except Exception as e:
@@ -156,7 +784,160 @@ class Database:
             logger.error(f"Veritabanı hatası: {str(e)}")
             raise
         finally:
-            conn.close()
+            self.pool.release(conn)
+    
+    @contextmanager
+    def _savepoint(self, tx):
+        """transaction() içindeki bir bloğu kaydetme noktasıyla sarar"""
+        conn = tx['conn']
+        tx['depth'] += 1
+        name = f"sp_{tx['depth']}"
+        conn.execute(f'SAVEPOINT {name}')
+        try:
+            yield _TransactionConnection(conn, name)
+        except Exception as e:
+            conn.execute(f'ROLLBACK TO {name}')
+            conn.execute(f'RELEASE {name}')
+            logger.error(f"Veritabanı hatası: {str(e)}")
+            raise
+        else:
+            conn.execute(f'RELEASE {name}')
+        finally:
+            tx['depth'] -= 1
+    
+    @contextmanager
+    def transaction(self):
+        """Blok içindeki tüm yazmaları tek işlemde toplar ve sonunda bir kez commit eder
+        
+        Bloktaki get_connection() çağrıları aynı bağlantıyı kaydetme noktasıyla kullanır;
+        hata veren çağrı sadece kendi değişikliklerini geri alır. Yazma dinleyicileri
+        commit'ten sonra çağrılır, işlem geri alınırsa hiç çağrılmaz.
+        """
+        if getattr(self._local, 'tx', None) is not None:
+            # İç içe çağrı: dış işleme katılır
+            yield
+            return
+        conn = self.pool.acquire()
+        tx = {'conn': conn, 'depth': 0, 'pending': []}
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            self._local.tx = tx
+            try:
+                yield
+            finally:
+                self._local.tx = None
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self.pool.release(conn)
+        for event_id, change, data in tx['pending']:
+            self._notify_write(event_id, change, **data)
+    
+    def in_transaction(self):
+        """Bu thread'de açık bir transaction() var mı"""
+        return getattr(self._local, 'tx', None) is not None
+    
+    @contextmanager
+    def _read_snapshot(self):
+        """Tüm sorguların aynı anlık görüntüyü gördüğü bağlantı; açık işlem varsa ona katılır"""
+        with self.get_connection() as conn:
+            if conn.in_transaction:
+                yield conn
+                return
+            conn.execute('BEGIN')
+            try:
+                yield conn
+            finally:
+                conn.rollback()
+    
+    def add_write_listener(self, listener):
+        """Bir etkinliği değiştiren her commit'ten sonra çağrılacak fonksiyonu kaydeder
+        
+        listener(event_id, change, **data) şeklinde çağrılır; change değişikliğin türüdür
+        (event_created, event_status_changed, slot_added, slot_voted, slot_closed, poll_created,
+        choice_added, poll_voted, expense_added).
+        """
+        self._write_listeners.append(listener)
+    
+    def _notify_write(self, event_id, change, **data):
+        """Kayıtlı dinleyicilere değişikliği bildirir; dinleyici hataları yazmayı bozmaz"""
+        tx = getattr(self._local, 'tx', None)
+        if tx is not None:
+            # Commit'e kadar beklet; geri alınan yazmalar duyurulmaz
+            tx['pending'].append((event_id, change, data))
+            return
+        for listener in self._write_listeners:
+            try:
+                listener(event_id, change, **data)
+            except Exception as e:
+                logger.error(f"Yazma dinleyicisi hatası ({change}): {str(e)}")
+    
+    def get_pool_stats(self):
+        """Bağlantı havuzu istatistiklerini döndürür"""
+        return self.pool.stats()
+    
+    def get_write_behind_stats(self):
+        """Write-behind kuyruk istatistiklerini döndürür"""
+        return self.write_behind.stats() if self.write_behind else None
+    
+    def flush_writes(self, timeout=None):
+        """Kuyruktaki yazmalar commit edilene kadar bekler"""
+        return self.write_behind.flush(timeout) if self.write_behind else True
+    
+    def _defer_write(self, method, *args):
+        """Write-behind açıksa yazmayı kuyruğa ekler ve True döner
+        
+        Writer thread yazmaları transaction() içinde çalıştırır; açık işlem içindeki
+        çağrılar (toplu webhook, writer thread) doğrudan yazılır.
+        """
+        if self.write_behind is None or self.in_transaction():
+            return False
+        self.write_behind.submit(method, *args)
+        return True
+    
+    def get_checkpoint_stats(self):
+        """WAL checkpoint istatistiklerini döndürür"""
+        return self.checkpointer.stats() if self.checkpointer else None
+    
+    def get_latest_event_cache_stats(self):
+        """Aktif etkinlik önbelleği istatistiklerini döndürür"""
+        return self.latest_events.stats()
+    
+    def get_presence_stats(self):
+        """Kullanıcı varlık katmanı istatistiklerini döndürür"""
+        return self.presence.stats()
+    
+    def after_fork(self, start_checkpointer=False):
+        """Fork sonrası çocuk süreçte havuzu, kilitleri ve arka plan thread'lerini yeniler
+
+        gunicorn post_fork kancasından çağrılır; WAL checkpoint thread'ini sadece
+        bakım sahibi worker çalıştırır (start_checkpointer=True).
+        """
+        self.pool.after_fork()
+        self._local = threading.local()
+        self.latest_events.after_fork()
+        self.presence.after_fork()
+        if self.write_behind:
+            self.write_behind.after_fork()
+        if self.checkpointer:
+            self.checkpointer.after_fork()
+            if start_checkpointer:
+                self.checkpointer.start()
+    
+    def close(self):
+        """Yazma kuyruğunu boşaltır, checkpoint thread'ini durdurur ve bağlantıları kapatır"""
+        self.presence.close()
+        self.latest_events.close()
+        if self.write_behind:
+            self.write_behind.close()
+        if self.checkpointer:
+            self.checkpointer.stop()
+            # Kapanışta WAL'ı ana dosyaya aktar
+            with self.get_connection() as conn:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.pool.close()
     
     # Events işlemleri
     def create_event(self, title, created_by, group_id):
@@ -169,11 +950,32 @@ class Database:
             ''', (title, created_by, group_id))
             event_id = cursor.lastrowid
             conn.commit()
-            logger.info(f"Etkinlik oluşturuldu: {title} (ID: {event_id})")
-            return event_id
+        logger.info(f"Etkinlik oluşturuldu: {title} (ID: {event_id})")
+        # Açık işlemde de eski kayıt hemen düşer; dinleyici commit sonrası tekrar temizler
+        self.latest_events.invalidate(group_id)
+        self._notify_write(event_id, 'event_created', group_id=group_id)
+        return event_id
+    
+    def set_event_status(self, event_id, status):
+        """Etkinliğin durumunu değiştirir (active, closed)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('UPDATE events SET status = ? WHERE event_id = ?', (status, event_id))
+            row = cursor.execute('SELECT group_id FROM events WHERE event_id = ?', (event_id,)).fetchone()
+            conn.commit()
+        if row is None:
+            return False
+        logger.info(f"Etkinlik durumu değişti: {event_id} -> {status}")
+        self.latest_events.invalidate(row['group_id'])
+        self._notify_write(event_id, 'event_status_changed', group_id=row['group_id'], status=status)
+        return True
     
     def get_latest_event(self, group_id=None):
-        """En son etkinliği getirir"""
+        """Grubun en son aktif etkinliğini getirir (grup başına önbellekli)"""
+        return self.latest_events.get(group_id, self._load_latest_event)
+    
+    def _load_latest_event(self, group_id):
+        """En son aktif etkinliği veritabanından okur"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             if group_id:
@@ -208,8 +1010,9 @@ class Database:
             ''', (event_id, start_datetime, end_datetime, created_by))
             slot_id = cursor.lastrowid
             conn.commit()
-            logger.info(f"Slot oluşturuldu: {start_datetime} - {end_datetime} (ID: {slot_id})")
-            return slot_id
+        logger.info(f"Slot oluşturuldu: {start_datetime} - {end_datetime} (ID: {slot_id})")
+        self._notify_write(event_id, 'slot_added', slot_id=slot_id)
+        return slot_id
     
     def get_slots_by_event(self, event_id):
         """Etkinliğe ait slotları getirir"""
@@ -231,6 +1034,8 @@ class Database:
     
     def vote_slot(self, event_id, slot_id, user_id, choice):
         """Slot için oy verir"""
+        if self._defer_write(self.vote_slot, event_id, slot_id, user_id, choice):
+            return
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
@@ -239,7 +1044,49 @@ class Database:
                 VALUES (?, ?, ?, ?)
             ''', (event_id, slot_id, user_id, choice))
             conn.commit()
-            logger.info(f"Slot oyu: Kullanıcı {user_id} -> Slot {slot_id} = {choice}")
+        logger.info(f"Slot oyu: Kullanıcı {user_id} -> Slot {slot_id} = {choice}")
+        self._notify_write(event_id, 'slot_voted', slot_id=slot_id, user_id=user_id, choice=choice)
+    
+    def replace_slot_vote(self, event_id, slot_id, user_id, choice='yes'):
+        """Kullanıcının etkinlikteki tüm slot oylarını tek bir oyla değiştirir"""
+        if self._defer_write(self.replace_slot_vote, event_id, slot_id, user_id, choice):
+            return
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            # Kullanıcının eski oylarını sil
+            cursor.execute('''
+                DELETE FROM slot_votes 
+                WHERE event_id = ? AND user_id = ?
+            ''', (event_id, user_id))
+            cursor.execute('''
+                INSERT INTO slot_votes (event_id, slot_id, user_id, choice)
+                VALUES (?, ?, ?, ?)
+            ''', (event_id, slot_id, user_id, choice))
+            conn.commit()
+        logger.info(f"Slot oyu değiştirildi: Kullanıcı {user_id} -> Slot {slot_id} = {choice}")
+        self._notify_write(event_id, 'slot_voted', slot_id=slot_id, user_id=user_id, choice=choice)
+    
+    def close_slot(self, event_id, slot_id):
+        """Slot'u kapatır; slot bu etkinliğe aitse True döner"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE slots 
+                SET status = 'closed' 
+                WHERE slot_id = ? AND event_id = ?
+            ''', (slot_id, event_id))
+            closed = cursor.rowcount > 0
+            if closed:
+                # Kapanan slotun bekleyen hatırlatıcıları aynı işlemde iptal edilir
+                cursor.execute('''
+                    UPDATE reminders SET status = 'cancelled'
+                    WHERE slot_id = ? AND status = 'pending'
+                ''', (slot_id,))
+            conn.commit()
+        if closed:
+            logger.info(f"Slot kapatıldı: {slot_id} (Etkinlik: {event_id})")
+            self._notify_write(event_id, 'slot_closed', slot_id=slot_id)
+        return closed
     
     def get_slot_votes(self, event_id):
         """Etkinliğe ait slot oylarını getirir"""
@@ -264,8 +1111,9 @@ class Database:
             ''', (event_id, question))
             poll_id = cursor.lastrowid
             conn.commit()
-            logger.info(f"Anket oluşturuldu: {question} (ID: {poll_id})")
-            return poll_id
+        logger.info(f"Anket oluşturuldu: {question} (ID: {poll_id})")
+        self._notify_write(event_id, 'poll_created', poll_id=poll_id)
+        return poll_id
     
     def get_poll_by_event(self, event_id):
         """Etkinliğe ait anketi getirir"""
@@ -287,9 +1135,45 @@ class Database:
                 VALUES (?, ?, ?, ?)
             ''', (poll_id, text, latitude, longitude))
             choice_id = cursor.lastrowid
+            event_id = self._poll_event_id(cursor, poll_id)
             conn.commit()
-            logger.info(f"Anket seçeneği oluşturuldu: {text} (ID: {choice_id})")
-            return choice_id
+        logger.info(f"Anket seçeneği oluşturuldu: {text} (ID: {choice_id})")
+        self._notify_write(event_id, 'choice_added', poll_id=poll_id, choice_id=choice_id)
+        return choice_id
+    
+    def add_poll_choice(self, event_id, text, latitude=None, longitude=None, question='Mekan Seçimi'):
+        """Etkinliğin anketine seçenek ekler; anket yoksa oluşturur"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT poll_id FROM polls WHERE event_id = ?', (event_id,))
+            poll = cursor.fetchone()
+            
+            if not poll:
+                # Anket yoksa oluştur
+                cursor.execute('''
+                    INSERT INTO polls (event_id, question)
+                    VALUES (?, ?)
+                ''', (event_id, question))
+                poll_id = cursor.lastrowid
+            else:
+                poll_id = poll['poll_id']
+            
+            # Seçeneği ekle (konum bilgisi ile)
+            cursor.execute('''
+                INSERT INTO poll_choices (poll_id, text, latitude, longitude)
+                VALUES (?, ?, ?, ?)
+            ''', (poll_id, text, latitude, longitude))
+            choice_id = cursor.lastrowid
+            conn.commit()
+        logger.info(f"Anket seçeneği oluşturuldu: {text} (ID: {choice_id})")
+        self._notify_write(event_id, 'choice_added', poll_id=poll_id, choice_id=choice_id)
+        return poll_id, choice_id
+    
+    def _poll_event_id(self, cursor, poll_id):
+        """Anketin ait olduğu etkinlik ID'sini döndürür"""
+        cursor.execute('SELECT event_id FROM polls WHERE poll_id = ?', (poll_id,))
+        row = cursor.fetchone()
+        return row['event_id'] if row else None
     
     def get_poll_choices(self, poll_id):
         """Anket seçeneklerini getirir"""
@@ -304,6 +1188,8 @@ class Database:
     
     def vote_poll(self, poll_id, choice_id, user_id):
         """Anket için oy verir"""
+        if self._defer_write(self.vote_poll, poll_id, choice_id, user_id):
+            return
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
@@ -311,8 +1197,10 @@ class Database:
                 (poll_id, choice_id, user_id)
                 VALUES (?, ?, ?)
             ''', (poll_id, choice_id, user_id))
+            event_id = self._poll_event_id(cursor, poll_id)
             conn.commit()
-            logger.info(f"Anket oyu: Kullanıcı {user_id} -> Seçenek {choice_id}")
+        logger.info(f"Anket oyu: Kullanıcı {user_id} -> Seçenek {choice_id}")
+        self._notify_write(event_id, 'poll_voted', poll_id=poll_id, choice_id=choice_id, user_id=user_id)
     
     def get_poll_votes(self, poll_id):
         """Anket oylarını getirir"""
@@ -337,8 +1225,9 @@ class Database:
             ''', (event_id, user_id, amount, description, weight))
             expense_id = cursor.lastrowid
             conn.commit()
-            logger.info(f"Gider oluşturuldu: {amount} TL - {description} (ID: {expense_id})")
-            return expense_id
+        logger.info(f"Gider oluşturuldu: {amount} TL - {description} (ID: {expense_id})")
+        self._notify_write(event_id, 'expense_added', expense_id=expense_id, user_id=user_id)
+        return expense_id
     
     def get_expenses_by_event(self, event_id):
         """Etkinliğe ait giderleri getirir"""
@@ -351,18 +1240,124 @@ class Database:
             ''', (event_id,))
             return cursor.fetchall()
     
+    # Reminders işlemleri
+    def create_reminder(self, event_id, group_id, message, due_at, slot_id=None):
+        """Hatırlatıcı kaydeder; due_at Unix zamanıdır"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO reminders (event_id, slot_id, group_id, message, due_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (event_id, slot_id, group_id, message, due_at))
+            reminder_id = cursor.lastrowid
+            conn.commit()
+            return reminder_id
+    
+    def get_reminder(self, reminder_id):
+        """Hatırlatıcıyı getirir"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM reminders WHERE reminder_id = ?', (reminder_id,))
+            return cursor.fetchone()
+    
+    def get_due_reminders(self, until):
+        """until anına kadar vadesi gelen bekleyen hatırlatıcıların (reminder_id, due_at) listesi"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT reminder_id, due_at FROM reminders
+                WHERE status = 'pending' AND due_at <= ?
+                ORDER BY due_at
+            ''', (until,))
+            return cursor.fetchall()
+    
+    def claim_reminder(self, reminder_id, now):
+        """Bekleyen hatırlatıcıyı gönderildi işaretler; başka bir süreç almadıysa satırı döndürür"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE reminders SET status = 'sent', sent_at = ?
+                WHERE reminder_id = ? AND status = 'pending'
+            ''', (now, reminder_id))
+            claimed = cursor.rowcount > 0
+            row = cursor.execute(
+                'SELECT * FROM reminders WHERE reminder_id = ?', (reminder_id,)
+            ).fetchone() if claimed else None
+            conn.commit()
+            return row
+    
+    def set_reminder_status(self, reminder_id, status, expected='pending'):
+        """Hatırlatıcı durumunu değiştirir (cancelled, failed, expired); değiştiyse True"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE reminders SET status = ? WHERE reminder_id = ? AND status = ?
+            ''', (status, reminder_id, expected))
+            conn.commit()
+            return cursor.rowcount > 0
+    
+    def count_pending_reminders(self):
+        """Bekleyen hatırlatıcı sayısını döndürür"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM reminders WHERE status = 'pending'")
+            return cursor.fetchone()[0]
+    
     # Users işlemleri
-    def create_or_update_user(self, user_id, name=None, role='user'):
-        """Kullanıcı oluşturur veya günceller"""
+    def create_or_update_user(self, user_id, name=None, role=None):
+        """Kullanıcı oluşturur veya günceller; verilmeyen ad ve rol korunur"""
+        if self._defer_write(self.create_or_update_user, user_id, name, role):
+            return
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                INSERT OR REPLACE INTO users (user_id, name, role, last_active)
-                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-            ''', (user_id, name, role))
+                INSERT INTO users (user_id, name, role, last_active)
+                VALUES (?, ?, COALESCE(?, 'user'), CURRENT_TIMESTAMP)
+                ON CONFLICT(user_id) DO UPDATE SET
+                    name = COALESCE(?, name),
+                    role = COALESCE(?, role),
+                    last_active = CURRENT_TIMESTAMP
+            ''', (user_id, name, role, name, role))
             conn.commit()
             logger.info(f"Kullanıcı güncellendi: {user_id}")
     
+    def touch_user(self, user_id):
+        """İstek yolunda kullanıcıyı aktif işaretler; sadece yeni kullanıcılar anında yazılır"""
+        return self.presence.touch(user_id)
+    
+    def ensure_user(self, user_id):
+        """Kullanıcı yoksa ekler; varsa hiçbir alanına dokunmaz. Eklendiyse True döner"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            row = cursor.execute('SELECT 1 FROM users WHERE user_id = ?', (user_id,)).fetchone()
+            if row is not None:
+                return False
+            cursor.execute('''
+                INSERT INTO users (user_id, last_active) VALUES (?, CURRENT_TIMESTAMP)
+                ON CONFLICT(user_id) DO NOTHING
+            ''', (user_id,))
+            conn.commit()
+            if cursor.rowcount:
+                logger.info(f"Yeni kullanıcı eklendi: {user_id}")
+            return cursor.rowcount > 0
+    
+    def touch_users(self, user_ids):
+        """Kullanıcıların last_active alanını toplu günceller; güncellenen satır sayısını döndürür"""
+        user_ids = list(user_ids)
+        updated = 0
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(user_ids), TOUCH_CHUNK_SIZE):
+                chunk = user_ids[start:start + TOUCH_CHUNK_SIZE]
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(
+                    f'UPDATE users SET last_active = CURRENT_TIMESTAMP WHERE user_id IN ({placeholders})',
+                    chunk
+                )
+                updated += cursor.rowcount
+            conn.commit()
+        return updated
+    
     def get_user(self, user_id):
         """Kullanıcı bilgilerini getirir"""
         with self.get_connection() as conn:
@@ -370,6 +1365,339 @@ class Database:
             cursor.execute('SELECT * FROM users WHERE user_id = ?', (user_id,))
             return cursor.fetchone()
     
+    # Sayaç işlemleri
+    def get_event_stats(self, event_id):
+        """Etkinliğin sayaçlarını getirir"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM event_stats WHERE event_id = ?', (event_id,))
+            return cursor.fetchone()
+    
+    def get_event_delta(self, event_id, include_slots=False, include_choices=False, expense_id=None,
+                        include_ledger=False):
+        """Canlı akış için etkinliğin değişen bölümlerini mutlak değerleriyle getirir"""
+        with self._read_snapshot() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM event_stats WHERE event_id = ?', (event_id,))
+            totals = cursor.fetchone()
+            if not totals:
+                return None
+            delta = {
+                'version': totals['version'],
+                'participant_count': totals['participant_count'],
+                'total_expense': totals['expense_total']
+            }
+            if include_slots:
+                # Özetteki sıra ile aynı: aktif slotlar başlangıç zamanına göre
+                cursor.execute('''
+                    SELECT s.slot_id, s.start_datetime, s.end_datetime,
+                           COALESCE(st.yes_votes, 0) AS yes_votes,
+                           COALESCE(st.no_votes, 0) AS no_votes
+                    FROM slots s
+                    LEFT JOIN slot_stats st ON st.slot_id = s.slot_id
+                    WHERE s.event_id = ? AND s.status = 'active'
+                    ORDER BY s.start_datetime
+                ''', (event_id,))
+                delta['slots'] = [dict(row) for row in cursor.fetchall()]
+            if include_choices:
+                cursor.execute('''
+                    SELECT pc.choice_id, pc.text, pc.latitude, pc.longitude,
+                           COALESCE(cs.votes, 0) AS votes
+                    FROM poll_choices pc
+                    LEFT JOIN choice_stats cs ON cs.choice_id = pc.choice_id
+                    WHERE pc.poll_id = (
+                        SELECT poll_id FROM polls
+                        WHERE event_id = ? AND status = 'active'
+                        ORDER BY created_at DESC LIMIT 1
+                    )
+                    ORDER BY pc.choice_id
+                ''', (event_id,))
+                delta['choices'] = [dict(row) for row in cursor.fetchall()]
+            if expense_id is not None:
+                cursor.execute('SELECT * FROM expenses WHERE expense_id = ?', (expense_id,))
+                row = cursor.fetchone()
+                delta['expense'] = dict(row) if row else None
+            if include_ledger:
+                # Bakiyeler uygulama katmanında settlement ile hesaplanır
+                delta['ledger'] = self._read_balance_ledger(cursor, event_id)
+            return delta
+    
+    def get_event_version(self, event_id):
+        """Etkinliğin versiyonunu döndürür; etkinlik yoksa None"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT version FROM event_stats WHERE event_id = ?', (event_id,))
+            row = cursor.fetchone()
+            return row['version'] if row else None
+    
+    def get_events_page(self, limit=50, after=None, group_id=None, status='active'):
+        """Etkinlikleri (created_at, event_id) azalan sırada sayfa sayfa getirir
+
+        after: önceki sayfanın son (created_at, event_id) değeri; status=None tüm durumlar.
+        Katılımcı sayısı event_stats sayacından okunur. (satırlar, devamı var mı) döndürür.
+        """
+        conditions, params = [], []
+        if status is not None:
+            conditions.append('e.status = ?')
+            params.append(status)
+        if group_id:
+            conditions.append('e.group_id = ?')
+            params.append(group_id)
+        if after is not None:
+            conditions.append('(e.created_at, e.event_id) < (?, ?)')
+            params.extend(after)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT e.event_id, e.title, e.group_id, e.created_at, e.status,
+                       COALESCE(s.participant_count, 0) AS participant_count,
+                       COALESCE(s.version, 1) AS version
+                FROM events e
+                LEFT JOIN event_stats s ON s.event_id = e.event_id
+                {where}
+                ORDER BY e.created_at DESC, e.event_id DESC
+                LIMIT ?
+            ''', params + [limit + 1])
+            rows = cursor.fetchall()
+        return rows[:limit], len(rows) > limit
+
+    def iter_events(self, group_id=None, status='active', batch_size=500):
+        """Etkinlikleri get_events_page sırasıyla tek tek üretir (dışa aktarma için)
+
+        Satırlar keyset partileriyle okunur; bağlantı partiler arasında havuza döner,
+        yavaş okuyan bir istemci havuzdan bağlantı tutmaz.
+        """
+        after = None
+        while True:
+            rows, has_more = self.get_events_page(batch_size, after=after, group_id=group_id, status=status)
+            yield from rows
+            if not has_more:
+                return
+            after = (rows[-1]['created_at'], rows[-1]['event_id'])
+
+    def iter_expenses(self, event_id, limit=None, batch_size=500):
+        """Etkinliğin giderlerini get_expenses_by_event sırasıyla tek tek üretir
+
+        limit verilirse en fazla o kadar gider üretilir (özetteki expense_count ile tutarlılık).
+        """
+        after = None
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = batch_size if remaining is None else min(batch_size, remaining)
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                if after is None:
+                    cursor.execute('''
+                        SELECT * FROM expenses WHERE event_id = ?
+                        ORDER BY created_at, expense_id LIMIT ?
+                    ''', (event_id, size))
+                else:
+                    cursor.execute('''
+                        SELECT * FROM expenses
+                        WHERE event_id = ? AND (created_at, expense_id) > (?, ?)
+                        ORDER BY created_at, expense_id LIMIT ?
+                    ''', (event_id, after[0], after[1], size))
+                rows = cursor.fetchall()
+            yield from (dict(row) for row in rows)
+            if len(rows) < size:
+                return
+            if remaining is not None:
+                remaining -= len(rows)
+            after = (rows[-1]['created_at'], rows[-1]['expense_id'])
+
+    def get_user_count(self):
+        """Toplam kullanıcı sayısını sayaçtan döndürür"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT value FROM schema_meta WHERE key = 'user_count'")
+            row = cursor.fetchone()
+            return row['value'] if row else 0
+    
+    def rebuild_stats(self, event_id=None, fix=True):
+        """Sayaçları ham veriden yeniden hesaplar ve farkları raporlar"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            report = self._rebuild_stats(cursor, event_id, fix)
+            conn.commit()
+        if report['drift']:
+            logger.warning(f"Sayaç farkı bulundu: {len(report['drift'])} kayıt (düzeltildi: {report['fixed']})")
+        return report
+    
+    def _rebuild_stats(self, cursor, event_id, fix):
+        """rebuild_stats gövdesi; açık bir yazma işlemi içinde çalışır"""
+        scope = 'WHERE event_id = ?' if event_id is not None else ''
+        params = (event_id,) if event_id is not None else ()
+        drift = []
+        
+        def compare(table, key, expected, stored, fields):
+            for k in expected.keys() | stored.keys():
+                exp_row, cur_row = expected.get(k), stored.get(k)
+                for field in fields:
+                    exp_val = exp_row[field] if exp_row else None
+                    cur_val = cur_row[field] if cur_row else None
+                    if exp_val is None or cur_val is None:
+                        same = exp_val == cur_val
+                    else:
+                        same = abs(exp_val - cur_val) < 1e-6
+                    if not same:
+                        drift.append({
+                            'table': table, key: k, 'field': field,
+                            'stored': cur_val, 'expected': exp_val
+                        })
+        
+        # Beklenen etkinlik sayaçları (ilişkili alt sorgular index'leri kullanır)
+        cursor.execute(f'''
+            SELECT e.event_id,
+                (SELECT COUNT(*) FROM slots s WHERE s.event_id = e.event_id) AS slot_count,
+                (SELECT COUNT(*) FROM slots s
+                 WHERE s.event_id = e.event_id AND s.status = 'active') AS active_slot_count,
+                (SELECT COUNT(*) FROM slot_votes v
+                 WHERE v.event_id = e.event_id AND v.choice = 'yes') AS slot_yes_votes,
+                (SELECT COUNT(*) FROM slot_votes v
+                 WHERE v.event_id = e.event_id AND v.choice = 'no') AS slot_no_votes,
+                (SELECT COUNT(*) FROM poll_votes pv JOIN polls p ON p.poll_id = pv.poll_id
+                 WHERE p.event_id = e.event_id) AS poll_vote_count,
+                (SELECT COUNT(*) FROM expenses x WHERE x.event_id = e.event_id) AS expense_count,
+                (SELECT TOTAL(amount) FROM expenses x WHERE x.event_id = e.event_id) AS expense_total,
+                (SELECT TOTAL(weight) FROM expenses x WHERE x.event_id = e.event_id) AS weight_total
+            FROM events e {scope.replace('event_id', 'e.event_id')}
+        ''', params)
+        expected_events = {row['event_id']: dict(row) for row in cursor.fetchall()}
+        
+        # Beklenen katılımcılar ve referans sayıları
+        cursor.execute(f'''
+            SELECT event_id, user_id, COUNT(*) AS refs FROM (
+                SELECT event_id, user_id FROM slot_votes {scope}
+                UNION ALL
+                SELECT p.event_id, pv.user_id FROM poll_votes pv
+                JOIN polls p ON p.poll_id = pv.poll_id {scope.replace('event_id', 'p.event_id')}
+                UNION ALL
+                SELECT event_id, user_id FROM expenses {scope}
+            )
+            GROUP BY event_id, user_id
+        ''', params * 3)
+        expected_participants = {(row['event_id'], row['user_id']): dict(row) for row in cursor.fetchall()}
+        for stats in expected_events.values():
+            stats['participant_count'] = 0
+        for (eid, _user), row in expected_participants.items():
+            if eid in expected_events:
+                expected_events[eid]['participant_count'] += 1
+        
+        # Beklenen bakiye defteri: giderler baştan oynatılır (ağırlık kişinin son giderinden)
+        cursor.execute(f'''
+            SELECT event_id, user_id,
+                SUM(CAST(ROUND(amount * 100) AS INTEGER)) AS paid_cents,
+                COALESCE(weight, 1.0) AS weight,
+                COUNT(*) AS expense_count,
+                MAX(expense_id) AS last_expense_id
+            FROM expenses {scope}
+            GROUP BY event_id, user_id
+        ''', params)
+        expected_balances = {
+            (row['event_id'], row['user_id']): {field: row[field] for field in ('event_id', 'user_id') + BALANCE_FIELDS}
+            for row in cursor.fetchall()
+        }
+        
+        cursor.execute(f'''
+            SELECT s.slot_id, s.event_id,
+                (SELECT COUNT(*) FROM slot_votes v
+                 WHERE v.event_id = s.event_id AND v.slot_id = s.slot_id AND v.choice = 'yes') AS yes_votes,
+                (SELECT COUNT(*) FROM slot_votes v
+                 WHERE v.event_id = s.event_id AND v.slot_id = s.slot_id AND v.choice = 'no') AS no_votes
+            FROM slots s {scope.replace('event_id', 's.event_id')}
+        ''', params)
+        expected_slots = {row['slot_id']: dict(row) for row in cursor.fetchall()}
+        
+        cursor.execute(f'''
+            SELECT pc.choice_id, pc.poll_id,
+                (SELECT COUNT(*) FROM poll_votes pv WHERE pv.choice_id = pc.choice_id) AS votes
+            FROM poll_choices pc
+            WHERE pc.poll_id IN (SELECT poll_id FROM polls {scope})
+        ''', params)
+        expected_choices = {row['choice_id']: dict(row) for row in cursor.fetchall()}
+        
+        # Mevcut sayaçlar
+        cursor.execute(f'SELECT * FROM event_stats {scope}', params)
+        stored_events = {row['event_id']: dict(row) for row in cursor.fetchall()}
+        cursor.execute(f'SELECT * FROM event_participants {scope}', params)
+        stored_participants = {(row['event_id'], row['user_id']): dict(row) for row in cursor.fetchall()}
+        cursor.execute(f'SELECT * FROM event_balances {scope}', params)
+        stored_balances = {(row['event_id'], row['user_id']): dict(row) for row in cursor.fetchall()}
+        cursor.execute(f'SELECT * FROM slot_stats {scope}', params)
+        stored_slots = {row['slot_id']: dict(row) for row in cursor.fetchall()}
+        cursor.execute(f'''
+            SELECT * FROM choice_stats
+            WHERE poll_id IN (SELECT poll_id FROM polls {scope})
+        ''', params)
+        stored_choices = {row['choice_id']: dict(row) for row in cursor.fetchall()}
+        
+        # Fark düzeltilirken versiyon geri gitmemeli
+        for eid, stats in expected_events.items():
+            stats['version'] = stored_events.get(eid, {}).get('version', 0) + 1
+        
+        compare('event_stats', 'event_id', expected_events, stored_events, EVENT_STATS_FIELDS)
+        compare('event_participants', 'key', expected_participants, stored_participants, ('refs',))
+        compare('event_balances', 'key', expected_balances, stored_balances, BALANCE_FIELDS)
+        compare('slot_stats', 'slot_id', expected_slots, stored_slots, ('yes_votes', 'no_votes'))
+        compare('choice_stats', 'choice_id', expected_choices, stored_choices, ('votes',))
+        
+        # Toplam kullanıcı sayısı sadece tam kontrolde
+        expected_users = stored_users = None
+        if event_id is None:
+            expected_users = cursor.execute('SELECT COUNT(*) AS total FROM users').fetchone()['total']
+            row = cursor.execute("SELECT value FROM schema_meta WHERE key = 'user_count'").fetchone()
+            stored_users = row['value'] if row else None
+            if expected_users != stored_users:
+                drift.append({
+                    'table': 'schema_meta', 'key': 'user_count', 'field': 'value',
+                    'stored': stored_users, 'expected': expected_users
+                })
+        
+        if fix and expected_users != stored_users:
+            cursor.execute('''
+                INSERT OR REPLACE INTO schema_meta (key, value)
+                VALUES ('user_count', ?)
+            ''', (expected_users,))
+        
+        if fix and drift:
+            # Katılımcılar önce yazılır; trigger'ların event_stats'a etkisi aşağıda ezilir
+            cursor.execute(f'DELETE FROM event_participants {scope}', params)
+            cursor.executemany('''
+                INSERT INTO event_participants (event_id, user_id, refs)
+                VALUES (:event_id, :user_id, :refs)
+            ''', expected_participants.values())
+            cursor.execute(f'DELETE FROM event_stats {scope}', params)
+            cursor.executemany(f'''
+                INSERT INTO event_stats (event_id, version, {', '.join(EVENT_STATS_FIELDS)})
+                VALUES (:event_id, :version, {', '.join(':' + f for f in EVENT_STATS_FIELDS)})
+            ''', expected_events.values())
+            cursor.execute(f'DELETE FROM event_balances {scope}', params)
+            cursor.executemany(f'''
+                INSERT INTO event_balances (event_id, user_id, {', '.join(BALANCE_FIELDS)})
+                VALUES (:event_id, :user_id, {', '.join(':' + f for f in BALANCE_FIELDS)})
+            ''', expected_balances.values())
+            cursor.execute(f'DELETE FROM slot_stats {scope}', params)
+            cursor.executemany('''
+                INSERT INTO slot_stats (slot_id, event_id, yes_votes, no_votes)
+                VALUES (:slot_id, :event_id, :yes_votes, :no_votes)
+            ''', expected_slots.values())
+            cursor.execute(f'''
+                DELETE FROM choice_stats
+                WHERE poll_id IN (SELECT poll_id FROM polls {scope})
+            ''', params)
+            cursor.executemany('''
+                INSERT INTO choice_stats (choice_id, poll_id, votes)
+                VALUES (:choice_id, :poll_id, :votes)
+            ''', expected_choices.values())
+        
+        return {
+            'events_checked': len(expected_events),
+            'drift': drift,
+            'fixed': bool(fix and drift)
+        }
+    
     # Yardımcı fonksiyonlar
     def is_moderator(self, user_id, event_id):
         """Kullanıcının moderatör olup olmadığını kontrol eder"""
@@ -405,6 +1733,93 @@ class Database:
             'poll_votes': [dict(vote) for vote in poll_votes],
             'expenses': [dict(expense) for expense in expenses]
         }
+    
+    def _read_balance_ledger(self, cursor, event_id):
+        """(ödenen, ağırlık, katılımcılar); O(katılımcı) satır, giderler taranmaz"""
+        # Farklı katılımcılar (slot oyu, anket oyu veya gider girenler); gider girenlerin defter satırı var
+        cursor.execute('''
+            SELECT p.user_id, b.paid_cents, b.weight
+            FROM event_participants p
+            LEFT JOIN event_balances b ON b.event_id = p.event_id AND b.user_id = p.user_id
+            WHERE p.event_id = ?
+        ''', (event_id,))
+        paid_by_user = {}
+        weight_by_user = {}
+        participants = []
+        for row in cursor.fetchall():
+            participants.append(row['user_id'])
+            if row['paid_cents'] is not None:
+                paid_by_user[row['user_id']] = row['paid_cents'] / 100
+                weight_by_user[row['user_id']] = row['weight']
+        return paid_by_user, weight_by_user, participants
+    
+    def get_event_summary_stats(self, event_id, include_expenses=True):
+        """Etkinlik özetini SQL'de toplanmış olarak tek bağlantı ve tek okuma işleminde getirir"""
+        # Tüm sorgular aynı anlık görüntüyü görsün diye tek okuma işlemi
+        with self._read_snapshot() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM events WHERE event_id = ?', (event_id,))
+            event = cursor.fetchone()
+            if not event:
+                return None
+            
+            # Aktif slotlar ve evet/hayır sayıları (sayaç tablosundan)
+            cursor.execute('''
+                SELECT s.slot_id, s.start_datetime, s.end_datetime, s.status,
+                       COALESCE(st.yes_votes, 0) AS yes_votes,
+                       COALESCE(st.no_votes, 0) AS no_votes
+                FROM slots s
+                LEFT JOIN slot_stats st ON st.slot_id = s.slot_id
+                WHERE s.event_id = ? AND s.status = 'active'
+                ORDER BY s.start_datetime
+            ''', (event_id,))
+            slots = [dict(row) for row in cursor.fetchall()]
+            
+            cursor.execute('''
+                SELECT * FROM polls 
+                WHERE event_id = ? AND status = 'active'
+                ORDER BY created_at DESC LIMIT 1
+            ''', (event_id,))
+            poll = cursor.fetchone()
+            
+            # Seçenek bazlı oy sayıları (sayaç tablosundan)
+            poll_choices = []
+            if poll:
+                cursor.execute('''
+                    SELECT pc.choice_id, pc.text, pc.latitude, pc.longitude,
+                           COALESCE(cs.votes, 0) AS votes
+                    FROM poll_choices pc
+                    LEFT JOIN choice_stats cs ON cs.choice_id = pc.choice_id
+                    WHERE pc.poll_id = ?
+                    ORDER BY pc.choice_id
+                ''', (poll['poll_id'],))
+                poll_choices = [dict(row) for row in cursor.fetchall()]
+            
+            # Gider toplamları sayaçtan, kişi bazlı ödemeler ve ağırlıklar bakiye defterinden
+            cursor.execute('SELECT * FROM event_stats WHERE event_id = ?', (event_id,))
+            totals = cursor.fetchone()
+            paid_by_user, weight_by_user, participants = self._read_balance_ledger(cursor, event_id)
+            
+            summary = {
+                'event': dict(event),
+                'slots': slots,
+                'poll': dict(poll) if poll else None,
+                'poll_choices': poll_choices,
+                'expense_count': totals['expense_count'] if totals else 0,
+                'total_expense': totals['expense_total'] if totals else 0.0,
+                'total_weight': totals['weight_total'] if totals else 0.0,
+                'paid_by_user': paid_by_user,
+                'weight_by_user': weight_by_user,
+                'participants': participants
+            }
+            if include_expenses:
+                cursor.execute('''
+                    SELECT * FROM expenses 
+                    WHERE event_id = ?
+                    ORDER BY created_at
+                ''', (event_id,))
+                summary['expenses'] = [dict(row) for row in cursor.fetchall()]
+            return summary
 
 # Global veritabanı instance
 db = Database()
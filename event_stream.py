@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📡 BiP Bot - Canlı Etkinlik Akışı (Server-Sent Events)
+Etkinlik değişikliklerini abonelere delta mesajları olarak dağıtan yayın merkezi
+
+Özellikler:
+- Etkinlik başına halka tampon (son N mesaj)
+- Abone başına kuyruk veya thread yok; tüm aboneler aynı tamponu okur
+- Last-Event-ID ile kopan bağlantılarda kaçırılan mesajların tekrar gönderimi
+- Tampon yetmediğinde veya süreç değiştiğinde 'resync' mesajı
+- SSE formatlama yardımcıları
+- asyncio okuyucular için thread bloklamayan uyandırma (set_waker)
+- Thread başına akış sunan sunucularda (gunicorn gthread) açık akış sınırı (StreamSlots)
+
+Yazar: BiP Bot Development Team
+Versiyon: 2.0.0
+"""
+
+import os
+import json
+import uuid
+import threading
+import logging
+from collections import deque, namedtuple, OrderedDict
+
+logger = logging.getLogger(__name__)
+
+StreamMessage = namedtuple('StreamMessage', ['id', 'event', 'data'])
+
+
+def format_sse(message):
+    """Mesajı text/event-stream formatına çevirir"""
+    payload = json.dumps(message.data, ensure_ascii=False, separators=(',', ':'))
+    lines = []
+    if message.id is not None:
+        lines.append(f"id: {message.id}")
+    lines.append(f"event: {message.event}")
+    lines.append(f"data: {payload}")
+    return '\n'.join(lines) + '\n\n'
+
+
+def format_sse_comment(text=''):
+    """Bağlantıyı canlı tutmak için SSE yorum satırı üretir"""
+    return f": {text}\n\n"
+
+
+class _Channel:
+    """Tek bir etkinliğin halka tamponu ve bekleme koşulu"""
+
+    def __init__(self, buffer_size, lock):
+        self.buffer = deque(maxlen=buffer_size)
+        self.cond = threading.Condition(lock)
+        self.seq = 0
+        self.subscribers = 0
+        self.wakers = set()  # Yeni mesajda çağrılan, bloklamayan geri çağırımlar (asyncio)
+
+    def wake(self):
+        """Bekleyen thread'leri ve asyncio okuyucularını uyandırır (kilit tutulurken)"""
+        self.cond.notify_all()
+        for waker in self.wakers:
+            waker()
+
+
+class Subscription:
+    def __init__(self, hub, event_id, channel, cursor, resync):
+        """Abonelik; okunan son sıra numarasını tutar"""
+        self.hub = hub
+        self.event_id = event_id
+        self._channel = channel
+        self._cursor = cursor
+        self._resync = resync
+        self.closed = False
+        self._waker = None
+
+    def set_waker(self, waker):
+        """Yeni mesaj geldiğinde çağrılacak geri çağırımı ayarlar; waker bloklamamalı
+
+        asyncio okuyucusu thread'de beklemek yerine loop.call_soon_threadsafe verir
+        ve mesajları wait(0) ile alır.
+        """
+        with self._channel.cond:
+            self._channel.wakers.discard(self._waker)
+            self._waker = waker
+            if waker is not None and not self.closed:
+                self._channel.wakers.add(waker)
+
+    def wait(self, timeout):
+        """Yeni mesajları bekler; süre dolarsa boş liste döner"""
+        channel = self._channel
+        with channel.cond:
+            if self._resync:
+                self._resync = False
+                return [self.hub._resync_message(self.event_id, channel.seq)]
+            if channel.seq == self._cursor and not self.closed:
+                channel.cond.wait(timeout)
+            if self.closed or channel.seq == self._cursor:
+                return []
+            oldest = channel.buffer[0].id if channel.buffer else None
+            if oldest is None or self.hub._seq_of(oldest) > self._cursor + 1:
+                # Yavaş abone tamponun gerisinde kaldı; özeti yeniden çekmeli
+                self._cursor = channel.seq
+                return [self.hub._resync_message(self.event_id, channel.seq)]
+            messages = [m for m in channel.buffer if self.hub._seq_of(m.id) > self._cursor]
+            self._cursor = channel.seq
+            return messages
+
+    def close(self):
+        """Aboneliği sonlandırır"""
+        if self.closed:
+            return
+        self.hub._unsubscribe(self)
+
+
+class EventStreamHub:
+    def __init__(self, buffer_size=64, max_channels=4096):
+        """Yayın merkezini başlatır"""
+        self.buffer_size = buffer_size
+        self.max_channels = max_channels
+        # Süreç/yeniden başlatma kimliği; farklı worker'ın id'leri tekrar oynatılmaz
+        self.epoch = uuid.uuid4().hex[:8]
+        self._lock = threading.Lock()
+        self._channels = OrderedDict()
+        self._pid = os.getpid()
+
+        # İstatistikler
+        self._published = 0
+        self._resyncs = 0
+        self._total_subscribers = 0
+
+    def _seq_of(self, message_id):
+        """'epoch-seq' biçimindeki mesaj kimliğinden sıra numarasını çıkarır"""
+        return int(message_id.rsplit('-', 1)[1])
+
+    def _parse_last_id(self, last_event_id):
+        """Last-Event-ID başlığını çözer; bu sürece ait değilse None döner"""
+        if not last_event_id:
+            return None
+        epoch, _, seq = last_event_id.partition('-')
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def _resync_message(self, event_id, seq):
+        """İstemciye tam özeti yeniden çekmesini söyleyen mesaj"""
+        self._resyncs += 1
+        return StreamMessage(f"{self.epoch}-{seq}", 'resync', {'event_id': event_id})
+
+    def after_fork(self):
+        """Fork sonrası çocuk süreçte çağrılır (gunicorn post_fork); kilidi de yeniler"""
+        if self._pid == os.getpid():
+            return
+        self._lock = threading.Lock()
+        self._reset_after_fork()
+
+    def _reset_after_fork(self):
+        """Ebeveynin kanalları ve kimlikleri çocuk süreçte kullanılmaz"""
+        self._channels = OrderedDict()
+        self._pid = os.getpid()
+        self.epoch = uuid.uuid4().hex[:8]
+
+    def _get_channel(self, event_id, create):
+        """Kanalı döndürür; gerekirse oluşturur ve eski boş kanalları atar"""
+        if self._pid != os.getpid():
+            self._reset_after_fork()
+        channel = self._channels.get(event_id)
+        if channel is not None:
+            self._channels.move_to_end(event_id)
+            return channel
+        if not create:
+            return None
+        channel = _Channel(self.buffer_size, self._lock)
+        self._channels[event_id] = channel
+        while len(self._channels) > self.max_channels:
+            oldest_id, oldest = next(iter(self._channels.items()))
+            if oldest.subscribers:
+                break
+            del self._channels[oldest_id]
+        return channel
+
+    def publish(self, event_id, event, data):
+        """Etkinliğin abonelerine mesaj yayınlar; mesaj kimliğini döndürür"""
+        with self._lock:
+            channel = self._get_channel(event_id, create=True)
+            channel.seq += 1
+            message = StreamMessage(f"{self.epoch}-{channel.seq}", event, data)
+            channel.buffer.append(message)
+            self._published += 1
+            channel.wake()
+        return message.id
+
+    def discard(self, event_id):
+        """Yayınlanmayan bir değişikliği işaretler; eski kimlikle dönen istemci resync alır"""
+        with self._lock:
+            channel = self._get_channel(event_id, create=False)
+            if channel is not None:
+                channel.seq += 1
+                channel.buffer.clear()
+                channel.wake()
+
+    def subscribe(self, event_id, last_event_id=None):
+        """Etkinliğe abone olur; Last-Event-ID varsa kaçırılanlar tekrar gönderilir"""
+        with self._lock:
+            channel = self._get_channel(event_id, create=True)
+            channel.subscribers += 1
+            self._total_subscribers += 1
+            cursor = channel.seq
+            resync = False
+            if last_event_id:
+                last_seq = self._parse_last_id(last_event_id)
+                oldest = self._seq_of(channel.buffer[0].id) if channel.buffer else channel.seq + 1
+                if last_seq is not None and oldest - 1 <= last_seq <= channel.seq:
+                    cursor = last_seq
+                else:
+                    resync = True
+            return Subscription(self, event_id, channel, cursor, resync)
+
+    def _unsubscribe(self, subscription):
+        """Aboneliği kanaldan düşer ve bekleyen okuyucuyu uyandırır"""
+        with self._lock:
+            subscription.closed = True
+            channel = subscription._channel
+            channel.subscribers -= 1
+            channel.wakers.discard(subscription._waker)
+            channel.wake()
+
+    def subscriber_count(self, event_id=None):
+        """Etkinliğin (veya tüm etkinliklerin) abone sayısını döndürür"""
+        with self._lock:
+            if event_id is not None:
+                channel = self._channels.get(event_id)
+                return channel.subscribers if channel else 0
+            return sum(channel.subscribers for channel in self._channels.values())
+
+    def stats(self):
+        """Yayın merkezi istatistiklerini döndürür"""
+        with self._lock:
+            return {
+                'channels': len(self._channels),
+                'subscribers': sum(channel.subscribers for channel in self._channels.values()),
+                'total_subscribers': self._total_subscribers,
+                'published': self._published,
+                'resyncs': self._resyncs,
+                'buffer_size': self.buffer_size
+            }
+
+
+class StreamSlots:
+    def __init__(self, limit=0):
+        """Aynı anda açık akış sınırı; 0 sınırsızdır (her akış bir thread tutuyorsa kullanılır)"""
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._open = 0
+        self._peak = 0
+        self._rejected = 0
+
+    def after_fork(self):
+        """Fork sonrası çocuk süreçte çağrılır; ebeveynin açık akışları sayılmaz"""
+        if self._pid == os.getpid():
+            return
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._open = 0
+
+    def acquire(self):
+        """Akış için yer ayırır; sınır doluysa False döner"""
+        with self._lock:
+            if self.limit and self._open >= self.limit:
+                self._rejected += 1
+                return False
+            self._open += 1
+            self._peak = max(self._peak, self._open)
+            return True
+
+    def release(self):
+        """Kapanan akışın yerini bırakır"""
+        with self._lock:
+            self._open = max(self._open - 1, 0)
+
+    def stats(self):
+        """Akış sınırı istatistiklerini döndürür"""
+        with self._lock:
+            return {
+                'limit': self.limit,
+                'open': self._open,
+                'peak': self._peak,
+                'rejected': self._rejected
+            }
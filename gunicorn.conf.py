@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🦄 BiP Bot - Gunicorn Production Yapılandırması
+gunicorn bu dosyayı çalışma dizininde kendiliğinden okur: gunicorn app:app
+
+Özellikler:
+- preload_app: uygulama master'da bir kez yüklenir, worker'lar fork ile paylaşır
+- gthread worker'lar; worker/thread sayısı ve keep-alive ortam değişkenleriyle ayarlanır
+- SSE akışlarına ayrı thread bütçesi; istek thread'leri açık sekmelerle tükenmez
+- Birden fazla worker varken aktif etkinlik önbelleği varsayılan olarak shared modundadır
+- post_fork: bağlantı havuzları, kilitler ve arka plan thread'leri worker başına yenilenir
+- Tek bakım sahibi worker (flock): hatırlatıcı dispatcher'ı ve WAL checkpoint'i sadece onda çalışır
+- Sahip worker ölürse kalanlardan biri kilidi alıp devralır
+
+Kullanım:
+gunicorn app:app
+GUNICORN_WORKERS=8 GUNICORN_THREADS=4 GUNICORN_STREAM_THREADS=64 gunicorn app:app
+
+Yazar: BiP Bot Development Team
+Versiyon: 2.0.0
+"""
+
+import os
+import multiprocessing
+
+# Sunucu
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', 5000)}")
+backlog = int(os.environ.get('GUNICORN_BACKLOG', 2048))
+
+# Worker'lar: SQLite tek yazıcılı olduğundan çekirdek başına bir süreç yeterli;
+# thread'ler okuma ve BiP beklemelerini örter
+worker_class = 'gthread'
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count()))
+# SSE akışları (/events/<id>/stream) bağlantı boyunca bir gthread thread'i tutar. İstek
+# thread'lerinin akışlara gitmemesi için worker'a STREAM_THREADS kadar ek thread verilir ve
+# uygulama aynı anda en fazla o kadar akış açar; fazlası 'busy' yanıtı alıp sonra yeniden
+# bağlanır. Worker başına yüzlerce açık sekme için akışlar thread tutmayan asgi.py ile sunulmalı
+request_threads = int(os.environ.get('GUNICORN_THREADS', 4))
+stream_threads = int(os.environ.get('GUNICORN_STREAM_THREADS', 32))
+threads = request_threads + stream_threads
+os.environ['BIP_BOT_MAX_STREAMS'] = str(stream_threads)
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') != '0'
+
+# Birden fazla worker'da aktif etkinlik önbelleği diğer worker'ların yazmalarını görmeli;
+# local modu sadece kendi sürecinin yazmalarını bilir. Uygulama yüklenmeden önce ayarlanır
+if workers > 1:
+    os.environ.setdefault('BIP_BOT_LATEST_EVENT_CACHE', 'shared')
+
+# Bağlantılar: yük dengeleyicinin boşta bağlantı süresinden kısa keep-alive
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+
+# Bellek sızıntılarına karşı worker'lar aralıklı yenilenir (aynı anda değil)
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 1000))
+
+# Worker kalp atışı dosyası diske değil belleğe yazılır
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+# Hatırlatıcı dispatcher'ı sadece bakım sahibi worker'da çalışır; master ve diğer
+# worker'lar app modülünü yüklerken başlatmasın
+RUN_SCHEDULER = os.environ.get('BIP_BOT_SCHEDULER', '1') != '0'
+os.environ['BIP_BOT_SCHEDULER'] = '0'
+OWNER_RETRY_SECONDS = float(os.environ.get('BIP_BOT_OWNER_RETRY_SECONDS', 30))
+
+
+def when_ready(server):
+    """Master hazır; preload ile master'da başlamış WAL checkpoint thread'i durdurulur"""
+    if preload_app:
+        from database import db
+        if db.checkpointer:
+            db.checkpointer.stop()
+    server.log.info(f"BiP Bot gunicorn hazır: {workers} worker x ({request_threads} istek + "
+                    f"{stream_threads} akış) thread")
+
+
+def post_fork(server, worker):
+    """Worker'da havuzları yeniler ve bakım sahipliğine aday olur"""
+    import app as bip_app
+
+    bip_app.reinit_after_fork()
+
+    def become_owner():
+        bip_app.start_maintenance(scheduler=RUN_SCHEDULER)
+        server.log.info(f"Bakım sahibi worker: PID {worker.pid}")
+
+    bip_app.MaintenanceOwner(f'{bip_app.db.db_path}.owner.lock', OWNER_RETRY_SECONDS, server.log).run(become_owner)
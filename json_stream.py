@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🌊 BiP Bot - Akışlı JSON Yanıtları
+Büyük listeleri bellekte toplamadan JSON olarak parça parça yazar
+
+Özellikler:
+- Yanıt gövdesindeki iterator/generator değerleri JSON dizisi olarak akıtılır
+- Diğer değerler verilen dumps ile kodlanır; çıktı jsonify ile bayt bayt aynıdır
+- Küçük parçalar chunk_size'a kadar birleştirilir (chunked transfer'de az parça)
+- Bellek kullanımı satır sayısından bağımsızdır
+
+Yazar: BiP Bot Development Team
+Versiyon: 2.0.0
+"""
+
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bir yanıt parçasının hedef boyutu (bayt)
+DEFAULT_CHUNK_SIZE = 16 * 1024
+
+
+def _compact_dumps(value):
+    return json.dumps(value, sort_keys=True, separators=(',', ':'))
+
+
+def is_stream(value):
+    """Değer akıtılacak bir iterator mı (liste, dict ve metinler değil)"""
+    return hasattr(value, '__next__')
+
+
+def iter_json(value, dumps=_compact_dumps, sort_keys=True):
+    """Değeri JSON metin parçaları olarak üretir; iterator değerler dizi olarak akıtılır"""
+    if is_stream(value):
+        yield '['
+        first = True
+        for item in value:
+            if not first:
+                yield ','
+            first = False
+            yield from iter_json(item, dumps, sort_keys)
+        yield ']'
+    elif isinstance(value, dict) and any(is_stream(v) or isinstance(v, dict) for v in value.values()):
+        # İçinde akış olabilecek dict anahtar anahtar yazılır; sıralama dumps ile aynı
+        items = sorted(value.items()) if sort_keys else value.items()
+        yield '{'
+        for index, (key, item) in enumerate(items):
+            yield f"{',' if index else ''}{dumps(str(key))}:"
+            yield from iter_json(item, dumps, sort_keys)
+        yield '}'
+    else:
+        yield dumps(value)
+
+
+def stream_json(value, dumps=_compact_dumps, sort_keys=True, chunk_size=DEFAULT_CHUNK_SIZE):
+    """iter_json parçalarını chunk_size civarı UTF-8 bayt bloklarına toplar (sonda satır sonu)"""
+    buffer, size = [], 0
+    try:
+        for piece in iter_json(value, dumps, sort_keys):
+            buffer.append(piece)
+            size += len(piece)
+            if size >= chunk_size:
+                yield ''.join(buffer).encode('utf-8')
+                buffer, size = [], 0
+    except Exception as e:
+        # Başlıklar gönderildi; yarım gövde bağlantı kesilerek istemciye bildirilir
+        logger.error(f"Akışlı JSON yanıtı yarıda kesildi: {str(e)}")
+        raise
+    buffer.append('\n')
+    yield ''.join(buffer).encode('utf-8')
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📌 BiP Bot - Grup Başına Aktif Etkinlik Önbelleği
+Webhook komutlarının her seferinde yaptığı "gruptaki son aktif etkinlik" sorgusunu önbellekler
+
+Özellikler:
+- group_id anahtarlı, boyutu sınırlı LRU önbellek (etkinliği olmayan gruplar da saklanır)
+- Etkinlik oluşturma ve durum değişikliklerinde yazma anında geçersiz kılma
+- local modu: tek süreç; sadece bu sürecin yazmalarıyla geçersiz kılınır
+- shared modu: trigger'larla tutulan değişiklik günlüğü okunur; başka worker'ların
+  yazmaları da fark edilir. Günlük sadece PRAGMA data_version değiştiğinde sorgulanır
+- Satırlar sütun adlarını paylaşan hafif kayıtlar olarak saklanır (sqlite3.Row'un üçte biri)
+- Hit/miss/eviction sayaçları
+
+Yazar: BiP Bot Development Team
+Versiyon: 2.0.0
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+CACHE_MODES = ('local', 'shared', 'off')
+
+# Aktif etkinliği olmayan grup için önbellekte saklanan değer
+_NO_EVENT = object()
+
+
+class CachedRow:
+    """sqlite3.Row gibi ad ve sıra ile okunan satır; sütun indeksi tüm kayıtlarda paylaşılır"""
+    __slots__ = ('_values', '_index')
+
+    def __init__(self, values, index):
+        self._values = values
+        self._index = index
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self._values[self._index[key]]
+        return self._values[key]
+
+    def __len__(self):
+        return len(self._values)
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def keys(self):
+        return list(self._index)
+
+
+class LatestEventCache:
+    def __init__(self, db, max_entries=200000, mode='local', check_interval=0.0, clock=time.monotonic):
+        """Önbelleği başlatır; check_interval shared modunda günlük okuma aralığıdır (saniye)"""
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Bilinmeyen önbellek modu: {mode}")
+        self.db = db
+        self.max_entries = max_entries
+        self.mode = mode
+        self.check_interval = check_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._entries = OrderedDict()  # group_id -> CachedRow veya _NO_EVENT
+        self._indexes = {}  # sütun adları -> paylaşılan sütun indeksi
+        # Yükleme sırasında bir geçersiz kılma olduysa sonuç önbelleğe yazılmaz
+        self._invalidation_seq = 0
+        self._change_seq = None  # Okunan son değişiklik günlüğü sırası
+        self._next_check = 0.0
+        # shared modunda günlüğü okuyan ayrı bağlantı (sadece _sync_lock altında kullanılır)
+        self._conn = None
+        self._conn_pid = None
+        self._data_version = None
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+        self._resets = 0
+
+    @property
+    def enabled(self):
+        return self.mode != 'off'
+
+    def get(self, group_id, load):
+        """Grubun aktif etkinliğini döndürür; önbellekte yoksa load(group_id) ile yükler"""
+        if not self.enabled:
+            return load(group_id)
+        if self.mode == 'shared':
+            self._sync()
+        with self._lock:
+            entry = self._entries.get(group_id)
+            if entry is not None:
+                self._entries.move_to_end(group_id)
+                self._hits += 1
+                return None if entry is _NO_EVENT else entry
+            self._misses += 1
+            seq = self._invalidation_seq
+        event = load(group_id)
+        if event is not None:
+            event = self._compact(event)
+        # Açık işlemdeki okuma geri alınabilir veriyi görebilir; önbelleğe yazılmaz
+        if not self.db.in_transaction():
+            self._put(group_id, _NO_EVENT if event is None else event, seq)
+        return event
+
+    def _compact(self, row):
+        """sqlite3.Row'u paylaşılan sütun indeksli CachedRow'a çevirir"""
+        columns = tuple(row.keys())
+        index = self._indexes.get(columns)
+        if index is None:
+            index = self._indexes.setdefault(columns, {name: i for i, name in enumerate(columns)})
+        return CachedRow(tuple(row), index)
+
+    def _put(self, group_id, value, seq):
+        """Arada geçersiz kılma olmadıysa değeri yazar ve LRU sınırını uygular"""
+        with self._lock:
+            if seq != self._invalidation_seq:
+                return
+            self._entries[group_id] = value
+            self._entries.move_to_end(group_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, group_id):
+        """Grubun kaydını siler; gruptan bağımsız "en son etkinlik" kaydı da silinir"""
+        with self._lock:
+            self._invalidation_seq += 1
+            for key in (group_id, None):
+                if self._entries.pop(key, None) is not None:
+                    self._invalidations += 1
+
+    def clear(self):
+        """Tüm önbelleği temizler"""
+        with self._lock:
+            self._invalidation_seq += 1
+            self._entries.clear()
+
+    def on_write(self, event_id, change, **data):
+        """Yazma dinleyicisi; commit'ten sonra etkinlik değişikliklerinde grubu geçersiz kılar"""
+        if change in ('event_created', 'event_status_changed'):
+            self.invalidate(data.get('group_id'))
+
+    def after_fork(self):
+        """Fork sonrası çocuk süreçte kilitleri yeniler; günlük bağlantısı yeniden açılır"""
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        if self._conn_pid != os.getpid():
+            # Ebeveynin bağlantısı kapatılmadan terk edilir
+            self._conn = None
+            self._conn_pid = None
+
+    def _connection(self):
+        """Günlük okuma bağlantısını döndürür (fork sonrası yeniden açılır)"""
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._conn = sqlite3.connect(self.db.db_path, check_same_thread=False, isolation_level=None)
+            self._conn_pid = os.getpid()
+            self._data_version = None
+        return self._conn
+
+    def _sync(self):
+        """Değişiklik günlüğündeki yeni kayıtların gruplarını geçersiz kılar (shared modu)"""
+        if self._change_seq is not None and self._clock() < self._next_check:
+            return
+        with self._sync_lock:
+            now = self._clock()
+            if self._change_seq is not None and now < self._next_check:
+                return  # Başka bir thread az önce okudu
+            conn = self._connection()
+            # data_version başka bağlantılar commit ettiğinde değişir; değişmediyse günlük de aynıdır
+            data_version = conn.execute('PRAGMA data_version').fetchone()[0]
+            if data_version == self._data_version and self._change_seq is not None:
+                self._next_check = now + self.check_interval
+                return
+            self._data_version = data_version
+            if self._change_seq is None:
+                # İlk okuma: önbellek boşken başlangıç sırası alınır
+                row = conn.execute(
+                    "SELECT seq FROM sqlite_sequence WHERE name = 'event_group_changes'"
+                ).fetchone()
+                self._change_seq = row[0] if row else 0
+            else:
+                changes = conn.execute(
+                    'SELECT seq, group_id FROM event_group_changes WHERE seq > ? ORDER BY seq',
+                    (self._change_seq,)
+                ).fetchall()
+                if changes and changes[0][0] != self._change_seq + 1:
+                    # Günlük budanmış; hangi grupların değiştiği bilinemez
+                    self.clear()
+                    with self._lock:
+                        self._resets += 1
+                    logger.info("Aktif etkinlik önbelleği sıfırlandı (değişiklik günlüğü budanmış)")
+                else:
+                    for _seq, group_id in changes:
+                        self.invalidate(group_id)
+                if changes:
+                    self._change_seq = changes[-1][0]
+            self._next_check = now + self.check_interval
+
+    def close(self):
+        """Günlük okuma bağlantısını kapatır"""
+        with self._sync_lock:
+            if self._conn is not None and self._conn_pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+    def stats(self):
+        """Önbellek istatistiklerini döndürür"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'mode': self.mode,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'check_interval': self.check_interval,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 3) if lookups else 0.0,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations,
+                'resets': self._resets
+            }
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🛠️ BiP Bot - Veritabanı Bakım Komutları
+Sayaç tablolarını ham veriden doğrular ve onarır
+
+Kullanım:
+python maintenance.py rebuild-stats [--event-id ID] [--check-only]
+
+Yazar: BiP Bot Development Team
+Versiyon: 2.0.0
+"""
+
+import argparse
+import sys
+from database import db
+
+
+def rebuild_stats(args):
+    """Sayaçları yeniden hesaplar ve farkları raporlar"""
+    report = db.rebuild_stats(event_id=args.event_id, fix=not args.check_only)
+    print(f"Kontrol edilen etkinlik: {report['events_checked']}")
+    if not report['drift']:
+        print("Sayaçlar tutarlı, fark bulunmadı.")
+        return 0
+    
+    print(f"Fark bulunan kayıt: {len(report['drift'])}")
+    for item in report['drift']:
+        key = {k: v for k, v in item.items() if k not in ('table', 'field', 'stored', 'expected')}
+        print(f"- {item['table']} {key} {item['field']}: kayıtlı={item['stored']} beklenen={item['expected']}")
+    print("Sayaçlar düzeltildi." if report['fixed'] else "Sadece kontrol yapıldı, düzeltme yapılmadı.")
+    return 1 if args.check_only else 0
+
+
+def main():
+    """Ana fonksiyon"""
+    parser = argparse.ArgumentParser(description='BiP Bot veritabanı bakım komutları')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    stats_parser = subparsers.add_parser('rebuild-stats', help='Sayaç tablolarını yeniden hesapla')
+    stats_parser.add_argument('--event-id', type=int, help='Sadece bu etkinliği kontrol et')
+    stats_parser.add_argument('--check-only', action='store_true', help='Farkları raporla, düzeltme')
+    stats_parser.set_defaults(handler=rebuild_stats)
+    
+    args = parser.parse_args()
+    try:
+        return args.handler(args)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
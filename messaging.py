@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📨 BiP Bot - Giden Mesaj Dağıtıcısı
+BiP mesajlarını istek thread'i yerine arka plandaki worker havuzundan gönderir
+
+Özellikler:
+- Süreç içi kuyruk ve yapılandırılabilir worker sayısı
+- Aynı gruba kısa pencere içinde giden mesajlar tek mesajda birleştirilir
+- Grup başına sıra korunur (bir grubun aynı anda tek gönderimi olur)
+- Hata durumunda üstel bekleme ve jitter ile yeniden deneme
+- Takılabilir transport: LogTransport (mock çıktı), StubTransport (testler)
+
+Yazar: BiP Bot Development Team
+Versiyon: 2.0.0
+"""
+
+import os
+import time
+import heapq
+import atexit
+import random
+import itertools
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TransportError(Exception):
+    """Transport mesajı iletemediğinde fırlatılır; retryable=False ise tekrar denenmez"""
+
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class LogTransport:
+    """Mesajları loglayan ve konsola yazan mock BiP transport'u"""
+
+    def send(self, group_id, text):
+        logger.info(f"BiP mesajı gönderildi: {text}")
+        print(f"[MOCK BiP GRUP {group_id}] {text}")
+
+
+class StubTransport:
+    """Gönderilen mesajları bellekte tutan test transport'u; istenirse hata üretir"""
+
+    def __init__(self, failures=0):
+        self.sent = []
+        self.attempts = 0
+        self.failures = failures
+        self._lock = threading.Lock()
+
+    def send(self, group_id, text):
+        with self._lock:
+            self.attempts += 1
+            if self.failures:
+                self.failures -= 1
+                raise TransportError("Stub transport hatası")
+            self.sent.append((group_id, text))
+
+    def messages(self, group_id):
+        """Gruba iletilen mesaj metinleri"""
+        with self._lock:
+            return [text for group, text in self.sent if group == group_id]
+
+
+class _Batch:
+    __slots__ = ('group_id', 'texts', 'attempts', 'created', 'due')
+
+    def __init__(self, group_id, created):
+        self.group_id = group_id
+        self.texts = []
+        self.attempts = 0
+        self.created = created
+        self.due = None  # Heap'teki geçerli kaydın zamanı; None ise heap'te değil
+
+
+class MessageDispatcher:
+    def __init__(self, transport, workers=2, coalesce_window=0.2, max_batch=20, max_retries=3,
+                 backoff_base=0.5, backoff_max=30.0, max_queue=10000, separator='\n\n'):
+        """Dağıtıcıyı hazırlar; worker'lar ilk mesajda başlar"""
+        self.transport = transport
+        self.workers = workers
+        self.coalesce_window = coalesce_window
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_queue = max_queue
+        self.separator = separator
+
+        self._cond = threading.Condition()
+        self._heap = []  # (gönderim zamanı, sıra, batch); batch.due ile eşleşmeyen kayıt eskidir
+        self._seq = itertools.count()
+        self._open = {}  # group_id -> mesaj eklenebilen batch
+        self._busy = {}  # group_id -> gönderimi veya yeniden denemesi süren batch
+        self._waiting = {}  # group_id -> grup meşgulken sırası gelen batch'ler
+        self._queued = 0  # Henüz iletilmemiş mesaj sayısı
+        self._threads = []
+        self._closed = False
+        self._pid = os.getpid()
+
+        # İstatistikler
+        self._accepted = 0
+        self._rejected = 0
+        self._delivered = 0
+        self._batches = 0
+        self._retries = 0
+        self._failed = 0
+        self._max_depth = 0
+        self._total_latency = 0.0
+
+        atexit.register(self.close)
+
+    def after_fork(self):
+        """Fork sonrası çocuk süreçte kuyruğu ve kilidi yeniler; worker'lar ilk mesajda başlar"""
+        if self._pid == os.getpid():
+            return
+        # Ebeveynin kuyruğu ebeveyn tarafından gönderilir
+        self._cond = threading.Condition()
+        self._heap = []
+        self._open = {}
+        self._busy = {}
+        self._waiting = {}
+        self._queued = 0
+        self._threads = []
+        self._pid = os.getpid()
+
+    def _ensure_started(self):
+        """Worker thread'lerini gerekirse başlatır (_cond tutulurken)"""
+        self._threads = [t for t in self._threads if t.is_alive()]
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._run, name=f'bip-sender-{len(self._threads)}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _schedule(self, batch, due):
+        """Batch'i due zamanında gönderilmek üzere heap'e koyar (_cond tutulurken)"""
+        batch.due = due
+        heapq.heappush(self._heap, (due, next(self._seq), batch))
+        self._cond.notify()
+
+    def send(self, group_id, text):
+        """Mesajı kuyruğa ekler; kuyruk doluysa False döner (istek thread'i hiç beklemez)"""
+        self.after_fork()
+        with self._cond:
+            if self._closed or self._queued >= self.max_queue:
+                self._rejected += 1
+                logger.warning(f"Giden mesaj kuyruğu dolu, mesaj atıldı (Grup: {group_id})")
+                return False
+            self._ensure_started()
+            now = time.monotonic()
+            batch = self._open.get(group_id)
+            if batch is None:
+                batch = _Batch(group_id, now)
+                self._open[group_id] = batch
+                self._schedule(batch, now + self.coalesce_window)
+            batch.texts.append(text)
+            if len(batch.texts) >= self.max_batch:
+                # Dolu batch'e yeni mesaj eklenmez; pencere beklenmeden gönderilir
+                del self._open[group_id]
+                if batch.due is not None:
+                    self._schedule(batch, now)
+            self._queued += 1
+            self._accepted += 1
+            self._max_depth = max(self._max_depth, self._queued)
+            return True
+
+    def _next_batch(self):
+        """Gönderim zamanı gelmiş batch'i bekler; kapanışta None"""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self._heap and self._heap[0][0] <= now:
+                    due, _seq, batch = heapq.heappop(self._heap)
+                    if batch.due != due:
+                        continue  # Yeniden planlanmış batch'in eski kaydı
+                    batch.due = None
+                    owner = self._busy.get(batch.group_id)
+                    if owner is not None and owner is not batch:
+                        # Grubun önceki gönderimi sürüyor; sıra korunur
+                        self._waiting.setdefault(batch.group_id, []).append(batch)
+                        continue
+                    if self._open.get(batch.group_id) is batch:
+                        del self._open[batch.group_id]
+                    self._busy[batch.group_id] = batch
+                    return batch
+                if self._closed and not self._heap and not self._busy:
+                    return None
+                timeout = self._heap[0][0] - now if self._heap else None
+                self._cond.wait(timeout)
+
+    def _finish(self, batch):
+        """Batch'in işi bitti; grubun bekleyen batch'leri sıraya alınır (_cond tutulurken)"""
+        del self._busy[batch.group_id]
+        batch.texts = []
+        now = time.monotonic()
+        for waiting in self._waiting.pop(batch.group_id, []):
+            self._schedule(waiting, now)
+        self._cond.notify_all()
+
+    def _deliver(self, batch):
+        """Batch'i tek mesaj olarak gönderir; hatada yeniden planlar veya atar"""
+        texts = list(batch.texts)
+        try:
+            self.transport.send(batch.group_id, self.separator.join(texts))
+        except Exception as e:
+            retryable = getattr(e, 'retryable', True)
+            with self._cond:
+                if retryable and batch.attempts < self.max_retries:
+                    batch.attempts += 1
+                    self._retries += 1
+                    # Full jitter: aynı anda düşen gönderimler aynı anda tekrar denenmez
+                    delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** batch.attempts))
+                    self._schedule(batch, time.monotonic() + delay)
+                    logger.warning(f"BiP mesajı gönderilemedi, {delay:.2f} sn sonra tekrar denenecek "
+                                   f"(Grup: {batch.group_id}): {str(e)}")
+                    return
+                self._failed += len(texts)
+                self._queued -= len(texts)
+                self._finish(batch)
+            logger.error(f"BiP mesajı gönderilemedi, {len(texts)} mesaj atıldı (Grup: {batch.group_id}): {str(e)}")
+            return
+        with self._cond:
+            self._delivered += len(texts)
+            self._batches += 1
+            self._queued -= len(texts)
+            self._total_latency += time.monotonic() - batch.created
+            self._finish(batch)
+
+    def _run(self):
+        """Worker döngüsü"""
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._deliver(batch)
+
+    def flush(self, timeout=None):
+        """Kuyruktaki tüm mesajlar iletilene (veya atılana) kadar bekler; başarılıysa True"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            # Birleştirme penceresi beklenmeden gönderilsin (yeniden deneme beklemeleri korunur)
+            now = time.monotonic()
+            entries = [(due, seq, batch) for due, seq, batch in self._heap if batch.due == due]
+            self._heap = []
+            for due, seq, batch in entries:
+                if not batch.attempts:
+                    due = batch.due = min(due, now)
+                self._heap.append((due, seq, batch))
+            heapq.heapify(self._heap)
+            self._open = {}
+            self._cond.notify_all()
+            while self._queued > 0:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout=10.0):
+        """Yeni mesajları reddeder, kuyruğu boşaltır ve worker'ları durdurur"""
+        if self._closed or self._pid != os.getpid():
+            return
+        if not self.flush(timeout):
+            logger.warning(f"Giden mesaj kuyruğu {timeout} saniyede boşaltılamadı ({self._queued} mesaj)")
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def stats(self):
+        """Kuyruk ve gönderim istatistiklerini döndürür"""
+        with self._cond:
+            return {
+                'workers': self.workers,
+                'queued': self._queued,
+                'max_depth': self._max_depth,
+                'capacity': self.max_queue,
+                'coalesce_window_ms': round(self.coalesce_window * 1000, 3),
+                'accepted': self._accepted,
+                'rejected': self._rejected,
+                'delivered': self._delivered,
+                'batches': self._batches,
+                'coalesced': self._delivered - self._batches,
+                'retries': self._retries,
+                'failed': self._failed,
+                'avg_latency_ms': round(self._total_latency / self._batches * 1000, 3) if self._batches else 0.0
+            }
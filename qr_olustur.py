@@ -10,18 +10,33 @@ BiP Bot davet linki için QR kod oluşturur
 - Environment variable desteği
 - Unicode karakter desteği
 - Hata yönetimi ve loglama
+- Toplu mod: veritabanındaki veya dosyadaki etkinlikler için süreç havuzunda paralel üretim
+- Toplu çıktı: parçalı (shard) dizin veya tek zip/tar arşivi; değişmeyen kodlar atlanır
 
 Kullanım:
 python qr_olustur.py
+python qr_olustur.py --batch --output qr_kodlari
+python qr_olustur.py --batch --ids-file etkinlikler.txt --archive qr_kodlari.zip --format svg
 
 Yazar: BiP Bot Development Team
 Versiyon: 2.0.0
 """
 
 import qrcode
+import io
 import os
 import sys
+import json
+import time
+import hashlib
+import zipfile
+import tarfile
+import argparse
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from importlib import metadata
 
 def create_qr_code(url, filename="invite.png"):
     """
@@ -64,10 +79,232 @@ def create_qr_code(url, filename="invite.png"):
         print(f"QR kod olusturma hatasi: {str(e)}")
         return False
 
+# Toplu modda çıktıyla birlikte yazılan ve değişmeyen kodları belirleyen dosya
+MANIFEST_NAME = 'manifest.json'
+
+
+def read_event_ids_from_file(path):
+    """Satır başına bir etkinlik ID'si okur (boş satırlar ve # yorumları atlanır)"""
+    event_ids = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            try:
+                event_ids.append(int(line))
+            except ValueError:
+                raise ValueError(f"{path}:{line_number}: gecersiz etkinlik ID'si: {line}")
+    return list(dict.fromkeys(event_ids))
+
+
+def read_event_ids_from_db(status='active', group_id=None):
+    """Veritabanındaki etkinlik ID'lerini okur (status='all' tüm durumlar)"""
+    # Geç içe aktarma: havuz süreçleri (spawn) bu modülü yüklerken veritabanı açılmasın
+    from database import db
+    try:
+        return [row['event_id'] for row in db.iter_events(group_id=group_id,
+                                                          status=None if status == 'all' else status)]
+    finally:
+        db.close()
+
+
+def entry_name(event_id, fmt):
+    """Parçalı yol: 256 alt dizine dağıtılır (tek dizinde binlerce dosya olmasın)"""
+    return f"{event_id % 256:02x}/event_{event_id}.{fmt}"
+
+
+def qrcode_version():
+    """Kurulu qrcode sürümü (sürüm değişirse kodlar yeniden üretilir)"""
+    try:
+        return metadata.version('qrcode')
+    except metadata.PackageNotFoundError:
+        return ''
+
+
+def content_hash(url, fmt, size, library):
+    """QR çıktısını belirleyen girdilerin hash'i; aynıysa kod yeniden üretilmez"""
+    return hashlib.sha256(f"{url}|{fmt}|{size}|qrcode {library}".encode('utf-8')).hexdigest()
+
+
+def render_job(job):
+    """Havuz süreçlerinde çalışır: (isim, url, format, boyut) -> (isim, baytlar)"""
+    from qr_service import render_qr
+    name, url, fmt, size = job
+    return name, render_qr(url, fmt, size)
+
+
+class DirectoryOutput:
+    def __init__(self, path):
+        """Kodları path altında parçalı dizinlere yazar"""
+        self.path = path
+        manifest_path = os.path.join(path, MANIFEST_NAME)
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                self.previous = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.previous = {}
+        self.manifest = {}
+
+    def is_current(self, name, digest):
+        return self.previous.get(name) == digest and os.path.exists(os.path.join(self.path, name))
+
+    def keep(self, name, digest):
+        self.manifest[name] = digest
+
+    def write(self, name, digest, body):
+        target = os.path.join(self.path, name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(body)
+        self.manifest[name] = digest
+
+    def close(self):
+        """Manifest'i atomik olarak yazar (yarıda kesilen koşu bir sonrakinde tamamlanır)"""
+        # Bu koşuda listelenmeyen eski kayıtlar manifest'te kalır; dosyaları silinmez
+        manifest = dict(self.previous, **self.manifest)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, os.path.join(self.path, MANIFEST_NAME))
+
+
+class ArchiveOutput:
+    def __init__(self, path):
+        """Kodları tek zip veya tar(.gz) arşivine yazar; var olan arşivdeki değişmeyen kodlar kopyalanır"""
+        self.path = path
+        self.is_zip = path.endswith('.zip')
+        self.previous = {}
+        self._old = None
+        if os.path.exists(path):
+            self._old = zipfile.ZipFile(path) if self.is_zip else tarfile.open(path)
+            try:
+                self.previous = json.loads(self._read_old(MANIFEST_NAME))
+            except (KeyError, ValueError):
+                self.previous = {}
+        self.manifest = {}
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, self._tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        os.close(fd)
+        if self.is_zip:
+            self._archive = zipfile.ZipFile(self._tmp_path, 'w')
+        else:
+            self._archive = tarfile.open(self._tmp_path, 'w:gz' if path.endswith(('.tar.gz', '.tgz')) else 'w')
+
+    def _read_old(self, name):
+        if self.is_zip:
+            return self._old.read(name)
+        member = self._old.extractfile(name)
+        if member is None:
+            raise KeyError(name)
+        return member.read()
+
+    def _add(self, name, body):
+        if self.is_zip:
+            # PNG zaten sıkıştırılmış; SVG metin olduğu için sıkıştırılır
+            compression = zipfile.ZIP_DEFLATED if name.endswith('.svg') or name == MANIFEST_NAME else zipfile.ZIP_STORED
+            self._archive.writestr(name, body, compress_type=compression)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = len(body)
+            info.mtime = int(time.time())
+            self._archive.addfile(info, fileobj=io.BytesIO(body))
+
+    def is_current(self, name, digest):
+        return self._old is not None and self.previous.get(name) == digest
+
+    def keep(self, name, digest):
+        self._add(name, self._read_old(name))
+        self.manifest[name] = digest
+
+    def write(self, name, digest, body):
+        self._add(name, body)
+        self.manifest[name] = digest
+
+    def close(self):
+        """Manifest'i ekler ve yeni arşivi eskisinin yerine koyar"""
+        self._add(MANIFEST_NAME, json.dumps(self.manifest, indent=2, sort_keys=True).encode('utf-8'))
+        self._archive.close()
+        if self._old is not None:
+            self._old.close()
+        os.replace(self._tmp_path, self.path)
+
+
+def run_batch(event_ids, output, base_url, fmt='png', size=10, workers=None, chunksize=64):
+    """Etkinlik QR kodlarını paralel üretir; (üretilen, atlanan, saniye) döndürür"""
+    started = time.perf_counter()
+    library = qrcode_version()
+    jobs = []
+    digests = {}
+    skipped = 0
+    for event_id in event_ids:
+        url = f"{base_url}/join/{event_id}"
+        name = entry_name(event_id, fmt)
+        digest = digests[name] = content_hash(url, fmt, size, library)
+        if output.is_current(name, digest):
+            output.keep(name, digest)
+            skipped += 1
+        else:
+            jobs.append((name, url, fmt, size))
+
+    rendered = 0
+    if jobs:
+        workers = workers or os.cpu_count() or 1
+        # spawn: ebeveyndeki thread'ler/kilitler (veritabanı, loglama) çocuklara kopyalanmaz
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=context) as pool:
+            for name, body in pool.map(render_job, jobs, chunksize=chunksize):
+                output.write(name, digests[name], body)
+                rendered += 1
+    output.close()
+    return rendered, skipped, time.perf_counter() - started
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='BiP Bot QR kod olusturucu')
+    parser.add_argument('--batch', action='store_true', help='Etkinlikler icin toplu QR uretimi')
+    parser.add_argument('--ids-file', help='Satir basina bir etkinlik ID (verilmezse veritabanindan)')
+    parser.add_argument('--status', default='active', help="Veritabanindan okunacak durum ('all': tumu)")
+    parser.add_argument('--group-id', help='Sadece bu grubun etkinlikleri')
+    parser.add_argument('--output', default='qr_kodlari', help='Parcali cikti dizini')
+    parser.add_argument('--archive', help='Dizin yerine zip/tar(.gz) arsivi')
+    parser.add_argument('--format', choices=['png', 'svg'], default='png')
+    parser.add_argument('--size', type=int, default=10, help='QR karesi basina piksel')
+    parser.add_argument('--workers', type=int, default=None, help='Surec sayisi (varsayilan: cekirdek sayisi)')
+    return parser.parse_args(argv)
+
+
+def main_batch(args, base_url):
+    """Toplu modu çalıştırır ve hızı raporlar"""
+    if args.ids_file:
+        event_ids = read_event_ids_from_file(args.ids_file)
+    else:
+        event_ids = read_event_ids_from_db(args.status, args.group_id)
+    if not event_ids:
+        print("QR kod uretilecek etkinlik yok.")
+        return
+
+    if args.archive:
+        output = ArchiveOutput(args.archive)
+    else:
+        os.makedirs(args.output, exist_ok=True)
+        output = DirectoryOutput(args.output)
+    rendered, skipped, elapsed = run_batch(event_ids, output, base_url, args.format, args.size, args.workers)
+
+    print(f"Etkinlik: {len(event_ids)}  uretilen: {rendered}  degismedigi icin atlanan: {skipped}")
+    print(f"Sure: {elapsed:.2f} sn  hiz: {rendered / elapsed if elapsed else 0:.0f} kod/sn "
+          f"({len(event_ids) / elapsed if elapsed else 0:.0f} etkinlik/sn)")
+    print(f"Cikti: {args.archive or args.output}")
+
+
 def main():
     """Ana fonksiyon"""
+    args = parse_args()
     # URL'yi belirle (environment variable'dan al veya varsayılan kullan)
-    base_url = os.environ.get('BIP_BOT_URL', 'http://localhost:5000')
+    base_url = os.environ.get('BIP_BOT_URL', 'http://localhost:5000').rstrip('/')
+    if args.batch:
+        main_batch(args, base_url)
+        return
     invite_url = f"{base_url}/invite"
     
     # QR kod oluştur
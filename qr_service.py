@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🔳 BiP Bot - Etkinlik QR Kod Servisi
+Etkinlik katılım linkinin QR kodunu istek anında üretir ve önbellekte tutar
+
+Özellikler:
+- PNG veya SVG çıktı, modül başına piksel (boyut) seçimi
+- Boyutu (kayıt ve bayt) sınırlı LRU önbellek
+- İsteğe bağlı disk önbelleği (worker'lar ve yeniden başlatmalar arasında paylaşılır)
+- Tek uçuş (single-flight): aynı QR için eşzamanlı istekler tek render'ı bekler
+- Hit/miss/render/bekleme sayaçları
+
+Yazar: BiP Bot Development Team
+Versiyon: 2.0.0
+"""
+
+import io
+import os
+import hashlib
+import tempfile
+import threading
+import logging
+from collections import OrderedDict
+
+import qrcode
+import qrcode.image.svg
+
+logger = logging.getLogger(__name__)
+
+# Desteklenen formatlar ve içerik türleri
+QR_FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml'}
+# Modül (kare) başına piksel sınırları; varsayılan qr_olustur.py ile aynı
+QR_MIN_SIZE = 1
+QR_MAX_SIZE = 40
+QR_DEFAULT_SIZE = 10
+
+
+def render_qr(data, fmt='png', box_size=QR_DEFAULT_SIZE, border=4):
+    """Metnin QR kodunu PNG veya SVG baytları olarak üretir"""
+    qr = qrcode.QRCode(
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=box_size,
+        border=border,
+        image_factory=qrcode.image.svg.SvgPathImage if fmt == 'svg' else None
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white") if fmt == 'png' else qr.make_image()
+    buffer = io.BytesIO()
+    img.save(buffer)
+    return buffer.getvalue()
+
+
+class _Flight:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class QrCodeCache:
+    def __init__(self, max_entries=512, max_bytes=16 * 1024 * 1024, disk_dir=None, renderer=render_qr):
+        """Render edilmiş QR görüntüleri için LRU önbellek; disk_dir verilirse diske de yazar"""
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.renderer = renderer
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (data, fmt, box_size) -> (baytlar, etag)
+        self._bytes = 0
+        self._flights = {}  # Render'ı süren anahtarlar
+        self._pid = os.getpid()
+
+        self._hits = 0
+        self._misses = 0
+        self._renders = 0
+        self._disk_hits = 0
+        self._waits = 0
+        self._evictions = 0
+        self._errors = 0
+
+    def after_fork(self):
+        """Fork sonrası kilidi yeniler; ebeveyndeki yarım render'lar çocukta yoktur"""
+        if self._pid == os.getpid():
+            return
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._pid = os.getpid()
+
+    def get(self, data, fmt='png', box_size=QR_DEFAULT_SIZE):
+        """QR görüntüsünü (baytlar, etag) olarak döndürür; gerekirse bir kez render eder"""
+        self.after_fork()
+        key = (data, fmt, box_size)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry
+            self._misses += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self._waits += 1
+
+        if not leader:
+            # Aynı QR zaten render ediliyor; sonucu beklenir
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            entry = self._load(key)
+            with self._lock:
+                self._store(key, entry)
+            flight.result = entry
+            return entry
+        except Exception as e:
+            with self._lock:
+                self._errors += 1
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _disk_path(self, key):
+        data, fmt, box_size = key
+        digest = hashlib.sha256(f"{data}|{box_size}".encode('utf-8')).hexdigest()[:32]
+        return os.path.join(self.disk_dir, f"{digest}.{fmt}")
+
+    def _load(self, key):
+        """Diskten okur, yoksa render eder (kilit tutulmadan)"""
+        path = self._disk_path(key) if self.disk_dir else None
+        if path:
+            try:
+                with open(path, 'rb') as f:
+                    body = f.read()
+                with self._lock:
+                    self._disk_hits += 1
+                return body, hashlib.sha1(body).hexdigest()[:16]
+            except FileNotFoundError:
+                pass
+        body = self.renderer(*key)
+        with self._lock:
+            self._renders += 1
+        if path:
+            self._persist(path, body)
+        return body, hashlib.sha1(body).hexdigest()[:16]
+
+    def _persist(self, path, body):
+        """Dosyayı atomik olarak yazar; hata QR sunumunu engellemez"""
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"QR kod diske yazılamadı ({path}): {str(e)}")
+
+    def _store(self, key, entry):
+        """Kaydı ekler ve sınırlar aşılırsa en eskileri atar (_lock tutulurken)"""
+        if len(entry[0]) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous[0])
+        self._entries[key] = entry
+        self._bytes += len(entry[0])
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _key, (body, _etag) = self._entries.popitem(last=False)
+            self._bytes -= len(body)
+            self._evictions += 1
+
+    def stats(self):
+        """Önbellek istatistiklerini döndürür"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'disk': bool(self.disk_dir),
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 3) if lookups else 0.0,
+                'renders': self._renders,
+                'disk_hits': self._disk_hits,
+                'waits': self._waits,
+                'evictions': self._evictions,
+                'errors': self._errors
+            }
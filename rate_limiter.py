@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🚦 BiP Bot - Hız Sınırlayıcı
+Kullanıcı ve grup başına token bucket ile komut hızını sınırlar
+
+Özellikler:
+- Kullanıcı ve grup için ayrı kovalar; istek ikisinden de token alabiliyorsa geçer
+- Okuma ve yazma komutları için ayrı yapılandırılabilir limitler (saniyede token, kapasite)
+- Bellek backend'i: zaman dilimli nesil değişimiyle sınırlı bellek (dolmuş kovalar atılır)
+- SQLite backend'i: limitler tüm worker süreçlerinde ortak uygulanır
+- Kalan bekleme süresi (retry_after) ve izin/red sayaçları
+
+Yazar: BiP Bot Development Team
+Versiyon: 2.0.0
+"""
+
+import time
+import threading
+import logging
+from collections import namedtuple
+
+from connection_pool import ConnectionPool
+
+logger = logging.getLogger(__name__)
+
+# rate: saniyede eklenen token, burst: kova kapasitesi (art arda izin verilen istek)
+RateLimit = namedtuple('RateLimit', ['rate', 'burst'])
+Decision = namedtuple('Decision', ['allowed', 'retry_after'])
+
+RATE_CLASSES = ('read', 'write')
+DEFAULT_LIMITS = {
+    ('user', 'read'): RateLimit(1.0, 10),
+    ('user', 'write'): RateLimit(0.5, 3),
+    ('group', 'read'): RateLimit(5.0, 60),
+    # 200 kişilik bir grubun duyuru sonrası aynı anda oy vermesi tek burst'e sığar
+    ('group', 'write'): RateLimit(10.0, 250)
+}
+
+
+def parse_limit(text):
+    """'0.5:3' biçimindeki limiti RateLimit'e çevirir"""
+    rate, burst = text.split(':')
+    limit = RateLimit(float(rate), float(burst))
+    if limit.rate <= 0 or limit.burst < 1:
+        raise ValueError(f"Geçersiz hız limiti: {text}")
+    return limit
+
+
+def _take(requests, states, now, window):
+    """Tüm kovalardan birer token almayı dener; (karar, yeni durumlar) döndürür
+
+    states[i] (tokens, updated) veya None'dır; window'dan eski durum dolmuş kova sayılır.
+    """
+    levels = []
+    retry_after = 0.0
+    for (key, limit), state in zip(requests, states):
+        if state is None or now - state[1] >= window:
+            tokens = limit.burst
+        else:
+            tokens = min(limit.burst, state[0] + (now - state[1]) * limit.rate)
+        if tokens < 1:
+            retry_after = max(retry_after, (1 - tokens) / limit.rate)
+        levels.append(tokens)
+    if retry_after:
+        return Decision(False, retry_after), None
+    return Decision(True, 0.0), [(key, tokens - 1, now) for (key, _), tokens in zip(requests, levels)]
+
+
+class MemoryBackend:
+    def __init__(self, window, max_keys=100000, clock=time.monotonic):
+        """Süreç içi kovalar; window boyunca dokunulmayan kova dolmuş sayılır ve atılır"""
+        self.window = window
+        self.max_keys = max_keys
+        self._clock = clock
+        self._lock = threading.Lock()
+        # İki nesil: son window içinde dokunulan kovalar current'ta, bir önceki nesil previous'ta
+        self._current = {}
+        self._previous = {}
+        self._rotated_at = clock()
+        self._rotations = 0
+
+    def _rotate(self, now):
+        """Nesil süresi dolduysa veya kova sayısı sınırı aştıysa eski nesli atar"""
+        if now - self._rotated_at >= self.window or len(self._current) >= self.max_keys:
+            self._previous = self._current
+            self._current = {}
+            self._rotated_at = now
+            self._rotations += 1
+
+    def acquire(self, requests):
+        """İstenen kovaların hepsinden token alır veya hiçbirinden almaz"""
+        with self._lock:
+            now = self._clock()
+            self._rotate(now)
+            states = []
+            for key, _limit in requests:
+                state = self._current.get(key)
+                if state is None:
+                    state = self._previous.pop(key, None)
+                states.append(state)
+            decision, updates = _take(requests, states, now, self.window)
+            if updates:
+                for key, tokens, updated in updates:
+                    self._current[key] = (tokens, updated)
+            else:
+                # Reddedilen kovalar da bu nesilde tutulur; atılırlarsa dolu sayılırlardı
+                for (key, _limit), state in zip(requests, states):
+                    if state is not None:
+                        self._current[key] = state
+            return decision
+
+    def after_fork(self):
+        """Fork sonrası çocuk süreçte kilidi yeniler"""
+        self._lock = threading.Lock()
+
+    def stats(self):
+        """Bellekteki kova sayısını döndürür"""
+        with self._lock:
+            return {
+                'backend': 'memory',
+                'keys': len(self._current) + len(self._previous),
+                'max_keys': self.max_keys,
+                'rotations': self._rotations
+            }
+
+    def close(self):
+        pass
+
+
+class SQLiteBackend:
+    def __init__(self, db_path, window, pool_size=4, prune_interval=None, clock=time.time):
+        """Worker'lar arasında ortak kovalar; ayrı bir SQLite dosyasında tutulur"""
+        self.db_path = db_path
+        self.window = window
+        self.prune_interval = window if prune_interval is None else prune_interval
+        self._clock = clock
+        # Limit durumu kaybı sorun değil: senkronizasyon kapalı, WAL ile okuyucular beklemez
+        self.pool = ConnectionPool(db_path, size=pool_size, pragmas={
+            'journal_mode': 'WAL', 'synchronous': 'OFF', 'busy_timeout': 5000
+        })
+        self._next_prune = 0.0
+        self._pruned = 0
+        with self.pool.connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS rate_buckets (
+                    key TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated REAL NOT NULL
+                ) WITHOUT ROWID
+            ''')
+            conn.commit()
+
+    def acquire(self, requests):
+        """Kovaları tek yazma işleminde okuyup günceller"""
+        keys = [key for key, _limit in requests]
+        with self.pool.connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                now = self._clock()
+                rows = conn.execute(
+                    f"SELECT key, tokens, updated FROM rate_buckets WHERE key IN ({','.join('?' * len(keys))})",
+                    keys
+                ).fetchall()
+                found = {key: (tokens, updated) for key, tokens, updated in rows}
+                decision, updates = _take(requests, [found.get(key) for key in keys], now, self.window)
+                if updates:
+                    conn.executemany('''
+                        INSERT INTO rate_buckets (key, tokens, updated) VALUES (?, ?, ?)
+                        ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated
+                    ''', updates)
+                if now >= self._next_prune:
+                    # window'dan eski kovalar dolmuş sayılır; tablo sınırlı kalır
+                    self._next_prune = now + self.prune_interval
+                    cursor = conn.execute('DELETE FROM rate_buckets WHERE updated < ?', (now - self.window,))
+                    self._pruned += cursor.rowcount
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+        return decision
+
+    def after_fork(self):
+        """Fork sonrası çocuk süreçte bağlantı havuzunu yeniler"""
+        self.pool.after_fork()
+
+    def stats(self):
+        """Tablodaki kova sayısını döndürür"""
+        with self.pool.connection() as conn:
+            keys = conn.execute('SELECT COUNT(*) FROM rate_buckets').fetchone()[0]
+        return {'backend': 'sqlite', 'keys': keys, 'pruned': self._pruned}
+
+    def close(self):
+        self.pool.close()
+
+
+class RateLimiter:
+    def __init__(self, limits=None, backend='memory', db_path=None, max_keys=100000,
+                 enabled=True, clock=None):
+        """Limitleri ve backend'i hazırlar; backend 'memory' veya 'sqlite'"""
+        self.limits = dict(DEFAULT_LIMITS)
+        self.limits.update(limits or {})
+        self.enabled = enabled
+        # En yavaş dolan kovanın tamamen dolma süresi; bundan uzun dokunulmayan kova dolu sayılır
+        self.window = max(limit.burst / limit.rate for limit in self.limits.values())
+        if backend == 'memory':
+            self.backend = MemoryBackend(self.window, max_keys=max_keys, clock=clock or time.monotonic)
+        elif backend == 'sqlite':
+            if not db_path:
+                raise ValueError("SQLite backend'i için db_path gerekli")
+            self.backend = SQLiteBackend(db_path, self.window, clock=clock or time.time)
+        else:
+            raise ValueError(f"Bilinmeyen hız sınırlayıcı backend'i: {backend}")
+        self._lock = threading.Lock()
+        self._allowed = 0
+        self._denied = 0
+
+    def check(self, user_id, group_id=None, rate_class='write'):
+        """Kullanıcı (ve grup) kovasından token alır; Decision(allowed, retry_after) döndürür"""
+        if not self.enabled:
+            return Decision(True, 0.0)
+        requests = [(f'user:{rate_class}:{user_id}', self.limits[('user', rate_class)])]
+        if group_id:
+            requests.append((f'group:{rate_class}:{group_id}', self.limits[('group', rate_class)]))
+        decision = self.backend.acquire(requests)
+        with self._lock:
+            if decision.allowed:
+                self._allowed += 1
+            else:
+                self._denied += 1
+        return decision
+
+    def after_fork(self):
+        """Fork sonrası çocuk süreçte çağrılır (gunicorn post_fork)"""
+        self._lock = threading.Lock()
+        self.backend.after_fork()
+
+    def stats(self):
+        """İzin/red sayaçlarını ve backend istatistiklerini döndürür"""
+        with self._lock:
+            counters = {'enabled': self.enabled, 'allowed': self._allowed, 'denied': self._denied}
+        counters['limits'] = {f'{scope}_{rate_class}': f'{limit.rate:g}:{limit.burst:g}'
+                              for (scope, rate_class), limit in self.limits.items()}
+        counters.update(self.backend.stats())
+        return counters
+
+    def close(self):
+        """Backend kaynaklarını bırakır"""
+        self.backend.close()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏰ BiP Bot - Hatırlatıcı Zamanlayıcısı
+Hatırlatıcı başına Timer thread'i yerine kalıcı tablo ve tek dispatcher thread
+
+Özellikler:
+- Hatırlatıcılar reminders tablosunda saklanır; yeniden başlatmada kaybolmaz
+- Min-heap ile sıralı tek dispatcher thread; sadece yakın vadeli kayıtlar bellekte tutulur
+- Gönderimden önce veritabanında sahiplenme (aynı hatırlatıcı iki kez gönderilmez)
+- Slot kapanınca bekleyen hatırlatıcılar iptal edilir
+- Çok geç kalan hatırlatıcılar gönderilmez (expired)
+- Testler için elle ilerletilen saat (ManualClock) ve run_pending()
+
+Yazar: BiP Bot Development Team
+Versiyon: 2.0.0
+"""
+
+import os
+import time
+import heapq
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ManualClock:
+    """Testler için elle ilerletilen saat"""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class ReminderScheduler:
+    def __init__(self, db, send, clock=time.time, horizon=300.0, max_lateness=6 * 3600):
+        """Zamanlayıcıyı hazırlar; send(group_id, message) hatırlatıcıyı gönderir
+
+        horizon: veritabanından bu kadar saniye ilerisine kadar vadesi gelenler heap'e alınır.
+        max_lateness: vadesinden bu kadar saniye sonra hâlâ gönderilmemiş hatırlatıcı atılır.
+        """
+        self.db = db
+        self.send = send
+        self.horizon = horizon
+        self.max_lateness = max_lateness
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._heap = []  # (due_at, reminder_id)
+        self._queued = set()
+        self._next_sync = float('-inf')
+        self._thread = None
+        self._stopped = False
+        self._pid = os.getpid()
+
+        # İstatistikler
+        self._scheduled = 0
+        self._sent = 0
+        self._failed = 0
+        self._skipped = 0
+        self._expired = 0
+        self._syncs = 0
+
+    def schedule(self, event_id, group_id, message, due_at, slot_id=None):
+        """Hatırlatıcıyı kaydeder; yakın vadeliyse hemen heap'e alır"""
+        reminder_id = self.db.create_reminder(event_id, group_id, message, due_at, slot_id)
+        with self._cond:
+            self._scheduled += 1
+            if due_at <= self._clock() + self.horizon:
+                self._push(due_at, reminder_id)
+                self._cond.notify()
+        logger.info(f"Hatırlatıcı kuruldu: {reminder_id} (Etkinlik: {event_id})")
+        return reminder_id
+
+    def schedule_in(self, delay, event_id, group_id, message, slot_id=None):
+        """delay saniye sonrası için hatırlatıcı kurar"""
+        return self.schedule(event_id, group_id, message, self._clock() + delay, slot_id)
+
+    def _push(self, due_at, reminder_id):
+        """Heap'e ekler (_cond tutulurken çağrılır)"""
+        if reminder_id not in self._queued:
+            self._queued.add(reminder_id)
+            heapq.heappush(self._heap, (due_at, reminder_id))
+
+    def _sync(self, now):
+        """horizon içinde vadesi gelecek bekleyen hatırlatıcıları veritabanından yükler
+
+        Yeniden başlatmada kaybolanlar ve diğer süreçlerin kurdukları da böylece alınır.
+        """
+        rows = self.db.get_due_reminders(now + self.horizon)
+        with self._cond:
+            for reminder_id, due_at in rows:
+                self._push(due_at, reminder_id)
+            # Her hatırlatıcı vadesinden en az horizon/2 önce bir senkronizasyona denk gelir
+            self._next_sync = now + self.horizon / 2
+            self._syncs += 1
+
+    def run_pending(self):
+        """Vadesi gelen hatırlatıcıları gönderir; gönderilen sayısını döndürür"""
+        now = self._clock()
+        if now >= self._next_sync:
+            self._sync(now)
+        sent = 0
+        while True:
+            with self._cond:
+                if not self._heap or self._heap[0][0] > now:
+                    break
+                due_at, reminder_id = heapq.heappop(self._heap)
+                self._queued.discard(reminder_id)
+            sent += self._fire(reminder_id, due_at, now)
+        return sent
+
+    def _fire(self, reminder_id, due_at, now):
+        """Hatırlatıcıyı sahiplenip gönderir; gönderildiyse 1 döner"""
+        if now - due_at > self.max_lateness:
+            if self.db.set_reminder_status(reminder_id, 'expired'):
+                with self._cond:
+                    self._expired += 1
+                logger.warning(f"Hatırlatıcı süresi geçti, gönderilmedi: {reminder_id}")
+            return 0
+        reminder = self.db.claim_reminder(reminder_id, now)
+        if reminder is None:
+            # İptal edilmiş veya başka bir süreç tarafından gönderilmiş
+            with self._cond:
+                self._skipped += 1
+            return 0
+        try:
+            self.send(reminder['group_id'], reminder['message'])
+        except Exception as e:
+            self.db.set_reminder_status(reminder_id, 'failed', expected='sent')
+            with self._cond:
+                self._failed += 1
+            logger.error(f"Hatırlatıcı gönderilemedi ({reminder_id}): {str(e)}")
+            return 0
+        with self._cond:
+            self._sent += 1
+        return 1
+
+    def after_fork(self):
+        """Fork sonrası çocuk süreçte kilidi ve heap'i yeniler; thread başlatılmaz"""
+        if self._pid == os.getpid():
+            return
+        # Ebeveynin heap'i çocukta geçersiz; ilk turda veritabanından yüklenir
+        self._cond = threading.Condition()
+        self._heap = []
+        self._queued = set()
+        self._next_sync = float('-inf')
+        self._thread = None
+        self._pid = os.getpid()
+
+    def start(self):
+        """Dispatcher thread'ini başlatır (fork sonrası yeniden)"""
+        self.after_fork()
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name='reminder-scheduler', daemon=True)
+            self._thread.start()
+        logger.info("Hatırlatıcı zamanlayıcısı başlatıldı")
+
+    def _run(self):
+        """Dispatcher döngüsü; en yakın vadeye veya sonraki senkronizasyona kadar uyur"""
+        while True:
+            failed = False
+            try:
+                self.run_pending()
+            except Exception as e:
+                failed = True
+                logger.error(f"Hatırlatıcı zamanlayıcı hatası: {str(e)}")
+            with self._cond:
+                if self._stopped:
+                    return
+                now = self._clock()
+                timeout = self._next_sync - now
+                if self._heap:
+                    timeout = min(timeout, self._heap[0][0] - now)
+                if failed:
+                    timeout = max(timeout, 1.0)
+                if timeout > 0:
+                    self._cond.wait(timeout)
+
+    def stop(self, timeout=5.0):
+        """Dispatcher thread'ini durdurur"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and self._pid == os.getpid():
+            thread.join(timeout)
+
+    def stats(self):
+        """Zamanlayıcı istatistiklerini döndürür"""
+        with self._cond:
+            return {
+                'running': self._thread is not None and self._thread.is_alive(),
+                'queued': len(self._heap),
+                'next_due_in': round(self._heap[0][0] - self._clock(), 3) if self._heap else None,
+                'horizon': self.horizon,
+                'scheduled': self._scheduled,
+                'sent': self._sent,
+                'failed': self._failed,
+                'skipped': self._skipped,
+                'expired': self._expired,
+                'syncs': self._syncs
+            }
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+💸 BiP Bot - Masraf Hesaplaşma Motoru
+Ağırlıklı payları hesaplar ve borçları en az sayıda transferle kapatır
+
+Özellikler:
+- Tutarlar kuruş cinsinden tamsayı; paylar en büyük kalan yöntemiyle dağıtılır (toplam kuruşu kuruşuna tutar)
+- Katılımcının ağırlığı son giderindeki weight değeridir; gider girmeyenler 1.0
+- Açgözlü (greedy) min-cash-flow: en büyük borçlu en büyük alacaklıya öder, en fazla n-1 transfer
+- Küçük gruplar için kesin çözüm: sıfır toplamlı alt kümelere bölerek en az transfer (alt küme DP)
+
+Yazar: BiP Bot Development Team
+Versiyon: 2.0.0
+"""
+
+import heapq
+
+# Kesin çözümün denendiği en fazla bakiyesi sıfır olmayan katılımcı sayısı (2^n durum)
+EXACT_SOLVER_LIMIT = 12
+# Ağırlık hassasiyeti (1.5 -> 1500000 birim)
+WEIGHT_SCALE = 10 ** 6
+
+
+def to_cents(amount):
+    """TL tutarını kuruşa çevirir"""
+    return int(round(amount * 100))
+
+
+def to_amount(cents):
+    """Kuruşu TL'ye çevirir"""
+    return cents / 100
+
+
+def compute_shares(total_cents, weights):
+    """Toplamı ağırlıklara göre kuruş cinsinden paylaştırır; paylar toplamı total_cents'e eşittir"""
+    if not weights:
+        return {}
+    # Ağırlıklar milyonda bir hassasiyetle tamsayıya çevrilir; bölme ve kalanlar tamsayı aritmetiği
+    units = {user_id: max(int(round(weight * WEIGHT_SCALE)), 0) for user_id, weight in weights.items()}
+    unit_total = sum(units.values())
+    if unit_total == 0:
+        # Herkes 0 ağırlık verdiyse eşit paylaşım
+        units = dict.fromkeys(weights, 1)
+        unit_total = len(units)
+    shares, remainders = {}, {}
+    for user_id, unit in units.items():
+        shares[user_id], remainders[user_id] = divmod(total_cents * unit, unit_total)
+    # Kalan kuruşlar en büyük kalana sahip olanlara (eşitlikte kullanıcı sırasıyla)
+    remaining = total_cents - sum(shares.values())
+    for user_id in sorted(remainders, key=lambda u: (-remainders[u], u))[:remaining]:
+        shares[user_id] += 1
+    return shares
+
+
+def compute_balances(paid_by_user, weight_by_user, participants):
+    """(paylar, bakiyeler) kuruş cinsinden; bakiye = ödenen - pay (pozitif: alacaklı)"""
+    paid = {user_id: to_cents(amount) for user_id, amount in paid_by_user.items()}
+    users = set(participants) | set(paid)
+    weights = {user_id: weight_by_user.get(user_id, 1.0) for user_id in users}
+    shares = compute_shares(sum(paid.values()), weights)
+    balances = {user_id: paid.get(user_id, 0) - shares[user_id] for user_id in users}
+    return shares, balances
+
+
+def greedy_transfers(balances):
+    """En büyük borçludan en büyük alacaklıya ödeme; (borçlu, alacaklı, kuruş) listesi"""
+    transfers = []
+    debtors = {}
+    creditors = []
+    for user_id, balance in sorted(balances.items()):
+        if balance < 0:
+            debtors.setdefault(-balance, []).append(user_id)
+        elif balance > 0:
+            creditors.append((balance, user_id))
+
+    # Önce birebir eşleşen tutarlar: tek transferle iki kişi birden kapanır
+    unmatched = []
+    for amount, creditor in creditors:
+        matches = debtors.get(amount)
+        if matches:
+            transfers.append((matches.pop(0), creditor, amount))
+        else:
+            unmatched.append((-amount, creditor))
+    debtor_heap = [(-amount, user_id) for amount, users in debtors.items() for user_id in users]
+    heapq.heapify(debtor_heap)
+    creditor_heap = unmatched
+    heapq.heapify(creditor_heap)
+
+    while debtor_heap and creditor_heap:
+        debt, debtor = heapq.heappop(debtor_heap)
+        credit, creditor = heapq.heappop(creditor_heap)
+        amount = min(-debt, -credit)
+        transfers.append((debtor, creditor, amount))
+        if -debt > amount:
+            heapq.heappush(debtor_heap, (debt + amount, debtor))
+        if -credit > amount:
+            heapq.heappush(creditor_heap, (credit + amount, creditor))
+    return transfers
+
+
+def _zero_sum_groups(users, amounts):
+    """Kullanıcıları en fazla sayıda sıfır toplamlı gruba böler (alt küme DP)"""
+    n = len(users)
+    size = 1 << n
+    sums = [0] * size
+    for mask in range(1, size):
+        low = mask & -mask
+        sums[mask] = sums[mask ^ low] + amounts[low.bit_length() - 1]
+
+    # best[mask]: mask'ın elemanları bir sırayla eklenirken görülebilecek en fazla sıfır toplamlı önek
+    best = [0] * size
+    removed = [0] * size
+    for mask in range(1, size):
+        value, choice, rest = -1, 0, mask
+        while rest:
+            low = rest & -rest
+            if best[mask ^ low] > value:
+                value, choice = best[mask ^ low], low
+            rest ^= low
+        best[mask] = value + (sums[mask] == 0)
+        removed[mask] = choice
+
+    # Çıkarma yolunu izle; sıfır toplamlı her önek bir grup sınırıdır
+    groups, current, mask = [], [], size - 1
+    while mask:
+        if sums[mask] == 0 and current:
+            groups.append(current)
+            current = []
+        low = removed[mask]
+        current.append(users[low.bit_length() - 1])
+        mask ^= low
+    groups.append(current)
+    return groups
+
+
+def exact_transfers(balances):
+    """En az sayıda transfer (n - sıfır toplamlı grup sayısı); küçük gruplar için"""
+    users = sorted(user_id for user_id, balance in balances.items() if balance)
+    if not users:
+        return []
+    transfers = []
+    for group in _zero_sum_groups(users, [balances[user_id] for user_id in users]):
+        # Sıfır toplamlı alt grubu olmayan grupta açgözlü çözüm |grup| - 1 transferdir
+        transfers.extend(greedy_transfers({user_id: balances[user_id] for user_id in group}))
+    return transfers
+
+
+def settle(paid_by_user, weight_by_user, participants, exact_limit=EXACT_SOLVER_LIMIT):
+    """Paylar, bakiyeler ve transfer listesini hazırlar (TL cinsinden)"""
+    shares, balances = compute_balances(paid_by_user, weight_by_user, participants)
+    open_balances = sum(1 for balance in balances.values() if balance)
+    if open_balances <= exact_limit:
+        method, transfers = 'exact', exact_transfers(balances)
+    else:
+        method, transfers = 'greedy', greedy_transfers(balances)
+    return {
+        'total_expense': to_amount(sum(shares.values())),
+        'participant_count': len(balances),
+        'shares': {user_id: to_amount(cents) for user_id, cents in sorted(shares.items())},
+        'balances': {user_id: to_amount(cents) for user_id, cents in sorted(balances.items())},
+        'transfers': [
+            {'from': debtor, 'to': creditor, 'amount': to_amount(cents)}
+            for debtor, creditor, cents in transfers
+        ],
+        'method': method
+    }
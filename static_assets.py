@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📦 BiP Bot - Bellek İçi Statik Dosyalar
+frontend.html ve invite.png gibi dosyaları açılışta bir kez okur, sıkıştırılmış halleriyle bellekte tutar
+
+Özellikler:
+- Her dosya için önceden hesaplanmış gzip (ve brotli varsa br) gövdeleri
+- İçerik hash'inden ETag ve sürümlü URL (?v=hash); sürümlü istekler uzun süre önbelleklenir
+- Accept-Encoding pazarlığı, Vary başlığı ve If-None-Match ile 304
+- Dosya değişirse (mtime) en geç check_interval saniye içinde yeniden yüklenir
+- Zaten sıkıştırılmış içerik (PNG) tekrar sıkıştırılmaz
+
+Yazar: BiP Bot Development Team
+Versiyon: 2.0.0
+"""
+
+import os
+import time
+import hashlib
+import threading
+import mimetypes
+import logging
+
+from compression import SUPPORTED_ENCODINGS, negotiate_encoding, compress
+
+logger = logging.getLogger(__name__)
+
+# Sürümlü URL'lerle istenen dosyalar için (içerik değişince URL de değişir)
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Sürümsüz URL: istemci önbellekte tutar ama her kullanımda ETag ile doğrular
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+# Sıkıştırmanın kazandırmadığı türler
+_COMPRESSIBLE_PREFIXES = ('text/', 'application/json', 'application/javascript', 'image/svg+xml')
+
+
+class StaticAsset:
+    def __init__(self, path, content_type, body, mtime, level=9):
+        """Dosya içeriğini ve sıkıştırılmış varyantlarını hazırlar"""
+        self.path = path
+        self.content_type = content_type
+        self.mtime = mtime
+        self.version = hashlib.sha256(body).hexdigest()[:16]
+        self.variants = {None: body}
+        if content_type.startswith(_COMPRESSIBLE_PREFIXES):
+            for encoding in SUPPORTED_ENCODINGS:
+                compressed = compress(body, encoding, level if encoding == 'gzip' else 11)
+                if len(compressed) < len(body):
+                    self.variants[encoding] = compressed
+
+    @classmethod
+    def load(cls, path, content_type=None, level=9):
+        """Dosyayı diskten okur"""
+        if content_type is None:
+            content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+            if content_type.startswith('text/'):
+                content_type += '; charset=utf-8'
+        mtime = os.stat(path).st_mtime_ns
+        with open(path, 'rb') as f:
+            body = f.read()
+        return cls(path, content_type, body, mtime, level)
+
+    def etag(self, encoding):
+        """Varyant başına ETag (farklı gösterimler farklı etiket taşır)"""
+        return f"{self.version}-{encoding}" if encoding else self.version
+
+    def select(self, accept_encoding):
+        """İstemciye gönderilecek (kodlama, gövde) çifti"""
+        encoding = negotiate_encoding(accept_encoding, [e for e in self.variants if e])
+        return encoding, self.variants[encoding]
+
+
+class StaticAssets:
+    def __init__(self, root, check_interval=2.0, level=9):
+        """root dizinindeki dosyaları ilk istekte yükleyen bellek içi depo"""
+        self.root = root
+        self.check_interval = check_interval
+        self.level = level
+        self._assets = {}  # isim -> (StaticAsset, son kontrol zamanı)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.reloads = 0
+
+    def preload(self, *names):
+        """Dosyaları önceden yükler (açılışta; preload_app ile worker'lar paylaşır)"""
+        for name in names:
+            try:
+                self.get(name)
+            except FileNotFoundError:
+                logger.warning(f"Statik dosya bulunamadı: {name}")
+
+    def get(self, name):
+        """Dosyanın güncel halini döndürür; dosya yoksa FileNotFoundError"""
+        now = time.monotonic()
+        entry = self._assets.get(name)
+        if entry is not None:
+            asset, checked = entry
+            if self.check_interval is None or now - checked < self.check_interval:
+                self.hits += 1
+                return asset
+        path = os.path.join(self.root, name)
+        with self._lock:
+            entry = self._assets.get(name)
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                self._assets.pop(name, None)
+                raise
+            if entry is not None and entry[0].mtime == mtime:
+                asset = entry[0]
+            else:
+                asset = StaticAsset.load(path, level=self.level)
+                if entry is not None:
+                    self.reloads += 1
+                    logger.info(f"Statik dosya yeniden yüklendi: {name} ({asset.version})")
+            self._assets[name] = (asset, now)
+            return asset
+
+    def url(self, name, base=''):
+        """Sürümlü URL (içerik değişince değişir); dosya yoksa sürümsüz"""
+        try:
+            return f"{base}{name}?v={self.get(name).version}"
+        except FileNotFoundError:
+            return f"{base}{name}"
+
+    def stats(self):
+        """Yüklü dosyaları ve varyant boyutlarını döndürür"""
+        with self._lock:
+            assets = {
+                name: {
+                    'version': asset.version,
+                    'sizes': {encoding or 'identity': len(body) for encoding, body in asset.variants.items()}
+                }
+                for name, (asset, _checked) in self._assets.items()
+            }
+        return {'assets': assets, 'hits': self.hits, 'reloads': self.reloads}
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⚡ BiP Bot - Etkinlik Özeti Önbelleği
+Süreç içi LRU/TTL önbellek
+
+Özellikler:
+- event_id anahtarlı, boyutu sınırlı LRU önbellek
+- TTL ile süre aşımı (çoklu worker'da bayatlık sınırı)
+- Yazma anında geçersiz kılma (write-through invalidation)
+- Versiyon kontrolü (başka worker'ların yazmaları da fark edilir)
+- Hit/miss/eviction sayaçları
+- Testler için kapatılabilir
+
+Yazar: BiP Bot Development Team
+Versiyon: 2.0.0
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class SummaryCache:
+    def __init__(self, max_entries=1024, ttl=30.0, enabled=True, clock=time.monotonic):
+        """Önbelleği başlatır"""
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (değer, versiyon, son geçerlilik zamanı)
+        # Hesaplama sırasında bir geçersiz kılma olduysa sonuç önbelleğe yazılmaz
+        self._invalidation_seq = 0
+        
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+        self._stale = 0
+
+    def get(self, key, version=None):
+        """Önbellekteki değeri döndürür; yoksa, süresi dolduysa veya versiyonu eskiyse None"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            value, entry_version, expires_at = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+            if version is not None and entry_version != version:
+                del self._entries[key]
+                self._stale += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key, value, version=None, seq=None):
+        """Değeri önbelleğe yazar; seq verilirse arada geçersiz kılma olmadıysa yazar"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if seq is not None and seq != self._invalidation_seq:
+                return
+            self._entries[key] = (value, version, self._clock() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def get_or_compute(self, key, compute, version=None):
+        """Önbellekte varsa döndürür, yoksa compute() ile hesaplayıp saklar"""
+        value = self.get(key, version)
+        if value is not None:
+            return value
+        with self._lock:
+            seq = self._invalidation_seq
+        value = compute()
+        if value is not None:
+            self.put(key, value, version=version, seq=seq)
+        return value
+
+    def invalidate(self, key):
+        """Anahtarın önbellek kaydını siler"""
+        with self._lock:
+            self._invalidation_seq += 1
+            if self._entries.pop(key, None) is not None:
+                self._invalidations += 1
+
+    def clear(self):
+        """Tüm önbelleği temizler"""
+        with self._lock:
+            self._invalidation_seq += 1
+            self._entries.clear()
+
+    def stats(self):
+        """Önbellek istatistiklerini döndürür"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 3) if lookups else 0.0,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'stale': self._stale,
+                'invalidations': self._invalidations
+            }
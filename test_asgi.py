@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 BiP Bot ASGI Sunum Modu Testleri
+
+Kullanım:
+python -m pytest test_asgi.py
+"""
+
+import os
+import sys
+import json
+import asyncio
+import subprocess
+
+from asgi import application
+from database import db
+from app import stream_hub
+
+# uvicorn --workers gibi her worker asgi'yi ayrı süreçte yükler; sahip worker kilidi bırakmasın diye bekler
+WORKER_SCRIPT = '''
+import sys
+import asgi
+from app import reminder_scheduler
+from database import LATEST_EVENT_CACHE_SETTINGS
+print(LATEST_EVENT_CACHE_SETTINGS['mode'], reminder_scheduler.stats()['running'], flush=True)
+sys.stdin.read()
+'''
+
+
+def make_scope(method, path, query=b'', headers=()):
+    return {
+        'type': 'http', 'method': method, 'path': path, 'root_path': '', 'query_string': query,
+        'headers': [(b'host', b'testserver')] + list(headers), 'http_version': '1.1', 'scheme': 'http',
+        'server': ('testserver', 80), 'client': ('127.0.0.1', 5000)
+    }
+
+
+async def call(method, path, body=None):
+    """Uygulamayı çağırır; (status, başlıklar, gövde) döndürür"""
+    payload = json.dumps(body).encode('utf-8') if body is not None else b''
+    headers = [(b'content-type', b'application/json')] if body is not None else []
+    messages = [{'type': 'http.request', 'body': payload, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.Event().wait()
+
+    async def send(message):
+        sent.append(message)
+
+    await application(make_scope(method, path, headers=headers), receive, send)
+    start = sent[0]
+    return start['status'], dict(start['headers']), b''.join(m.get('body', b'') for m in sent[1:])
+
+
+def test_webhook_and_rest_routes_work_through_adapter():
+    status, headers, body = asyncio.run(call('POST', '/webhook/bip', {
+        'message': '/yeni ASGI Partisi', 'user_id': 'asgi_user', 'group_id': 'asgi_group'
+    }))
+    assert status == 200
+    assert json.loads(body)['status'] == 'ok'
+    assert headers[b'access-control-allow-origin'] == b'*'
+
+    status, _headers, body = asyncio.run(call('GET', '/api/events'))
+    assert status == 200
+    assert any(event['title'] == 'ASGI Partisi' for event in json.loads(body)['events'])
+
+
+def test_missing_stream_falls_back_to_flask_404():
+    status, _headers, body = asyncio.run(call('GET', '/events/999999/stream'))
+    assert status == 404
+    assert json.loads(body)['status'] == 'error'
+
+
+def test_stream_is_served_without_executor_thread():
+    event_id = db.create_event('Akış', 'asgi_user', 'asgi_stream_group')
+
+    async def scenario():
+        chunks = []
+        got_delta = asyncio.Event()
+        disconnect = asyncio.Event()
+        requested = False
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await disconnect.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            chunks.append(message.get('body', b''))
+            if b'slot_voted' in message.get('body', b''):
+                got_delta.set()
+
+        task = asyncio.ensure_future(application(make_scope('GET', f'/events/{event_id}/stream'), receive, send))
+        for _ in range(100):
+            if stream_hub.subscriber_count(event_id):
+                break
+            await asyncio.sleep(0.01)
+        # Yayın başka bir thread'den gelir (Flask view'ı gibi)
+        await asyncio.get_running_loop().run_in_executor(
+            None, stream_hub.publish, event_id, 'slot_voted', {'version': 99})
+        await asyncio.wait_for(got_delta.wait(), 5)
+        disconnect.set()
+        await asyncio.wait_for(task, 5)
+        return b''.join(chunks)
+
+    body = asyncio.run(scenario()).decode('utf-8')
+    assert 'event: hello' in body and 'event: slot_voted' in body
+    assert stream_hub.subscriber_count(event_id) == 0
+
+
+def test_worker_processes_share_cache_and_elect_one_scheduler(tmp_path):
+    env = dict(os.environ, BIP_BOT_DB=str(tmp_path / 'workers.db'), WEB_CONCURRENCY='2',
+               BIP_BOT_SCHEDULER='1', BIP_BOT_OWNER_RETRY_SECONDS='60')
+    env.pop('BIP_BOT_LATEST_EVENT_CACHE', None)
+    workers = [subprocess.Popen([sys.executable, '-c', WORKER_SCRIPT], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+               for _ in range(2)]
+    try:
+        states = [worker.stdout.readline().split() for worker in workers]
+    finally:
+        for worker in workers:
+            worker.stdin.close()
+            worker.wait(timeout=30)
+    assert [mode for mode, _running in states] == ['shared', 'shared']
+    assert sorted(running for _mode, running in states) == ['False', 'True']
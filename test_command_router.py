@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 BiP Bot Komut Yönlendirici Testleri
+
+Kullanım:
+python -m pytest test_command_router.py
+"""
+
+from datetime import datetime
+
+import pytest
+
+from command_router import CommandRouter, CommandContext, ArgumentError
+
+CTX = CommandContext('user_1', 'group_1', '')
+
+
+@pytest.fixture
+def router():
+    router = CommandRouter()
+    router.register('/slot', lambda ctx, **kw: ('slot', kw), pattern=r'(?P<rest>.*)')
+    router.register('/slot_kapat', lambda ctx, **kw: ('slot_kapat', kw), pattern=r'(?P<rest>.*)')
+    router.register('/test', lambda ctx: 'ok')
+    return router
+
+
+def test_dispatch_on_command_token(router):
+    assert router.dispatch('/slot_kapat 3', CTX) == ('slot_kapat', {'rest': '3'})
+    assert router.dispatch('/slot 2030-01-01 18:00-20:00', CTX) == ('slot', {'rest': '2030-01-01 18:00-20:00'})
+    assert router.dispatch('/test', CTX) == 'ok'
+    assert router.dispatch('/yok', CTX) == 'Bilinmeyen komut: /yok'
+
+
+def test_prefix_fallback_prefers_longest_command(router):
+    command, args = router.resolve('/slot_kapat3')
+    assert (command.name, args) == ('/slot_kapat', '3')
+    command, args = router.resolve('/slotx y')
+    assert (command.name, args) == ('/slot', 'x y')
+    assert router.resolve('merhaba') == (None, None)
+
+
+def test_duplicate_registration_rejected(router):
+    with pytest.raises(ValueError):
+        router.register('/test', lambda ctx: 'iki')
+
+
+def test_parse_errors_use_declared_messages():
+    router = CommandRouter()
+    router.register(
+        '/sayi', lambda ctx, value: value * 2, pattern=r'(?P<value>\S+)', min_args=1,
+        convert=lambda value: {'value': int(value)}, usage='Kullanim: /sayi N', invalid='Sayi degil'
+    )
+    assert router.dispatch('/sayi 21', CTX) == 42
+    assert router.dispatch('/sayi', CTX) == 'Kullanim: /sayi N'
+    assert router.dispatch('/sayi x', CTX) == 'Sayi degil'
+    assert router.dispatch('/sayi 1 2', CTX) == 'Sayi degil'
+
+
+def test_handler_errors_return_declared_message():
+    router = CommandRouter()
+    router.register('/bozuk', lambda ctx: 1 / 0, error='Hata olustu.')
+    router.register('/cok_bozuk', lambda ctx: 1 / 0)
+    assert router.dispatch('/bozuk', CTX) == 'Hata olustu.'
+    with pytest.raises(ZeroDivisionError):
+        router.dispatch('/cok_bozuk', CTX)
+
+
+def parse(message):
+    """Uygulamanın kayıtlı komutlarıyla mesajı ayrıştırır"""
+    from app import command_router
+    command, args = command_router.resolve(message)
+    return command.parse(args)
+
+
+@pytest.mark.parametrize('message, expected', [
+    ('/gider 10 pizza', {'amount': 10.0, 'notes': 'pizza', 'weight': 1.0}),
+    ('/gider 25.5 "pizza ve kola" 2', {'amount': 25.5, 'notes': 'pizza ve kola', 'weight': 2.0}),
+    ('/gider 7 "su"', {'amount': 7.0, 'notes': 'su', 'weight': 1.0}),
+    ('/katil slot=4 yes', {'slot_id': 4, 'choice': 'yes'}),
+    ('/mekan Kafe', {'name': 'Kafe', 'latitude': None, 'longitude': None}),
+    ('/mekan Park 41.0 29.5', {'name': 'Park', 'latitude': 41.0, 'longitude': 29.5}),
+    ('/slot 2030-01-01 18:00-20:00', {
+        'start_dt': datetime(2030, 1, 1, 18, 0), 'end_dt': datetime(2030, 1, 1, 20, 0)
+    }),
+    ('/ozet', {'detailed': False}),
+    ('/ozet detay', {'detailed': True}),
+])
+def test_app_command_arguments(message, expected):
+    assert parse(message) == expected
+
+
+@pytest.mark.parametrize('message, error', [
+    ('/gider 10 "pizza', 'Aciklama tirnak icinde olmali.'),
+    ('/gider 10', 'Kullanim: /gider TUTAR "Aciklama" [agirlik]'),
+    ('/katil slot=1 belki', 'Choice: yes veya no'),
+    ('/katil 1 yes', 'Kullanim: /katil slot=1 yes/no'),
+    ('/slot 2030-01-01 18:00', 'Tarih/saat formatı yanlış. Örnek: /slot 2025-10-12 18:00-20:00'),
+    ('/konum x', 'Geçersiz mekan ID!'),
+])
+def test_app_command_argument_errors(message, error):
+    with pytest.raises(ArgumentError) as excinfo:
+        parse(message)
+    assert str(excinfo.value) == error
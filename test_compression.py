@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 BiP Bot Yanıt Sıkıştırma ve Statik Dosya Testleri
+
+Kullanım:
+python -m pytest test_compression.py
+"""
+
+import os
+import gzip
+import json
+
+from compression import negotiate_encoding, gzip_stream
+from static_assets import StaticAssets
+from database import db
+from app import app
+
+
+def test_accept_encoding_negotiation():
+    assert negotiate_encoding('gzip, deflate', ('br', 'gzip')) == 'gzip'
+    assert negotiate_encoding('gzip;q=0.5, br', ('br', 'gzip')) == 'br'
+    assert negotiate_encoding('gzip;q=0, *', ('gzip',)) is None
+    assert negotiate_encoding('*;q=0.1', ('gzip',)) == 'gzip'
+    assert negotiate_encoding('', ('gzip',)) is None
+    assert negotiate_encoding(None, ('gzip',)) is None
+
+
+def test_gzip_stream_round_trip():
+    chunks = [f'parça {i} '.encode('utf-8') * 50 for i in range(20)]
+    assert gzip.decompress(b''.join(gzip_stream(iter(chunks)))) == b''.join(chunks)
+
+
+def test_large_json_is_gzipped_and_keeps_etag_match():
+    for i in range(20):
+        db.create_event(f'Sıkıştırma etkinliği {i}', 'moderator', 'compress_group')
+    client = app.test_client()
+    url = '/api/events?group_id=compress_group'
+
+    response = client.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert len(gzip.decompress(response.data)) > len(response.data)
+    etag = response.headers['ETag']
+    assert etag.startswith('W/')
+    assert client.get(url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag}).status_code == 304
+
+    plain = client.get(url)
+    assert 'Content-Encoding' not in plain.headers
+    assert plain.get_json() == json.loads(gzip.decompress(response.data))
+
+    small = client.get('/api/events?limit=1&group_id=compress_group', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers
+
+
+def test_static_asset_variants_and_reload(tmp_path):
+    page = tmp_path / 'sayfa.html'
+    page.write_text('<html>' + 'merhaba ' * 500 + '</html>', encoding='utf-8')
+    assets = StaticAssets(str(tmp_path), check_interval=0)
+
+    asset = assets.get('sayfa.html')
+    assert asset.content_type == 'text/html; charset=utf-8'
+    encoding, body = asset.select('gzip, br;q=0')
+    assert encoding == 'gzip' and gzip.decompress(body) == page.read_bytes()
+    assert asset.select('identity') == (None, page.read_bytes())
+    assert assets.url('sayfa.html') == f'sayfa.html?v={asset.version}'
+
+    page.write_text('<html>yeni</html>', encoding='utf-8')
+    os.utime(page, ns=(1, 1))
+    reloaded = assets.get('sayfa.html')
+    assert reloaded.version != asset.version and assets.stats()['reloads'] == 1
+    assert 'gzip' not in reloaded.variants  # Küçük dosyada sıkıştırma kazandırmaz
+
+
+def test_frontend_is_served_from_memory_with_revalidation():
+    client = app.test_client()
+    response = client.get('/', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200 and response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Cache-Control'] == 'no-cache'
+    assert b'<html' in gzip.decompress(response.data).lower()
+    again = client.get('/', headers={'Accept-Encoding': 'gzip', 'If-None-Match': response.headers['ETag']})
+    assert again.status_code == 304 and again.data == b''
+
+    version = client.get('/invite.png').headers['ETag'].strip('"')
+    cached = client.get(f'/invite.png?v={version}')
+    assert cached.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
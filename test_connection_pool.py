@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 BiP Bot Bağlantı Havuzu Testleri
+connection_pool.py modülünü geçici bir SQLite dosyası üzerinde test eder
+
+Kullanım:
+python -m pytest test_connection_pool.py
+"""
+
+import sqlite3
+import threading
+import time
+
+import pytest
+from connection_pool import ConnectionPool, PoolTimeoutError
+
+
+@pytest.fixture
+def pool(tmp_path):
+    """İki bağlantılık havuz; sağlık kontrolü her alımda"""
+    pool = ConnectionPool(str(tmp_path / 'pool.db'), size=2, timeout=1.0,
+                          pragmas={'busy_timeout': 1234}, health_check_interval=0)
+    yield pool
+    pool.close()
+
+
+def test_connections_are_reused_and_configured(pool):
+    with pool.connection() as conn:
+        first = conn
+        assert conn.execute('PRAGMA busy_timeout').fetchone()[0] == 1234
+    with pool.connection() as conn:
+        assert conn is first
+
+    stats = pool.stats()
+    assert (stats['checkouts'], stats['connects'], stats['created']) == (2, 1, 1)
+    assert (stats['in_use'], stats['idle'], stats['waits']) == (0, 1, 0)
+
+
+def test_exhausted_pool_times_out(pool):
+    first, second = pool.acquire(), pool.acquire()
+    started = time.monotonic()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+    assert time.monotonic() - started >= 0.9
+    assert pool.stats()['in_use'] == 2
+    pool.release(first)
+    pool.release(second)
+    assert pool.stats()['in_use'] == 0
+
+
+def test_waiting_thread_gets_released_connection(pool):
+    held = [pool.acquire(), pool.acquire()]
+    received = []
+
+    def worker():
+        with pool.connection() as conn:
+            received.append(conn)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    time.sleep(0.2)
+    assert not received
+    pool.release(held[0])
+    thread.join(timeout=5)
+    pool.release(held[1])
+
+    # Bekleyen thread serbest kalan bağlantının aynısını kullanır
+    assert received == [held[0]]
+    stats = pool.stats()
+    assert stats['waits'] == 1 and stats['checkouts'] == 3
+    assert stats['max_wait_ms'] >= 150 and stats['avg_wait_ms'] == stats['max_wait_ms']
+    assert stats['connects'] == 2
+
+
+def test_unhealthy_idle_connection_is_replaced(pool):
+    conn = pool.acquire()
+    pool.release(conn)
+    conn.close()  # Boştayken bozulan bağlantı
+
+    with pool.connection() as fresh:
+        assert fresh is not conn
+        assert fresh.execute('SELECT 1').fetchone()[0] == 1
+    stats = pool.stats()
+    assert (stats['discarded'], stats['connects'], stats['created']) == (1, 2, 1)
+
+
+def test_open_transaction_is_rolled_back_on_release(pool):
+    with pool.connection() as conn:
+        conn.execute('CREATE TABLE t (x INTEGER)')
+        conn.commit()
+        conn.execute('INSERT INTO t VALUES (1)')
+        assert conn.in_transaction
+    with pool.connection() as conn:
+        assert not conn.in_transaction
+        assert conn.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 0
+
+
+def test_closed_pool_rejects_acquire(pool):
+    conn = pool.acquire()
+    pool.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        pool.acquire()
+    # Kullanımdaki bağlantı iade edilince kapanır
+    pool.release(conn)
+    assert pool.stats()['created'] == 0
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute('SELECT 1')
+
+
+def test_counters_survive_concurrent_connects(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'busy.db'), size=8, timeout=5.0, health_check_interval=None)
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        for _ in range(50):
+            # Her iade bağlantıyı kapatır; sonraki alım yeni bağlantı açar
+            pool.release(pool.acquire(), discard=True)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+    stats = pool.stats()
+    pool.close()
+    assert stats['connects'] == stats['discarded'] == 400
+    assert (stats['created'], stats['in_use']) == (0, 0)
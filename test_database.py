@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 BiP Bot Veritabanı Testleri
+database.py modülünü geçici bir SQLite dosyası üzerinde test eder
+
+Kullanım:
+python -m pytest test_database.py
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import subprocess
+
+import pytest
+from database import Database, WalCheckpointer, INDEXES, PRAGMA_PROFILES
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Her test için boş bir veritabanı oluşturur"""
+    database = Database(str(tmp_path / 'test.db'), pool_size=1)
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def sample_event(database):
+    """Slot, oy, mekan ve gider içeren örnek bir etkinlik oluşturur"""
+    event_id = database.create_event('Test Etkinliği', 'moderator', 'group_1')
+    slot_id = database.create_slot(event_id, '2030-01-01T18:00:00', '2030-01-01T20:00:00', 'moderator')
+    database.vote_slot(event_id, slot_id, 'user_1', 'yes')
+    database.vote_slot(event_id, slot_id, 'user_2', 'no')
+    poll_id = database.create_poll(event_id, 'Mekan secimi')
+    choice_id = database.create_poll_choice(poll_id, 'Kafe', 41.0, 29.0)
+    database.vote_poll(poll_id, choice_id, 'user_1')
+    database.create_expense(event_id, 'user_1', 100.0, 'Pizza', 1.0)
+    return event_id
+
+
+def capture_queries(database, action):
+    """action çalışırken çalıştırılan SELECT/UPDATE/DELETE sorgularını toplar (tek bağlantılı havuz)"""
+    queries = []
+    with database.get_connection() as conn:
+        conn.set_trace_callback(queries.append)
+    try:
+        action()
+    finally:
+        with database.get_connection() as conn:
+            conn.set_trace_callback(None)
+    return [q for q in queries if q.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE'))]
+
+
+def full_scans(database, sql):
+    """Sorgu planında tablo taraması yapan adımları döndürür"""
+    with database.get_connection() as conn:
+        plan = conn.execute(f'EXPLAIN QUERY PLAN {sql}').fetchall()
+    return [row['detail'] for row in plan if row['detail'].startswith('SCAN')]
+
+
+def test_indexes_created(database):
+    with database.get_connection() as conn:
+        names = {row['name'] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert set(INDEXES) <= names
+
+
+def test_index_creation_is_idempotent(tmp_path):
+    path = str(tmp_path / 'test.db')
+    Database(path, pool_size=1).close()
+    database = Database(path, pool_size=1)
+    with database.get_connection() as conn:
+        version = conn.execute("SELECT value FROM schema_meta WHERE key = 'index_set_version'").fetchone()
+    database.close()
+    assert version['value'] >= 1
+
+
+def test_hot_queries_do_not_scan_tables(database, sample_event):
+    event_id = sample_event
+    poll = database.get_poll_by_event(event_id)
+
+    def hot_path():
+        database.get_latest_event('group_1')
+        database.get_latest_event()
+        database.get_event_by_id(event_id)
+        database.get_slots_by_event(event_id)
+        database.get_slot_votes(event_id)
+        database.get_poll_by_event(event_id)
+        database.get_poll_choices(poll['poll_id'])
+        database.get_poll_votes(poll['poll_id'])
+        database.get_expenses_by_event(event_id)
+        database.get_event_summary_stats(event_id)
+        slot_id = database.get_slots_by_event(event_id)[0]['slot_id']
+        database.replace_slot_vote(event_id, slot_id, 'user_1')
+        database.close_slot(event_id, slot_id)
+
+    queries = capture_queries(database, hot_path)
+
+    assert len(queries) >= 12
+    for sql in queries:
+        assert full_scans(database, sql) == [], sql
+
+
+def test_event_summary_stats_aggregates_in_sql(database, sample_event):
+    summary = database.get_event_summary_stats(sample_event)
+    assert [(s['yes_votes'], s['no_votes']) for s in summary['slots']] == [(1, 1)]
+    assert [c['votes'] for c in summary['poll_choices']] == [1]
+    assert summary['expense_count'] == 1
+    assert summary['total_expense'] == 100.0
+    assert summary['paid_by_user'] == {'user_1': 100.0}
+    assert sorted(summary['participants']) == ['user_1', 'user_2']
+    assert database.get_event_summary_stats(9999) is None
+
+
+def test_stats_follow_writes(database, sample_event):
+    event_id = sample_event
+    slot_id = database.get_slots_by_event(event_id)[0]['slot_id']
+    # INSERT OR REPLACE eski oyu siler; sayaçlar çift saymamalı
+    database.vote_slot(event_id, slot_id, 'user_2', 'yes')
+    database.create_expense(event_id, 'user_3', 50.0, 'Icecek', 2.0)
+    with database.get_connection() as conn:
+        conn.execute("UPDATE slots SET status = 'closed' WHERE slot_id = ?", (slot_id,))
+        conn.commit()
+
+    stats = database.get_event_stats(event_id)
+    assert (stats['slot_yes_votes'], stats['slot_no_votes']) == (2, 0)
+    assert (stats['slot_count'], stats['active_slot_count']) == (1, 0)
+    assert stats['poll_vote_count'] == 1
+    assert (stats['expense_count'], stats['expense_total'], stats['weight_total']) == (2, 150.0, 3.0)
+    assert stats['participant_count'] == 3
+    assert database.rebuild_stats(fix=False)['drift'] == []
+
+
+def test_rebuild_stats_reports_and_fixes_drift(database, sample_event):
+    with database.get_connection() as conn:
+        conn.execute('UPDATE event_stats SET expense_total = 0, participant_count = 7')
+        conn.execute('DELETE FROM slot_stats')
+        conn.commit()
+
+    report = database.rebuild_stats(fix=True)
+    fields = {(item['table'], item['field']) for item in report['drift']}
+    assert ('event_stats', 'expense_total') in fields
+    assert ('event_stats', 'participant_count') in fields
+    assert ('slot_stats', 'yes_votes') in fields
+    assert report['fixed']
+    assert database.rebuild_stats(fix=False)['drift'] == []
+
+
+def test_balance_ledger_follows_expense_edits(database, sample_event):
+    event_id = sample_event
+    database.create_expense(event_id, 'user_1', 20.1, 'Icecek', 2.0)
+    last_id = database.create_expense(event_id, 'user_3', 0.3, 'Sakiz', 0.5)
+    summary = database.get_event_summary_stats(event_id, include_expenses=False)
+    assert summary['paid_by_user'] == {'user_1': 120.1, 'user_3': 0.3}
+    assert summary['weight_by_user'] == {'user_1': 2.0, 'user_3': 0.5}
+    assert sorted(summary['participants']) == ['user_1', 'user_2', 'user_3']
+
+    # Düzenleme ve silme: son gider silinince ağırlık bir önceki giderden gelir
+    with database.get_connection() as conn:
+        conn.execute("UPDATE expenses SET amount = 80, user_id = 'user_2' WHERE notes = 'Pizza'")
+        conn.execute("DELETE FROM expenses WHERE notes = 'Icecek'")
+        conn.execute('UPDATE expenses SET weight = NULL WHERE expense_id = ?', (last_id,))
+        conn.commit()
+    with database.get_connection() as conn:
+        rows = conn.execute('SELECT * FROM event_balances ORDER BY user_id').fetchall()
+    assert [(r['user_id'], r['paid_cents'], r['weight'], r['expense_count']) for r in rows] == \
+        [('user_2', 8000, 1.0, 1), ('user_3', 30, 1.0, 1)]
+    assert database.rebuild_stats(fix=False)['drift'] == []
+
+    with database.get_connection() as conn:
+        conn.execute("UPDATE event_balances SET paid_cents = 0 WHERE user_id = 'user_2'")
+        conn.commit()
+    report = database.rebuild_stats(event_id=event_id, fix=True)
+    assert [(d['table'], d['field']) for d in report['drift']] == [('event_balances', 'paid_cents')]
+    assert database.get_event_summary_stats(event_id)['paid_by_user'] == {'user_2': 80.0, 'user_3': 0.3}
+
+
+def test_analytics_most_active_user_comes_from_ledger():
+    # Analitik sorgusu app.py'de; global veritabanı üzerinden endpoint ile test edilir
+    from app import app, db
+
+    event_id = db.create_event('Analitik', 'moderator', 'analytics_group')
+    for user_id in ('ayse', 'ali', 'ayse', 'ali', 'veli'):
+        db.create_expense(event_id, user_id, 10.0, 'Gider', 1.0)
+    data = app.test_client().get(f'/events/{event_id}/analytics').get_json()['data']
+    # Eşitlikte kullanıcı kimliği sırası
+    assert (data['most_active_user'], data['most_active_user_expenses']) == ('ali', 2)
+    assert data['expense_count'] == 5
+
+
+def test_write_listeners_receive_event_id(database):
+    changes = []
+    database.add_write_listener(lambda event_id, change, **data: changes.append((event_id, change)))
+    event_id = database.create_event('Dinleyici', 'moderator', 'group_2')
+    slot_id = database.create_slot(event_id, '2030-01-01T18:00:00', '2030-01-01T20:00:00')
+    poll_id, choice_id = database.add_poll_choice(event_id, 'Kafe')
+    database.vote_poll(poll_id, choice_id, 'user_1')
+    database.replace_slot_vote(event_id, slot_id, 'user_1')
+    database.close_slot(event_id, slot_id)
+    database.create_expense(event_id, 'user_1', 10.0, 'Cay')
+    assert changes == [
+        (event_id, 'event_created'), (event_id, 'slot_added'), (event_id, 'choice_added'),
+        (event_id, 'poll_voted'), (event_id, 'slot_voted'), (event_id, 'slot_closed'),
+        (event_id, 'expense_added')
+    ]
+
+
+def test_event_version_bumps_on_every_write(database, sample_event):
+    slot_id = database.get_slots_by_event(sample_event)[0]['slot_id']
+    writes = [
+        lambda: database.replace_slot_vote(sample_event, slot_id, 'user_9'),
+        lambda: database.add_poll_choice(sample_event, 'Park'),
+        lambda: database.create_expense(sample_event, 'user_9', 5.0, 'Su'),
+        lambda: database.close_slot(sample_event, slot_id),
+    ]
+    for write in writes:
+        version = database.get_event_version(sample_event)
+        write()
+        assert database.get_event_version(sample_event) > version
+    assert database.get_event_version(sample_event + 1000) is None
+
+    users = database.get_user_count()
+    database.create_or_update_user('user_new')
+    assert database.get_user_count() == users + 1
+
+
+def test_transaction_commits_once_and_defers_listeners(database):
+    changes = []
+    database.add_write_listener(lambda event_id, change, **data: changes.append(change))
+    with database.transaction():
+        event_id = database.create_event('Toplu', 'moderator', 'group_3')
+        slot_id = database.create_slot(event_id, '2030-01-01T18:00:00', '2030-01-01T20:00:00')
+        database.replace_slot_vote(event_id, slot_id, 'user_1')
+        # İşlem içindeki okumalar kendi yazmalarını görür
+        assert database.get_event_summary_stats(event_id)['slots'][0]['yes_votes'] == 1
+        assert changes == []
+    assert changes == ['event_created', 'slot_added', 'slot_voted']
+    assert database.get_event_delta(event_id, include_slots=True)['slots'][0]['yes_votes'] == 1
+
+
+def test_transaction_isolates_failed_calls_and_rolls_back(database):
+    changes = []
+    database.add_write_listener(lambda event_id, change, **data: changes.append(change))
+    with database.transaction():
+        event_id = database.create_event('Kismi', 'moderator', 'group_4')
+        with pytest.raises(sqlite3.IntegrityError):
+            with database.get_connection() as conn:
+                conn.execute("INSERT INTO slots (event_id, start_datetime, end_datetime) VALUES (?, ?, ?)",
+                             (event_id, '2030-01-01T18:00:00', '2030-01-01T19:00:00'))
+                conn.execute("INSERT INTO slots (event_id, start_datetime, end_datetime) VALUES (?, NULL, NULL)",
+                             (event_id,))
+    assert database.get_event_by_id(event_id) is not None
+    assert database.get_slots_by_event(event_id) == []
+
+    with pytest.raises(RuntimeError):
+        with database.transaction():
+            database.create_event('Geri alinan', 'moderator', 'group_5')
+            raise RuntimeError('iptal')
+    assert database.get_latest_event('group_5') is None
+    assert changes == ['event_created']
+    assert database.rebuild_stats(fix=False)['drift'] == []
+
+
+FORK_SCRIPT = """
+import os, sys
+from database import Database, db as global_db
+database = Database(sys.argv[1], pool_size=1)
+event_id = database.create_event('Fork', 'moderator', 'group_6')
+# gunicorn when_ready gibi: fork anında SQLite kullanan thread kalmasın
+for instance in (global_db, database):
+    if instance.checkpointer:
+        instance.checkpointer.stop()
+# Ebeveyn fork anında havuz kilidini tutuyor olsa bile çocuk kilitlenmemeli
+database.pool._cond.acquire()
+pid = os.fork()
+if pid == 0:
+    code = 1
+    try:
+        database.after_fork()
+        database.create_slot(event_id, '2030-01-01T18:00:00', '2030-01-01T20:00:00')
+        code = 0 if database.pool.stats()['created'] == 1 else 2
+    finally:
+        os._exit(code)
+database.pool._cond.release()
+_, status = os.waitpid(pid, 0)
+assert os.WEXITSTATUS(status) == 0
+assert len(database.get_slots_by_event(event_id)) == 1
+database.close()
+"""
+
+
+def test_after_fork_child_gets_fresh_pool(tmp_path):
+    # Test sürecinin diğer thread'leri fork'u etkilemesin diye ayrı bir süreçte çalışır
+    result = subprocess.run([sys.executable, '-c', FORK_SCRIPT, str(tmp_path / 'fork.db')],
+                            cwd=os.path.dirname(os.path.abspath(__file__)), timeout=60,
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_events_page_uses_keyset_cursor(database, sample_event):
+    for n in range(5):
+        event_id = database.create_event(f'Sayfa {n}', 'moderator', 'group_2' if n % 2 else 'group_1')
+    database.set_event_status(event_id, 'closed')
+
+    pages, after = [], None
+    while True:
+        rows, has_more = database.get_events_page(2, after=after)
+        pages.append([row['event_id'] for row in rows])
+        if not has_more:
+            break
+        after = (rows[-1]['created_at'], rows[-1]['event_id'])
+    ids = [event_id for page in pages for event_id in page]
+    # Aynı saniyede oluşturulanlar event_id ile sıralanır; kapanan etkinlik listelenmez
+    assert ids == sorted(ids, reverse=True) and len(ids) == 5 and event_id not in ids
+    assert database.get_events_page(10, group_id='group_1', status=None)[0][0]['event_id'] == event_id
+    first = database.get_events_page(10)[0]
+    assert {row['event_id']: row['participant_count'] for row in first}[sample_event] == 2
+
+    sql = capture_queries(database, lambda: database.get_events_page(2, after=after, group_id='group_1'))[0]
+    assert full_scans(database, sql) == []
+
+
+@pytest.mark.parametrize('profile', sorted(PRAGMA_PROFILES))
+def test_pragma_profiles_are_applied(tmp_path, profile):
+    settings = PRAGMA_PROFILES[profile]
+    database = Database(str(tmp_path / f'{profile}.db'), pool_size=1, profile=profile, write_behind=False)
+    try:
+        with database.get_connection() as conn:
+            effective = {name: conn.execute(f'PRAGMA {name}').fetchone()[0]
+                         for name in ('journal_mode', 'synchronous', 'busy_timeout', 'cache_size', 'mmap_size')}
+        assert effective == {
+            'journal_mode': settings['journal_mode'].lower(),
+            'synchronous': {'OFF': 0, 'NORMAL': 1, 'FULL': 2}[settings['synchronous']],
+            'busy_timeout': settings['busy_timeout'],
+            # Profilde olmayanlar SQLite varsayılanında kalır
+            'cache_size': settings.get('cache_size', -2000),
+            'mmap_size': settings.get('mmap_size', 0)
+        }
+        assert (database.checkpointer is not None) == (settings['journal_mode'] == 'WAL')
+    finally:
+        database.close()
+
+
+def test_unknown_profile_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        Database(str(tmp_path / 'test.db'), profile='turbo')
+
+
+def test_checkpointer_truncates_large_wal_and_stops(tmp_path):
+    path = str(tmp_path / 'wal.db')
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA wal_autocheckpoint = 0')
+    conn.execute('CREATE TABLE t (x BLOB)')
+    conn.executemany('INSERT INTO t VALUES (?)', ((b'x' * 4096,) for _ in range(64)))
+    conn.commit()
+
+    checkpointer = WalCheckpointer(path, interval=0.05, truncate_bytes=64 * 1024)
+    assert checkpointer.wal_size() > 64 * 1024
+    checkpointer.start()
+    deadline = time.monotonic() + 5
+    while checkpointer.stats()['truncations'] == 0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    thread = checkpointer._thread
+    checkpointer.stop()
+    conn.close()
+
+    stats = checkpointer.stats()
+    assert stats['truncations'] >= 1 and stats['busy'] == 0
+    assert stats['wal_bytes'] == 0
+    assert checkpointer._thread is None and not thread.is_alive()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 BiP Bot Canlı Akış Testleri
+
+Kullanım:
+python -m pytest test_event_stream.py
+"""
+
+import threading
+
+from event_stream import EventStreamHub, StreamSlots, StreamMessage, format_sse
+
+
+def events(messages):
+    return [message.event for message in messages]
+
+
+def test_subscribers_share_published_messages():
+    hub = EventStreamHub()
+    first = hub.subscribe(1)
+    second = hub.subscribe(1)
+    other = hub.subscribe(2)
+    hub.publish(1, 'slot_voted', {'version': 2})
+    hub.publish(1, 'expense_added', {'version': 3})
+    assert events(first.wait(0)) == ['slot_voted', 'expense_added']
+    assert events(second.wait(0)) == ['slot_voted', 'expense_added']
+    assert other.wait(0) == []
+    assert hub.subscriber_count(1) == 2
+
+
+def test_wait_wakes_up_on_publish():
+    hub = EventStreamHub()
+    subscription = hub.subscribe(1)
+    received = []
+    reader = threading.Thread(target=lambda: received.extend(subscription.wait(5)))
+    reader.start()
+    hub.publish(1, 'slot_closed', {'version': 2})
+    reader.join(5)
+    assert events(received) == ['slot_closed']
+
+
+def test_waker_is_called_on_publish_and_close():
+    hub = EventStreamHub()
+    subscription = hub.subscribe(1)
+    calls = []
+    subscription.set_waker(lambda: calls.append('wake'))
+    hub.publish(1, 'slot_voted', {'version': 2})
+    assert calls == ['wake']
+    assert events(subscription.wait(0)) == ['slot_voted']
+    subscription.close()
+    hub.publish(1, 'slot_voted', {'version': 3})
+    assert calls == ['wake']  # Kapanan aboneliğin waker'ı çağrılmaz
+
+
+def test_last_event_id_replays_missed_messages():
+    hub = EventStreamHub()
+    subscription = hub.subscribe(1)
+    seen = hub.publish(1, 'slot_added', {'version': 2})
+    subscription.wait(0)
+    subscription.close()
+    hub.publish(1, 'slot_voted', {'version': 3})
+    hub.publish(1, 'slot_voted', {'version': 4})
+    resumed = hub.subscribe(1, last_event_id=seen)
+    assert [m.data['version'] for m in resumed.wait(0)] == [3, 4]
+
+
+def test_resync_when_history_is_lost():
+    hub = EventStreamHub(buffer_size=2)
+    seen = hub.publish(1, 'slot_added', {'version': 2})
+    for version in range(3, 6):
+        hub.publish(1, 'slot_voted', {'version': version})
+    assert events(hub.subscribe(1, last_event_id=seen).wait(0)) == ['resync']
+    assert events(hub.subscribe(1, last_event_id='baska-worker-7').wait(0)) == ['resync']
+
+    # İzleyen yokken atlanan değişiklik de tekrar oynatılamaz
+    latest = hub.publish(1, 'slot_voted', {'version': 6})
+    hub.discard(1)
+    assert events(hub.subscribe(1, last_event_id=latest).wait(0)) == ['resync']
+
+
+def test_slow_subscriber_gets_resync():
+    hub = EventStreamHub(buffer_size=2)
+    slow = hub.subscribe(1)
+    for version in range(2, 6):
+        hub.publish(1, 'slot_voted', {'version': version})
+    assert events(slow.wait(0)) == ['resync']
+    hub.publish(1, 'slot_closed', {'version': 6})
+    assert events(slow.wait(0)) == ['slot_closed']
+
+
+def test_close_releases_subscription():
+    hub = EventStreamHub()
+    subscription = hub.subscribe(1)
+    subscription.close()
+    subscription.close()
+    assert hub.subscriber_count(1) == 0
+    assert subscription.wait(0) == []
+
+
+def test_format_sse():
+    message = StreamMessage('abc-1', 'slot_voted', {'text': 'Kafe'})
+    assert format_sse(message) == 'id: abc-1\nevent: slot_voted\ndata: {"text":"Kafe"}\n\n'
+
+
+def test_stream_slots_limit_and_release():
+    slots = StreamSlots(limit=2)
+    assert slots.acquire() and slots.acquire()
+    assert not slots.acquire()
+    slots.release()
+    assert slots.acquire()
+    assert slots.stats() == {'limit': 2, 'open': 2, 'peak': 2, 'rejected': 1}
+    assert all(StreamSlots().acquire() for _ in range(100))
+
+
+def test_full_stream_slots_leave_request_threads_to_webhooks(monkeypatch):
+    import app as bip_app
+    from database import db
+    monkeypatch.setattr(bip_app, 'stream_slots', StreamSlots(limit=1))
+    event_id = db.create_event('Kapasite', 'moderator', 'stream_slots_group')
+    client = bip_app.app.test_client()
+
+    first = client.get(f'/events/{event_id}/stream', buffered=False)
+    assert next(first.response).startswith(b'retry: 3000')
+    busy = client.get(f'/events/{event_id}/stream')
+    assert busy.status_code == 200 and 'event: busy' in busy.get_data(as_text=True)
+    assert int(busy.headers['Retry-After']) >= bip_app.STREAM_BUSY_RETRY_MS // 1000
+
+    # Akış thread'i tutarken webhook'lar işlenmeye devam eder
+    response = client.post('/webhook/bip', json={
+        'message': '/ozet', 'user_id': 'moderator', 'group_id': 'stream_slots_group'})
+    assert response.status_code == 200
+
+    first.close()
+    assert bip_app.stream_slots.stats()['open'] == 0
+    second = client.get(f'/events/{event_id}/stream', buffered=False)
+    assert next(second.response).startswith(b'retry: 3000')
+    second.close()
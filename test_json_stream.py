@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 BiP Bot Akışlı JSON Yanıt Testleri
+
+Kullanım:
+python -m pytest test_json_stream.py
+"""
+
+import json
+
+from json_stream import stream_json
+from database import db
+from app import app
+
+
+def test_streamed_output_matches_json_dumps():
+    rows = [{'id': i, 'text': f'satır {i}'} for i in range(1000)]
+    payload = {'status': 'success', 'data': {'b': {2: 'iki', 1: 'bir'}, 'rows': iter(rows), 'empty': iter([])}}
+    chunks = list(stream_json(payload, chunk_size=512))
+    expected = json.dumps({'status': 'success', 'data': {'b': {2: 'iki', 1: 'bir'}, 'rows': rows, 'empty': []}},
+                          sort_keys=True, separators=(',', ':')) + '\n'
+    assert b''.join(chunks).decode('utf-8') == expected
+    assert len(chunks) > 10
+    assert all(len(chunk) < 1024 for chunk in chunks)
+
+
+def test_rows_are_pulled_lazily():
+    pulled = []
+
+    def rows():
+        for i in range(3):
+            pulled.append(i)
+            yield i
+
+    stream = stream_json({'rows': rows()}, chunk_size=1)
+    head = next(stream) + next(stream)
+    assert head == b'{"rows":' and pulled == []
+    assert b''.join(stream) == b'[0,1,2]}\n'
+
+
+def test_summary_streams_expenses_and_export_lists_events():
+    event_id = db.create_event('Akış Etkinliği', 'stream_user', 'stream_group')
+    for i in range(7):
+        db.create_expense(event_id, f'user_{i}', 10.0 + i, f'gider {i}')
+    client = app.test_client()
+
+    response = client.get(f'/events/{event_id}/summary')
+    assert response.status_code == 200 and response.is_streamed
+    data = response.get_json()['data']
+    assert data['expense_count'] == 7
+    assert [expense['amount'] for expense in data['expenses']] == [10.0 + i for i in range(7)]
+
+    assert list(db.iter_expenses(event_id, limit=3, batch_size=2)) == \
+        [dict(row) for row in db.get_expenses_by_event(event_id)][:3]
+
+    response = client.get('/api/events/export?group_id=stream_group')
+    events = response.get_json()['events']
+    assert [event['event_id'] for event in events] == [event_id]
+    assert events[0]['participant_count'] == 7
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 BiP Bot Aktif Etkinlik Önbelleği Testleri
+
+Kullanım:
+python -m pytest test_latest_event_cache.py
+"""
+
+import os
+import sys
+import subprocess
+
+from database import Database
+
+
+def make_db(path, **settings):
+    options = {'mode': 'local', 'max_entries': 100}
+    options.update(settings)
+    return Database(str(path), pool_size=2, write_behind=False, latest_event_cache=options)
+
+
+def test_create_event_replaces_cached_event(tmp_path):
+    database = make_db(tmp_path / 'latest.db')
+    assert database.get_latest_event('group_1') is None
+    first = database.create_event('Ilk', 'moderator', 'group_1')
+    assert database.get_latest_event('group_1')['event_id'] == first
+    assert database.get_latest_event('group_1')['event_id'] == first
+    second = database.create_event('Ikinci', 'moderator', 'group_1')
+    assert database.get_latest_event('group_1')['event_id'] == second
+
+    stats = database.get_latest_event_cache_stats()
+    assert stats['hits'] == 1 and stats['misses'] == 3
+    database.close()
+
+
+def test_status_change_falls_back_to_previous_event(tmp_path):
+    database = make_db(tmp_path / 'latest.db')
+    first = database.create_event('Ilk', 'moderator', 'group_1')
+    second = database.create_event('Ikinci', 'moderator', 'group_1')
+    assert database.get_latest_event('group_1')['event_id'] == second
+    database.set_event_status(second, 'closed')
+    assert database.get_latest_event('group_1')['event_id'] == first
+    database.set_event_status(first, 'closed')
+    assert database.get_latest_event('group_1') is None
+    database.close()
+
+
+def test_lru_eviction(tmp_path):
+    database = make_db(tmp_path / 'latest.db', max_entries=2)
+    for group in ('group_1', 'group_2', 'group_1', 'group_3'):
+        database.get_latest_event(group)
+    stats = database.get_latest_event_cache_stats()
+    assert stats['entries'] == 2 and stats['evictions'] == 1
+    database.get_latest_event('group_1')
+    assert database.get_latest_event_cache_stats()['hits'] == 2
+    database.close()
+
+
+def test_rolled_back_event_is_not_cached(tmp_path):
+    database = make_db(tmp_path / 'latest.db')
+    first = database.create_event('Ilk', 'moderator', 'group_1')
+    assert database.get_latest_event('group_1')['event_id'] == first
+    try:
+        with database.transaction():
+            database.create_event('Geri alinan', 'moderator', 'group_1')
+            assert database.get_latest_event('group_1')['event_id'] != first
+            raise RuntimeError('geri al')
+    except RuntimeError:
+        pass
+    assert database.get_latest_event('group_1')['event_id'] == first
+    database.close()
+
+
+def test_shared_mode_sees_other_workers(tmp_path):
+    path = tmp_path / 'latest.db'
+    worker_1 = make_db(path, mode='shared')
+    worker_2 = make_db(path, mode='shared')
+    first = worker_1.create_event('Ilk', 'moderator', 'group_1')
+    assert worker_2.get_latest_event('group_1')['event_id'] == first
+    assert worker_2.get_latest_event('group_2') is None
+
+    second = worker_1.create_event('Ikinci', 'moderator', 'group_1')
+    worker_1.create_event('Diger', 'moderator', 'group_2')
+    assert worker_2.get_latest_event('group_1')['event_id'] == second
+    assert worker_2.get_latest_event('group_2') is not None
+    worker_1.set_event_status(second, 'closed')
+    assert worker_2.get_latest_event('group_1')['event_id'] == first
+    assert worker_2.get_latest_event_cache_stats()['invalidations'] >= 2
+    worker_1.close()
+    worker_2.close()
+
+
+def test_shared_mode_resets_when_log_was_pruned(tmp_path):
+    path = tmp_path / 'latest.db'
+    worker_1 = make_db(path, mode='shared')
+    worker_2 = make_db(path, mode='shared')
+    worker_1.create_event('Ilk', 'moderator', 'group_1')
+    worker_2.get_latest_event('group_1')
+    second = worker_1.create_event('Ikinci', 'moderator', 'group_1')
+    with worker_1.get_connection() as conn:
+        conn.execute('DELETE FROM event_group_changes')
+        conn.commit()
+    worker_1.create_event('Diger', 'moderator', 'group_2')
+    assert worker_2.get_latest_event('group_1')['event_id'] == second
+    assert worker_2.get_latest_event_cache_stats()['resets'] == 1
+    worker_1.close()
+    worker_2.close()
+
+
+GUNICORN_SCRIPT = '''
+import os
+import sys
+import runpy
+
+os.environ.pop('BIP_BOT_LATEST_EVENT_CACHE', None)
+os.environ['GUNICORN_WORKERS'] = '2'
+runpy.run_path('gunicorn.conf.py')
+
+from database import Database, LATEST_EVENT_CACHE_SETTINGS
+assert LATEST_EVENT_CACHE_SETTINGS['mode'] == 'shared', LATEST_EVENT_CACHE_SETTINGS
+worker_1 = Database(sys.argv[1], pool_size=2, write_behind=False)
+worker_2 = Database(sys.argv[1], pool_size=2, write_behind=False)
+assert worker_1.get_latest_event('g1') is None
+event_id = worker_2.create_event('Piknik', 'u1', 'g1')
+assert worker_1.get_latest_event('g1')['event_id'] == event_id
+worker_2.set_event_status(event_id, 'closed')
+assert worker_1.get_latest_event('g1') is None
+worker_1.close()
+worker_2.close()
+'''
+
+
+def test_gunicorn_config_shares_cache_between_workers(tmp_path):
+    # gunicorn.conf.py ortam değişkenlerini değiştirir; ayrı süreçte yüklenir
+    env = dict(os.environ, BIP_BOT_DB=str(tmp_path / 'global.db'))
+    result = subprocess.run([sys.executable, '-c', GUNICORN_SCRIPT, str(tmp_path / 'latest.db')],
+                            cwd=os.path.dirname(os.path.abspath(__file__)), env=env, timeout=60,
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 BiP Bot Giden Mesaj Dağıtıcısı Testleri
+
+Kullanım:
+python -m pytest test_messaging.py
+"""
+
+import threading
+
+import pytest
+
+from messaging import MessageDispatcher, StubTransport, TransportError
+
+
+@pytest.fixture
+def transport():
+    return StubTransport()
+
+
+def make_dispatcher(transport, **options):
+    options.setdefault('coalesce_window', 0.05)
+    options.setdefault('backoff_base', 0.001)
+    return MessageDispatcher(transport, **options)
+
+
+def test_messages_to_same_group_are_coalesced(transport):
+    dispatcher = make_dispatcher(transport, coalesce_window=5.0)
+    for text in ['bir', 'iki', 'üç']:
+        assert dispatcher.send('group_1', text)
+    dispatcher.send('group_2', 'başka')
+    assert dispatcher.flush(5)
+    assert transport.messages('group_1') == ['bir\n\niki\n\nüç']
+    assert transport.messages('group_2') == ['başka']
+    stats = dispatcher.stats()
+    assert stats['delivered'] == 4 and stats['batches'] == 2 and stats['coalesced'] == 2
+    dispatcher.close()
+
+
+def test_full_batch_is_sent_without_waiting(transport):
+    dispatcher = make_dispatcher(transport, coalesce_window=60.0, max_batch=3)
+    for i in range(7):
+        dispatcher.send('group_1', str(i))
+    for _ in range(200):
+        if len(transport.sent) == 2:
+            break
+        threading.Event().wait(0.01)
+    assert transport.messages('group_1') == ['0\n\n1\n\n2', '3\n\n4\n\n5']
+    assert dispatcher.flush(5)
+    assert transport.messages('group_1')[-1] == '6'
+    dispatcher.close()
+
+
+def test_group_order_is_preserved_across_workers(transport):
+    dispatcher = make_dispatcher(transport, workers=4, coalesce_window=0.0, max_batch=1)
+    for i in range(50):
+        dispatcher.send(f'group_{i % 3}', str(i))
+    assert dispatcher.flush(5)
+    for group in range(3):
+        assert transport.messages(f'group_{group}') == [str(i) for i in range(group, 50, 3)]
+    dispatcher.close()
+
+
+def test_failed_send_is_retried_in_order():
+    transport = StubTransport(failures=2)
+    dispatcher = make_dispatcher(transport, coalesce_window=0.0, max_batch=1)
+    dispatcher.send('group_1', 'ilk')
+    dispatcher.send('group_1', 'ikinci')
+    assert dispatcher.flush(5)
+    assert transport.messages('group_1') == ['ilk', 'ikinci']
+    assert transport.attempts == 4
+    assert dispatcher.stats()['retries'] == 2
+    dispatcher.close()
+
+
+def test_message_is_dropped_after_retries():
+    class Broken:
+        def send(self, group_id, text):
+            raise TransportError('BiP kapalı')
+
+    dispatcher = make_dispatcher(Broken(), max_retries=2)
+    dispatcher.send('group_1', 'kayıp')
+    assert dispatcher.flush(5)
+    stats = dispatcher.stats()
+    assert stats['retries'] == 2 and stats['failed'] == 1 and stats['queued'] == 0
+    dispatcher.close()
+
+
+def test_full_queue_rejects_without_blocking(transport):
+    dispatcher = make_dispatcher(transport, coalesce_window=60.0, max_queue=2)
+    assert [dispatcher.send('group_1', str(i)) for i in range(3)] == [True, True, False]
+    assert dispatcher.stats()['rejected'] == 1
+    dispatcher.close()
+    assert transport.messages('group_1') == ['0\n\n1']
+    assert not dispatcher.send('group_1', 'kapalı')
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 BiP Bot QR Kod Servisi Testleri
+
+Kullanım:
+python -m pytest test_qr_service.py
+"""
+
+import threading
+
+import pytest
+
+from qr_service import QrCodeCache, render_qr
+from qr_olustur import run_batch, DirectoryOutput, ArchiveOutput
+from database import db
+from app import app
+
+
+class SlowRenderer:
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.fail = fail
+        self.release = threading.Event()
+
+    def __call__(self, data, fmt, box_size):
+        self.calls += 1
+        self.release.wait(5)
+        if self.fail:
+            raise RuntimeError('render hatası')
+        return f'{data}|{fmt}|{box_size}'.encode('utf-8')
+
+
+def burst(cache, count=8):
+    """Aynı QR'ı count thread'den aynı anda ister"""
+    results, errors = [], []
+
+    def worker():
+        try:
+            results.append(cache.get('http://test/join/1'))
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def test_concurrent_requests_render_once():
+    renderer = SlowRenderer()
+    cache = QrCodeCache(renderer=renderer)
+    threads, results, _errors = burst(cache)
+    while cache.stats()['waits'] < 7:
+        threading.Event().wait(0.01)
+    renderer.release.set()
+    for thread in threads:
+        thread.join()
+    assert renderer.calls == 1
+    assert len(results) == 8 and len(set(results)) == 1
+    assert cache.get('http://test/join/1') == results[0]
+    assert cache.stats()['hits'] == 1
+
+
+def test_render_error_reaches_waiters_and_is_not_cached():
+    renderer = SlowRenderer(fail=True)
+    cache = QrCodeCache(renderer=renderer)
+    threads, results, errors = burst(cache, count=4)
+    while cache.stats()['waits'] < 3:
+        threading.Event().wait(0.01)
+    renderer.release.set()
+    for thread in threads:
+        thread.join()
+    assert results == [] and len(errors) == 4
+    assert cache.stats()['entries'] == 0 and cache.stats()['errors'] == 1
+    with pytest.raises(RuntimeError):
+        cache.get('http://test/join/1')
+    assert renderer.calls == 2
+
+
+def test_lru_bounds_and_disk_persistence(tmp_path):
+    renderer = SlowRenderer()
+    renderer.release.set()
+    cache = QrCodeCache(max_entries=2, disk_dir=str(tmp_path), renderer=renderer)
+    for event_id in range(3):
+        cache.get(f'http://test/join/{event_id}')
+    assert cache.stats()['entries'] == 2 and cache.stats()['evictions'] == 1
+
+    # Yeni süreç (veya worker) diskteki görüntüyü render etmeden kullanır
+    fresh = QrCodeCache(disk_dir=str(tmp_path), renderer=renderer)
+    assert fresh.get('http://test/join/0') == cache.get('http://test/join/0')
+    assert renderer.calls == 3 and fresh.stats()['disk_hits'] == 1
+
+    small = QrCodeCache(max_bytes=40, renderer=renderer)
+    small.get('http://test/join/1', 'png', 2)
+    small.get('http://test/join/2', 'png', 2)
+    assert small.stats()['entries'] == 1 and small.stats()['bytes'] <= 40
+
+
+def test_render_formats():
+    assert render_qr('http://test/join/1').startswith(b'\x89PNG')
+    assert b'<svg' in render_qr('http://test/join/1', 'svg')
+    assert len(render_qr('http://test/join/1', 'png', 20)) > len(render_qr('http://test/join/1', 'png', 2))
+
+
+def test_qr_endpoint():
+    event_id = db.create_event('QR Etkinliği', 'qr_user', 'qr_group')
+    client = app.test_client()
+
+    response = client.get(f'/qr/{event_id}')
+    assert response.status_code == 200 and response.mimetype == 'image/png'
+    assert response.data.startswith(b'\x89PNG')
+    etag = response.headers['ETag']
+    assert client.get(f'/qr/{event_id}', headers={'If-None-Match': etag}).status_code == 304
+
+    svg = client.get(f'/qr/{event_id}?format=svg&size=4')
+    assert svg.mimetype == 'image/svg+xml' and b'<svg' in svg.data
+
+    assert client.get(f'/qr/{event_id}?format=gif').status_code == 400
+    assert client.get(f'/qr/{event_id}?size=500').status_code == 400
+    assert client.get('/qr/999999').status_code == 404
+
+
+def test_batch_generation_skips_unchanged_codes(tmp_path):
+    output_dir = str(tmp_path / 'qr')
+    rendered, skipped, _elapsed = run_batch([1, 2, 300], DirectoryOutput(output_dir), 'http://test', workers=1)
+    assert (rendered, skipped) == (3, 0)
+    assert (tmp_path / 'qr' / '2c' / 'event_300.png').read_bytes() == render_qr('http://test/join/300')
+
+    rendered, skipped, _elapsed = run_batch([1, 2, 300, 301], DirectoryOutput(output_dir), 'http://test', workers=1)
+    assert (rendered, skipped) == (1, 3)
+
+    archive = str(tmp_path / 'qr.zip')
+    assert run_batch([1, 2], ArchiveOutput(archive), 'http://test', 'svg', 4, workers=1)[:2] == (2, 0)
+    assert run_batch([1, 2], ArchiveOutput(archive), 'http://test', 'svg', 4, workers=1)[:2] == (0, 2)
+    assert run_batch([1, 2], ArchiveOutput(archive), 'http://test', 'svg', 5, workers=1)[:2] == (2, 0)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 BiP Bot Hız Sınırlayıcı Testleri
+
+Kullanım:
+python -m pytest test_rate_limiter.py
+"""
+
+import pytest
+
+from rate_limiter import RateLimiter, RateLimit, parse_limit
+
+LIMITS = {
+    ('user', 'read'): RateLimit(1.0, 4),
+    ('user', 'write'): RateLimit(0.5, 2),
+    ('group', 'read'): RateLimit(10.0, 20),
+    ('group', 'write'): RateLimit(1.0, 3)
+}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def limiter(request, tmp_path):
+    clock = FakeClock()
+    limiter = RateLimiter(LIMITS, backend=request.param, db_path=str(tmp_path / 'rate.db'), clock=clock)
+    limiter.clock = clock
+    yield limiter
+    limiter.close()
+
+
+def allowed(limiter, count, user_id='user_1', group_id='group_1', rate_class='write'):
+    return [limiter.check(user_id, group_id, rate_class).allowed for _ in range(count)]
+
+
+def test_burst_then_refill(limiter):
+    assert allowed(limiter, 3) == [True, True, False]
+    decision = limiter.check('user_1', 'group_1', 'write')
+    assert decision.retry_after == pytest.approx(2.0)
+    limiter.clock.now += 2.0
+    assert allowed(limiter, 2) == [True, False]
+    assert limiter.stats()['denied'] == 3
+
+
+def test_read_and_write_limits_are_separate(limiter):
+    assert allowed(limiter, 2) == [True, True]
+    assert allowed(limiter, 5, rate_class='read') == [True, True, True, True, False]
+
+
+def test_group_limit_applies_across_users(limiter):
+    assert allowed(limiter, 1, user_id='user_1') == [True]
+    assert allowed(limiter, 1, user_id='user_2') == [True]
+    assert allowed(limiter, 1, user_id='user_3') == [True]
+    assert allowed(limiter, 1, user_id='user_4') == [False]
+    # Grup kovası dolu değilken reddedilen istek kullanıcı kovasından token almaz
+    limiter.clock.now += 1.0
+    assert allowed(limiter, 2, user_id='user_4') == [True, False]
+
+
+def test_memory_backend_forgets_idle_buckets():
+    clock = FakeClock()
+    limiter = RateLimiter(LIMITS, clock=clock)
+    for i in range(50):
+        limiter.check(f'user_{i}', f'group_{i}')
+    assert limiter.stats()['keys'] == 100
+    clock.now += limiter.window
+    limiter.check('user_x', 'group_x')
+    clock.now += limiter.window
+    limiter.check('user_x', 'group_x')
+    assert limiter.stats()['keys'] == 2
+    # Atılan kova dolu sayılır
+    assert allowed(limiter, 2, user_id='user_0', group_id='group_0') == [True, True]
+
+
+def test_memory_backend_caps_key_count():
+    limiter = RateLimiter(LIMITS, max_keys=10, clock=FakeClock())
+    for i in range(100):
+        limiter.check(f'user_{i}')
+    assert limiter.stats()['keys'] <= 20
+
+
+def test_sqlite_backend_is_shared_between_workers(tmp_path):
+    clock = FakeClock()
+    path = str(tmp_path / 'rate.db')
+    worker_1 = RateLimiter(LIMITS, backend='sqlite', db_path=path, clock=clock)
+    worker_2 = RateLimiter(LIMITS, backend='sqlite', db_path=path, clock=clock)
+    assert allowed(worker_1, 1) == [True]
+    assert allowed(worker_2, 2) == [True, False]
+    clock.now += worker_1.window * 2
+    worker_1.check('user_x')
+    assert worker_1.stats()['keys'] == 1  # Sadece user_x; eski kovalar budandı
+    worker_1.close()
+    worker_2.close()
+
+
+def test_parse_limit():
+    assert parse_limit('0.5:3') == RateLimit(0.5, 3.0)
+    with pytest.raises(ValueError):
+        parse_limit('0:3')
+
+
+def test_group_vote_burst_passes_default_limits():
+    from app import db, process_webhook_message
+
+    event_id = db.create_event('Kalabalık', 'moderator', 'burst_group')
+    slot_id = db.create_slot(event_id, '2030-01-01 18:00', '2030-01-01 20:00')
+    statuses = [
+        process_webhook_message({'message': f'/katil slot={slot_id} yes', 'user_id': f'voter_{i}', 'group_id': 'burst_group'})[1]
+        for i in range(200)
+    ]
+    assert statuses == [200] * 200
+    # Aynı kullanıcının art arda yazması yine kullanıcı kovasına takılır
+    statuses = [
+        process_webhook_message({'message': f'/katil slot={slot_id} no', 'user_id': 'voter_0', 'group_id': 'burst_group'})[1]
+        for _ in range(3)
+    ]
+    assert statuses[-1] == 429
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 BiP Bot Hatırlatıcı Zamanlayıcısı Testleri
+
+Kullanım:
+python -m pytest test_scheduler.py
+"""
+
+import pytest
+
+from database import Database
+from scheduler import ManualClock, ReminderScheduler
+
+
+@pytest.fixture
+def database(tmp_path):
+    database = Database(str(tmp_path / 'scheduler.db'), pool_size=2, write_behind=False)
+    yield database
+    database.close()
+
+
+def make_scheduler(database, clock, sent, **options):
+    return ReminderScheduler(database, lambda group_id, message: sent.append((group_id, message)),
+                             clock=clock, **options)
+
+
+def test_reminders_fire_in_due_order(database):
+    clock, sent = ManualClock(1000.0), []
+    scheduler = make_scheduler(database, clock, sent, horizon=60)
+    event_id = database.create_event('Parti', 'moderator', 'group_1')
+    scheduler.schedule_in(30, event_id, 'group_1', 'ikinci')
+    scheduler.schedule_in(10, event_id, 'group_1', 'birinci')
+    scheduler.schedule_in(3600, event_id, 'group_1', 'uzak')
+    assert scheduler.stats()['queued'] == 2  # Uzak vadeli kayıt sadece veritabanında
+
+    assert scheduler.run_pending() == 0
+    clock.advance(30)
+    assert scheduler.run_pending() == 2
+    assert [message for _, message in sent] == ['birinci', 'ikinci']
+    clock.advance(3600)
+    assert scheduler.run_pending() == 1
+    assert sent[-1] == ('group_1', 'uzak')
+    assert scheduler.run_pending() == 0
+
+
+def test_closing_slot_cancels_its_reminders(database):
+    clock, sent = ManualClock(1000.0), []
+    scheduler = make_scheduler(database, clock, sent)
+    event_id = database.create_event('Parti', 'moderator', 'group_1')
+    slot_1 = database.create_slot(event_id, '2030-01-01T18:00:00', '2030-01-01T20:00:00')
+    slot_2 = database.create_slot(event_id, '2030-01-02T18:00:00', '2030-01-02T20:00:00')
+    scheduler.schedule_in(10, event_id, 'group_1', 'slot 1', slot_id=slot_1)
+    scheduler.schedule_in(10, event_id, 'group_1', 'slot 2', slot_id=slot_2)
+    database.close_slot(event_id, slot_1)
+
+    clock.advance(10)
+    assert scheduler.run_pending() == 1
+    assert sent == [('group_1', 'slot 2')]
+    assert scheduler.stats()['skipped'] == 1
+    assert database.count_pending_reminders() == 0
+
+
+def test_restart_recovers_pending_reminders(database):
+    clock, sent = ManualClock(1000.0), []
+    event_id = database.create_event('Parti', 'moderator', 'group_1')
+    first = make_scheduler(database, clock, sent)
+    first.schedule_in(60, event_id, 'group_1', 'kaybolmaz')
+    first.schedule_in(7200, event_id, 'group_1', 'çok geç')
+
+    # Yeni süreç: heap boş başlar, kayıtlar veritabanından yüklenir
+    clock.advance(60)
+    second = make_scheduler(database, clock, sent, max_lateness=600)
+    assert second.run_pending() == 1
+    assert sent == [('group_1', 'kaybolmaz')]
+
+    # Bir süreç daha aynı kaydı gönderemez
+    assert make_scheduler(database, clock, sent).run_pending() == 0
+
+    clock.advance(7200 + 601)
+    assert second.run_pending() == 0
+    assert second.stats()['expired'] == 1
+
+
+def test_failed_send_is_recorded(database):
+    clock = ManualClock(1000.0)
+    event_id = database.create_event('Parti', 'moderator', 'group_1')
+
+    def broken(group_id, message):
+        raise ConnectionError('BiP kapalı')
+
+    scheduler = ReminderScheduler(database, broken, clock=clock)
+    reminder_id = scheduler.schedule_in(5, event_id, 'group_1', 'hata')
+    clock.advance(5)
+    assert scheduler.run_pending() == 0
+    assert scheduler.stats()['failed'] == 1
+    assert database.get_reminder(reminder_id)['status'] == 'failed'
+
+
+def test_dispatcher_thread_sends_due_reminder(database):
+    sent = []
+    scheduler = ReminderScheduler(database, lambda group_id, message: sent.append(message))
+    event_id = database.create_event('Parti', 'moderator', 'group_1')
+    scheduler.start()
+    try:
+        scheduler.schedule_in(0.05, event_id, 'group_1', 'thread')
+        for _ in range(200):
+            if sent:
+                break
+            scheduler._thread.join(0.01)
+        assert sent == ['thread']
+    finally:
+        scheduler.stop()
+    assert not scheduler.stats()['running']
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 BiP Bot Masraf Hesaplaşma Testleri
+
+Kullanım:
+python -m pytest test_settlement.py
+"""
+
+import random
+
+from settlement import compute_shares, compute_balances, greedy_transfers, exact_transfers, settle
+from database import db
+from app import app, process_webhook_message
+
+
+def apply(balances, transfers):
+    """Transferlerden sonra kalan bakiyeler"""
+    remaining = dict(balances)
+    for debtor, creditor, amount in transfers:
+        assert amount > 0
+        remaining[debtor] += amount
+        remaining[creditor] -= amount
+    return remaining
+
+
+def test_shares_follow_weights_and_add_up():
+    assert compute_shares(10000, {'a': 1.0, 'b': 1.0, 'c': 2.0}) == {'a': 2500, 'b': 2500, 'c': 5000}
+    shares = compute_shares(1000, {'a': 1.0, 'b': 1.0, 'c': 1.0})
+    assert sum(shares.values()) == 1000 and sorted(shares.values()) == [333, 333, 334]
+    assert compute_shares(900, {'a': 0.0, 'b': 0.0}) == {'a': 450, 'b': 450}
+
+
+def test_balances_include_participants_without_expenses():
+    shares, balances = compute_balances({'a': 90.0}, {'a': 1.0}, ['a', 'b', 'c'])
+    assert shares == {'a': 3000, 'b': 3000, 'c': 3000}
+    assert balances == {'a': 6000, 'b': -3000, 'c': -3000}
+
+
+def test_exact_solver_beats_greedy_when_groups_cancel_out():
+    balances = {'a': 4, 'b': -3, 'c': -3, 'd': -2, 'e': -6, 'f': -2, 'g': 12}
+    greedy = greedy_transfers(balances)
+    exact = exact_transfers(balances)
+    assert len(exact) == 5 < len(greedy)
+    assert set(apply(balances, exact).values()) == {0}
+
+
+def test_transfers_always_settle_everyone():
+    rng = random.Random(7)
+    for _ in range(300):
+        values = [rng.randint(-500, 500) for _ in range(rng.randint(1, 9))]
+        values.append(-sum(values))
+        balances = {f'user_{i}': value for i, value in enumerate(values)}
+        greedy = greedy_transfers(balances)
+        exact = exact_transfers(balances)
+        assert set(apply(balances, greedy).values()) <= {0}
+        assert set(apply(balances, exact).values()) <= {0}
+        assert len(exact) <= len(greedy) <= max(0, sum(1 for v in values if v) - 1)
+
+
+def test_settle_switches_to_greedy_for_large_groups():
+    paid = {f'user_{i}': float(i) for i in range(30)}
+    result = settle(paid, {}, list(paid))
+    assert result['method'] == 'greedy'
+    assert round(sum(result['balances'].values()), 2) == 0
+    assert settle({'a': 10.0}, {}, ['a', 'b'])['method'] == 'exact'
+
+
+def test_settlement_endpoint_and_command():
+    event_id = db.create_event('Hesap Etkinliği', 'moderator', 'settle_group')
+    db.create_expense(event_id, 'ali', 300.0, 'Pizza', 1.0)
+    db.create_expense(event_id, 'ayse', 100.0, 'İçecek', 2.0)
+    db.vote_slot(event_id, db.create_slot(event_id, '2030-01-01 18:00', '2030-01-01 20:00'), 'veli', 'yes')
+
+    response = app.test_client().get(f'/events/{event_id}/settlement')
+    data = response.get_json()['data']
+    assert data['shares'] == {'ali': 100.0, 'ayse': 200.0, 'veli': 100.0}
+    assert data['balances'] == {'ali': 200.0, 'ayse': -100.0, 'veli': -100.0}
+    assert sorted((t['from'], t['to'], t['amount']) for t in data['transfers']) == \
+        [('ayse', 'ali', 100.0), ('veli', 'ali', 100.0)]
+    assert data['method'] == 'exact' and data['transfer_count'] == 2
+    assert app.test_client().get('/events/999999/settlement').status_code == 404
+
+    body, status = process_webhook_message({'message': '/hesap', 'user_id': 'veli', 'group_id': 'settle_group'})
+    assert status == 200
+    assert 'veli → ali: 100.00 TL' in body['bip_message']
+
+
+def test_stream_deltas_carry_server_balances():
+    from app import stream_hub, build_event_summary
+    event_id = db.create_event('Canlı Hesap', 'moderator', 'settle_stream_group')
+    subscription = stream_hub.subscribe(event_id)
+    try:
+        db.vote_slot(event_id, db.create_slot(event_id, '2030-01-01 18:00', '2030-01-01 20:00'), 'veli', 'yes')
+        db.create_expense(event_id, 'ali', 100.0, 'Pizza', 1.0)
+        db.vote_slot(event_id, db.get_slots_by_event(event_id)[0]['slot_id'], 'ayse', 'yes')
+        deltas = {message.event: message.data for message in subscription.wait(0)}
+    finally:
+        subscription.close()
+
+    # 100 TL üç eşit paya: kuruşlar sunucuda dağıtılır, toplam sıfır
+    balances = deltas['slot_voted']['balances']
+    assert balances == build_event_summary(event_id)['balances']
+    assert balances == {'ali': 66.66, 'ayse': -33.33, 'veli': -33.33}
+    assert round(sum(balances.values()), 2) == 0
+    assert deltas['expense_added']['balances'] == {'ali': 50.0, 'veli': -50.0}
+    assert 'balances' not in deltas['slot_added']
+
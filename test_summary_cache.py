@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 BiP Bot Özet Önbelleği Testleri
+
+Kullanım:
+python -m pytest test_summary_cache.py
+"""
+
+from summary_cache import SummaryCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_eviction_is_bounded():
+    cache = SummaryCache(max_entries=2, ttl=60)
+    cache.put(1, 'a')
+    cache.put(2, 'b')
+    cache.get(1)
+    cache.put(3, 'c')
+    assert cache.get(2) is None
+    assert cache.get(1) == 'a'
+    assert cache.stats()['evictions'] == 1
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = SummaryCache(ttl=10, clock=clock)
+    cache.put(1, 'a')
+    clock.now = 9.9
+    assert cache.get(1) == 'a'
+    clock.now = 10.0
+    assert cache.get(1) is None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_invalidation_during_compute_is_not_cached():
+    cache = SummaryCache()
+
+    def compute():
+        # Hesaplama sürerken gelen yazma
+        cache.invalidate(1)
+        return 'stale'
+
+    assert cache.get_or_compute(1, compute) == 'stale'
+    assert cache.get(1) is None
+    assert cache.get_or_compute(1, lambda: 'fresh') == 'fresh'
+    assert cache.get(1) == 'fresh'
+
+
+def test_version_mismatch_is_a_miss():
+    cache = SummaryCache()
+    cache.put(1, 'v1', version=1)
+    assert cache.get(1, version=1) == 'v1'
+    assert cache.get(1, version=2) is None
+    assert cache.get_or_compute(1, lambda: 'v2', version=2) == 'v2'
+    assert cache.stats()['stale'] == 1
+
+
+def test_disabled_cache_always_computes():
+    cache = SummaryCache(enabled=False)
+    calls = []
+    for _ in range(3):
+        cache.get_or_compute(1, lambda: calls.append(1) or 'x')
+    assert len(calls) == 3
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 BiP Bot Kullanıcı Varlık Katmanı Testleri
+
+Kullanım:
+python -m pytest test_user_presence.py
+"""
+
+import time
+
+from database import Database
+
+
+def make_db(path, **settings):
+    options = {'flush_interval': 60, 'max_pending': 1000}
+    options.update(settings)
+    return Database(str(path), pool_size=2, write_behind=False, presence=options)
+
+
+def test_only_new_users_are_written(tmp_path):
+    database = make_db(tmp_path / 'presence.db')
+    assert database.touch_user('user_1') is True
+    assert database.touch_user('user_1') is False
+    assert database.touch_user('user_2') is True
+    assert database.get_user_count() == 2
+
+    # Bilinen kullanıcının dokunuşu flush'a kadar sadece bellekte bekler
+    with database.get_connection() as conn:
+        conn.execute("UPDATE users SET last_active = '2000-01-01 00:00:00'")
+        conn.commit()
+    database.touch_user('user_1')
+    assert database.get_user('user_1')['last_active'] == '2000-01-01 00:00:00'
+    assert database.presence.flush() == 1
+    assert database.get_user('user_1')['last_active'] != '2000-01-01 00:00:00'
+    assert database.get_user('user_2')['last_active'] == '2000-01-01 00:00:00'
+
+    stats = database.get_presence_stats()
+    assert stats['known'] == 2 and stats['inserts'] == 2 and stats['pending'] == 0
+    assert stats['flushes'] == 1 and stats['flushed_users'] == 1
+    database.close()
+
+
+def test_touch_does_not_clobber_name_or_role(tmp_path):
+    database = make_db(tmp_path / 'presence.db')
+    database.create_or_update_user('moderator', name='Ayşe', role='moderator')
+    database.touch_user('moderator')
+    database.create_or_update_user('moderator')
+    database.presence.flush()
+    user = database.get_user('moderator')
+    assert (user['name'], user['role']) == ('Ayşe', 'moderator')
+    assert database.get_user_count() == 1
+    assert database.rebuild_stats(fix=False)['drift'] == []
+    database.close()
+
+
+def test_pending_threshold_wakes_flush_thread(tmp_path):
+    database = make_db(tmp_path / 'presence.db', max_pending=3)
+    for i in range(3):
+        database.touch_user(f'user_{i}')
+    with database.get_connection() as conn:
+        conn.execute("UPDATE users SET last_active = NULL")
+        conn.commit()
+    for i in range(3):
+        database.touch_user(f'user_{i}')
+    # Eşik dolunca thread flush_interval'ı beklemeden yazar
+    deadline = time.monotonic() + 5
+    while database.get_presence_stats()['flushes'] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    with database.get_connection() as conn:
+        touched = conn.execute('SELECT COUNT(*) FROM users WHERE last_active IS NOT NULL').fetchone()[0]
+    assert touched == 3
+    database.close()
+
+
+def test_close_flushes_pending_touches(tmp_path):
+    path = tmp_path / 'presence.db'
+    database = make_db(path)
+    database.touch_user('user_1')
+    with database.get_connection() as conn:
+        conn.execute("UPDATE users SET last_active = NULL")
+        conn.commit()
+    database.touch_user('user_1')
+    database.close()
+
+    reopened = make_db(path)
+    assert reopened.get_user('user_1')['last_active'] is not None
+    reopened.close()
+
+
+def test_rolled_back_user_is_not_remembered(tmp_path):
+    database = make_db(tmp_path / 'presence.db')
+    try:
+        with database.transaction():
+            database.touch_user('user_1')
+            raise RuntimeError('geri al')
+    except RuntimeError:
+        pass
+    assert database.get_user('user_1') is None
+    assert database.touch_user('user_1') is True
+    assert database.get_user('user_1') is not None
+    database.close()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 BiP Bot Toplu Webhook Testleri
+/webhook/bip/batch endpoint'ini Flask test istemcisiyle test eder
+
+Kullanım:
+python -m pytest test_webhook_batch.py
+"""
+
+import pytest
+
+import app as app_module
+from app import app, db, summary_cache, get_cached_summary, WEBHOOK_BATCH_LIMIT
+from rate_limiter import RateLimiter, RateLimit
+
+LIMITS = {
+    ('user', 'read'): RateLimit(0.001, 5),
+    ('user', 'write'): RateLimit(0.001, 1),
+    ('group', 'read'): RateLimit(0.001, 50),
+    ('group', 'write'): RateLimit(0.001, 50)
+}
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+def fresh_limiter(monkeypatch):
+    """Her istek dizisi aynı (boş) kovalarla başlasın"""
+    monkeypatch.setattr(app_module, 'rate_limiter', RateLimiter(LIMITS, backend='memory'))
+
+
+def message(text, user_id='batch_user', group_id='batch_group'):
+    return {'message': text, 'user_id': user_id, 'group_id': group_id}
+
+
+def test_batch_results_match_single_webhook(client, monkeypatch):
+    event_id = db.create_event('Toplu', 'moderator', 'batch_group')
+    slot_id = db.create_slot(event_id, '2030-01-01 18:00', '2030-01-01 20:00')
+    payloads = [
+        message('/test'),
+        message(f'/katil slot={slot_id} yes'),
+        {'message': '/test', 'user_id': 'batch_user'},
+        message(f'/katil slot={slot_id} no'),
+        message('/yok'),
+        message('/katil 1 yes', user_id='other_user')
+    ]
+
+    fresh_limiter(monkeypatch)
+    single = []
+    for payload in payloads:
+        response = client.post('/webhook/bip', json=payload)
+        single.append({'status_code': response.status_code, 'body': response.get_json()})
+
+    fresh_limiter(monkeypatch)
+    response = client.post('/webhook/bip/batch', json=payloads)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['count'] == len(payloads)
+    assert data['results'] == single
+    # Sıra korunur: eksik alan 400, kullanıcının ikinci yazması 429
+    assert [result['status_code'] for result in data['results']] == [200, 200, 400, 429, 200, 200]
+
+
+def test_batch_preserves_request_order(client, monkeypatch):
+    fresh_limiter(monkeypatch)
+    payloads = [message('/yeni Birinci', group_id='order_group'), message('/yeni Ikinci', group_id='order_group', user_id='order_user')]
+    results = client.post('/webhook/bip/batch', json=payloads).get_json()['results']
+    first_id, second_id = (int(result['body']['bip_message'].split('ID: ')[1].rstrip(')')) for result in results)
+    assert first_id < second_id
+    assert db.get_latest_event('order_group')['event_id'] == second_id
+
+
+def test_batch_rejects_non_list_and_oversized_bodies(client):
+    response = client.post('/webhook/bip/batch', json=message('/test'))
+    assert response.status_code == 400
+    response = client.post('/webhook/bip/batch', json=[message('/test')] * (WEBHOOK_BATCH_LIMIT + 1))
+    assert response.status_code == 413
+
+
+def test_batch_exception_rolls_back_and_clears_summary_cache(client, monkeypatch):
+    fresh_limiter(monkeypatch)
+    event_id = db.create_event('Önbellekte', 'moderator', 'cached_group')
+    get_cached_summary(event_id)
+    assert summary_cache.stats()['entries'] > 0
+
+    process = app_module.process_webhook_message
+
+    def failing(payload):
+        if payload['message'] == '/patla':
+            raise RuntimeError('beklenmeyen hata')
+        return process(payload)
+
+    monkeypatch.setattr(app_module, 'process_webhook_message', failing)
+    response = client.post('/webhook/bip/batch', json=[message('/yeni Geri Alinacak', group_id='rollback_group'), message('/patla')])
+    assert response.status_code == 500
+    assert db.get_latest_event('rollback_group') is None
+    assert summary_cache.stats()['entries'] == 0
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 BiP Bot Write-Behind Kuyruğu Testleri
+
+Kullanım:
+python -m pytest test_write_behind.py
+"""
+
+import time
+
+import pytest
+
+from database import Database
+from write_behind import WriteBehindFull
+
+
+def make_db(path, pool_size=2, **settings):
+    options = {'flush_interval': 0.02, 'batch_size': 64, 'put_timeout': 0.05}
+    options.update(settings)
+    return Database(str(path), pool_size=pool_size, write_behind=options)
+
+
+def test_votes_are_group_committed(tmp_path):
+    database = make_db(tmp_path / 'wb.db')
+    changes = []
+    database.add_write_listener(lambda event_id, change, **data: changes.append(change))
+    event_id = database.create_event('Kuyruk', 'moderator', 'group_1')
+    slot_id = database.create_slot(event_id, '2030-01-01T18:00:00', '2030-01-01T20:00:00')
+    for i in range(40):
+        database.create_or_update_user(f'user_{i}')
+        database.vote_slot(event_id, slot_id, f'user_{i}', 'yes' if i % 4 else 'no')
+    assert database.flush_writes(timeout=5)
+
+    stats = database.get_write_behind_stats()
+    assert stats['committed'] == 80 and stats['failed'] == 0 and stats['depth'] == 0
+    assert stats['batches'] < 80
+    assert database.get_event_stats(event_id)['slot_yes_votes'] == 30
+    assert database.get_user_count() == 40
+    assert changes.count('slot_voted') == 40
+    assert database.rebuild_stats(fix=False)['drift'] == []
+    database.close()
+
+
+def test_failed_write_does_not_drop_batch(tmp_path):
+    database = make_db(tmp_path / 'wb.db')
+    event_id = database.create_event('Hata', 'moderator', 'group_1')
+    slot_id = database.create_slot(event_id, '2030-01-01T18:00:00', '2030-01-01T20:00:00')
+
+    def broken():
+        raise ValueError('bozuk yazma')
+
+    database.vote_slot(event_id, slot_id, 'user_1', 'yes')
+    database.write_behind.submit(broken)
+    database.vote_slot(event_id, slot_id, 'user_2', 'yes')
+    database.flush_writes(timeout=5)
+    assert database.get_write_behind_stats()['failed'] == 1
+    assert database.get_event_stats(event_id)['slot_yes_votes'] == 2
+    database.close()
+
+
+def test_full_queue_applies_backpressure(tmp_path):
+    database = make_db(tmp_path / 'wb.db', pool_size=1, max_size=2, batch_size=1, flush_interval=0)
+    event_id = database.create_event('Dolu', 'moderator', 'group_1')
+    slot_id = database.create_slot(event_id, '2030-01-01T18:00:00', '2030-01-01T20:00:00')
+
+    # Tek bağlantıyı tutarak writer thread'i beklet
+    conn = database.pool.acquire()
+    database.vote_slot(event_id, slot_id, 'user_0', 'yes')
+    deadline = time.monotonic() + 5
+    while database.get_write_behind_stats()['depth'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    database.vote_slot(event_id, slot_id, 'user_1', 'yes')
+    database.vote_slot(event_id, slot_id, 'user_2', 'yes')
+    with pytest.raises(WriteBehindFull):
+        database.vote_slot(event_id, slot_id, 'user_3', 'yes')
+    database.pool.release(conn)
+
+    assert database.flush_writes(timeout=5)
+    stats = database.get_write_behind_stats()
+    assert stats['rejected'] == 1 and stats['committed'] == 3 and stats['max_depth'] == 2
+    database.close()
+
+
+def test_close_flushes_queue(tmp_path):
+    path = tmp_path / 'wb.db'
+    database = make_db(path, flush_interval=1.0)
+    event_id = database.create_event('Kapanis', 'moderator', 'group_1')
+    slot_id = database.create_slot(event_id, '2030-01-01T18:00:00', '2030-01-01T20:00:00')
+    for i in range(10):
+        database.vote_slot(event_id, slot_id, f'user_{i}', 'yes')
+    database.close()
+
+    reopened = Database(str(path), pool_size=1, write_behind=False)
+    assert reopened.get_event_stats(event_id)['slot_yes_votes'] == 10
+    reopened.close()
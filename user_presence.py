@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+👤 BiP Bot - Kullanıcı Varlık Katmanı
+Her istekte yapılan kullanıcı yazmasını bellekteki bilinen kullanıcı kümesiyle değiştirir
+
+Özellikler:
+- Bilinen kullanıcılar için istek yolunda veritabanı yazması yapılmaz
+- Sadece yeni kullanıcılar anında eklenir; ad ve rol hiçbir zaman ezilmez
+- last_active güncellemeleri biriktirilip toplu UPDATE ... WHERE user_id IN (...) ile yazılır
+- Periyodik ve eşik tabanlı flush; kapanışta bekleyenler diske yazılır
+- Fork sonrası arka plan thread'inin yeniden başlatılması
+
+Yazar: BiP Bot Development Team
+Versiyon: 2.0.0
+"""
+
+import os
+import time
+import atexit
+import sqlite3
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class UserPresence:
+    def __init__(self, db, flush_interval=30.0, max_pending=1000, max_known=100000):
+        """Varlık katmanını hazırlar; flush thread'i ilk dokunuşta başlar"""
+        self.db = db
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_known = max_known
+
+        self._known = set()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._closed = False
+        self._pid = os.getpid()
+
+        # İstatistikler
+        self._touches = 0
+        self._inserts = 0
+        self._flushes = 0
+        self._flushed_users = 0
+        self._failed_flushes = 0
+        self._last_flush = 0.0
+
+        atexit.register(self.close)
+
+    def after_fork(self):
+        """Fork sonrası çocuk süreçte kilitleri yeniler; thread ilk dokunuşta başlar"""
+        if self._pid == os.getpid():
+            return
+        # Ebeveynin bekleyen dokunuşları ebeveyn tarafından yazılır
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = os.getpid()
+
+    def _ensure_started(self):
+        """Flush thread'ini gerekirse başlatır (fork sonrası yeniden)"""
+        self.after_fork()
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='user-presence', daemon=True)
+                self._thread.start()
+
+    def touch(self, user_id):
+        """Kullanıcının aktif olduğunu kaydeder; kullanıcı yeni eklendiyse True döner"""
+        if user_id in self._known:
+            if self._thread is None or self._pid != os.getpid():
+                self._ensure_started()
+            with self._lock:
+                self._pending.add(user_id)
+                self._touches += 1
+                full = len(self._pending) >= self.max_pending
+            if full:
+                self._wake.set()
+            return False
+
+        created = self.db.ensure_user(user_id)
+        # Açık işlem geri alınabilir; kullanıcı commit sonrası ilk dokunuşta bilinir olur
+        if not self.db.in_transaction():
+            with self._lock:
+                if len(self._known) >= self.max_known:
+                    self._known.clear()
+                self._known.add(user_id)
+                self._touches += 1
+                if created:
+                    self._inserts += 1
+        return created
+
+    def forget(self, user_id=None):
+        """Kullanıcıyı (veya hepsini) bilinen kümeden çıkarır"""
+        with self._lock:
+            if user_id is None:
+                self._known.clear()
+            else:
+                self._known.discard(user_id)
+
+    def flush(self):
+        """Bekleyen last_active dokunuşlarını tek toplu güncellemeyle yazar"""
+        with self._lock:
+            if not self._pending:
+                return 0
+            user_ids, self._pending = self._pending, set()
+        started = time.monotonic()
+        try:
+            self.db.touch_users(user_ids)
+        except sqlite3.Error as e:
+            with self._lock:
+                self._pending |= user_ids
+                self._failed_flushes += 1
+            logger.warning(f"Kullanıcı aktiflik güncellemesi başarısız ({len(user_ids)} kullanıcı): {str(e)}")
+            return 0
+        with self._lock:
+            self._flushes += 1
+            self._flushed_users += len(user_ids)
+            self._last_flush = time.monotonic() - started
+        return len(user_ids)
+
+    def _run(self):
+        """Flush döngüsü; aralık dolunca veya bekleyenler eşiği aşınca yazar"""
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def close(self):
+        """Flush thread'ini durdurur ve bekleyen dokunuşları yazar"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and self._pid == os.getpid():
+            thread.join(timeout=5)
+        if self._pid == os.getpid():
+            self.flush()
+
+    def stats(self):
+        """Bilinen kullanıcı ve flush istatistiklerini döndürür"""
+        with self._lock:
+            return {
+                'known': len(self._known),
+                'pending': len(self._pending),
+                'touches': self._touches,
+                'inserts': self._inserts,
+                'flushes': self._flushes,
+                'flushed_users': self._flushed_users,
+                'failed_flushes': self._failed_flushes,
+                'flush_interval': self.flush_interval,
+                'last_flush_ms': round(self._last_flush * 1000, 3)
+            }
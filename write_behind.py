@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+✍️ BiP Bot - Write-Behind Yazma Kuyruğu
+Oy ve kullanıcı yazmalarını bellekte kuyruklayıp tek writer thread ile toplu commit eder
+
+Özellikler:
+- Sınırlı kuyruk; dolduğunda bekletme ve zaman aşımında hata (backpressure)
+- Tek writer thread, yapılandırılabilir flush aralığı ve batch boyutu
+- Her batch tek işlemde commit edilir (group commit)
+- Kapanışta kuyruktaki tüm yazmaların diske yazılması
+- Kuyruk derinliği ve commit gecikmesi metrikleri
+
+Yazar: BiP Bot Development Team
+Versiyon: 2.0.0
+"""
+
+import os
+import time
+import queue
+import atexit
+import sqlite3
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindFull(sqlite3.OperationalError):
+    """Kuyruk dolu olduğu için yazma zamanında kabul edilemediğinde fırlatılır"""
+
+
+class WriteBehindQueue:
+    def __init__(self, db, max_size=10000, flush_interval=0.05, batch_size=256, put_timeout=1.0):
+        """Kuyruğu hazırlar; writer thread ilk yazmada başlar"""
+        self.db = db
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.put_timeout = put_timeout
+
+        self._queue = queue.Queue(maxsize=max_size)
+        self._cond = threading.Condition()
+        self._pending = 0
+        self._thread = None
+        self._closed = False
+        self._pid = os.getpid()
+
+        # İstatistikler
+        self._submitted = 0
+        self._committed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._batches = 0
+        self._max_depth = 0
+        self._total_commit = 0.0
+        self._max_commit = 0.0
+        self._last_commit = 0.0
+
+        atexit.register(self.close)
+
+    def after_fork(self):
+        """Fork sonrası çocuk süreçte kuyruğu ve kilidi yeniler; thread ilk yazmada başlar"""
+        if self._pid == os.getpid():
+            return
+        # Ebeveynin kuyruğu ve thread'i çocuk süreçte yok sayılır
+        self._queue = queue.Queue(maxsize=self.max_size)
+        self._cond = threading.Condition()
+        self._pending = 0
+        self._thread = None
+        self._pid = os.getpid()
+
+    def _ensure_started(self):
+        """Writer thread'i gerekirse başlatır (fork sonrası yeniden)"""
+        self.after_fork()
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+            self._thread.start()
+
+    def submit(self, func, *args, **kwargs):
+        """Yazmayı kuyruğa ekler; kuyruk doluysa put_timeout kadar bekler"""
+        if self._closed:
+            raise sqlite3.ProgrammingError("Yazma kuyruğu kapatıldı")
+        with self._cond:
+            self._ensure_started()
+            self._pending += 1
+        try:
+            self._queue.put((func, args, kwargs), timeout=self.put_timeout)
+        except queue.Full:
+            with self._cond:
+                self._pending -= 1
+                self._rejected += 1
+                self._cond.notify_all()
+            raise WriteBehindFull(f"Yazma kuyruğu dolu ({self.max_size})")
+        with self._cond:
+            self._submitted += 1
+            self._max_depth = max(self._max_depth, self._queue.qsize())
+
+    def _collect(self):
+        """Bir batch toplar; ilk yazmadan sonra en fazla flush_interval bekler"""
+        batch = []
+        deadline = None
+        while len(batch) < self.batch_size:
+            timeout = 0.5 if deadline is None else deadline - time.monotonic()
+            try:
+                if timeout > 0:
+                    item = self._queue.get(timeout=timeout)
+                else:
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # close() uyandırması; pencere beklenmeden commit edilir
+                break
+            batch.append(item)
+            if deadline is None:
+                deadline = time.monotonic() + self.flush_interval
+        return batch
+
+    def _commit(self, batch):
+        """Batch'i tek işlemde yazar; hatalı yazma sadece kendini geri alır"""
+        failed = 0
+        started = time.monotonic()
+        try:
+            with self.db.transaction():
+                for func, args, kwargs in batch:
+                    try:
+                        func(*args, **kwargs)
+                    except Exception as e:
+                        failed += 1
+                        logger.error(f"Kuyruktaki yazma başarısız ({func.__name__}): {str(e)}")
+        except Exception as e:
+            failed = len(batch)
+            logger.error(f"Yazma kuyruğu commit hatası ({len(batch)} yazma kayboldu): {str(e)}")
+        elapsed = time.monotonic() - started
+        with self._cond:
+            self._batches += 1
+            self._committed += len(batch) - failed
+            self._failed += failed
+            self._total_commit += elapsed
+            self._max_commit = max(self._max_commit, elapsed)
+            self._last_commit = elapsed
+            self._pending -= len(batch)
+            self._cond.notify_all()
+
+    def _run(self):
+        """Writer thread döngüsü; kapanışta kuyruk boşalana kadar devam eder"""
+        while True:
+            batch = self._collect()
+            if batch:
+                self._commit(batch)
+            elif self._closed and self._queue.empty():
+                break
+
+    def flush(self, timeout=None):
+        """Kuyruktaki tüm yazmalar commit edilene kadar bekler; başarılıysa True"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending > 0:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout=30.0):
+        """Yeni yazmaları reddeder, kuyruğu boşaltır ve writer thread'i durdurur"""
+        if self._closed:
+            return
+        self._closed = True
+        thread = self._thread
+        if thread is not None and thread.is_alive() and self._pid == os.getpid():
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                pass  # Writer zaten meşgul; kuyruk boşalınca kendisi çıkar
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.warning(f"Yazma kuyruğu {timeout} saniyede boşaltılamadı ({self._queue.qsize()} yazma)")
+            else:
+                logger.info("Yazma kuyruğu boşaltıldı ve kapatıldı")
+
+    def stats(self):
+        """Kuyruk derinliği ve commit gecikmesi metriklerini döndürür"""
+        with self._cond:
+            return {
+                'depth': self._queue.qsize(),
+                'max_depth': self._max_depth,
+                'capacity': self.max_size,
+                'pending': self._pending,
+                'submitted': self._submitted,
+                'committed': self._committed,
+                'failed': self._failed,
+                'rejected': self._rejected,
+                'batches': self._batches,
+                'avg_batch_size': round((self._committed + self._failed) / self._batches, 2) if self._batches else 0.0,
+                'avg_commit_ms': round(self._total_commit / self._batches * 1000, 3) if self._batches else 0.0,
+                'max_commit_ms': round(self._max_commit * 1000, 3),
+                'last_commit_ms': round(self._last_commit * 1000, 3)
+            }